@@ -0,0 +1,129 @@
+"""
+Recall-vs-latency benchmark of the IVF index against exact NumPy search.
+
+Uses the ingested index (knowledge_base/numpy_index) when present, otherwise a
+synthetic clustered corpus. Queries are stored vectors with small noise added,
+so no embedding API calls are made.
+
+    uv run python3 benchmarks/ann_recall.py --synthetic 100000 --nprobe 1 4 16 64
+"""
+
+import sys
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+from src.config import Config
+from src.retrieval import IVFIndex, NumpyIndexWriter, NumpyVectorIndex
+
+
+def build_synthetic_index(index_dir: Path, rows: int, dim: int, seed: int = 0) -> NumpyVectorIndex:
+    """Writes a clustered random corpus (roughly how chunk embeddings group by topic)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, rows // 200), dim)).astype(np.float32)
+    writer = NumpyIndexWriter(index_dir)
+    for start in range(0, rows, 10_000):
+        size = min(10_000, rows - start)
+        vectors = centers[rng.integers(len(centers), size=size)]
+        vectors = vectors + 0.5 * rng.normal(size=(size, dim)).astype(np.float32)
+        ids = [f"synthetic-{start + i}" for i in range(size)]
+        writer.add(ids, ids, [{} for _ in ids], vectors)
+    writer.finalize()
+    return NumpyVectorIndex(index_dir)
+
+
+def benchmark_recall(
+    exact_index, ann_index, queries, k: int = 4, nprobe_values=(1, 2, 4, 8, 16, 32)
+) -> list[dict]:
+    """
+    Measures recall@k and per-query latency of `ann_index` against exact search
+    for each nprobe setting. Returns one result dict per setting, exact first.
+    """
+
+    def timed(search):
+        latencies, results = [], []
+        for query in queries:
+            start = time.perf_counter()
+            results.append({row for row, _ in search(query)})
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, np.asarray(latencies)
+
+    truth, exact_latency = timed(lambda q: exact_index.search(q, k=k))
+    rows = [
+        {
+            "method": "exact",
+            "nprobe": None,
+            "recall": 1.0,
+            "mean_ms": float(exact_latency.mean()),
+            "p95_ms": float(np.percentile(exact_latency, 95)),
+        }
+    ]
+    for nprobe in nprobe_values:
+        if nprobe > ann_index.nlist:
+            continue
+        found, latency = timed(lambda q: ann_index.search(q, k=k, nprobe=nprobe))
+        recall = np.mean([len(f & t) / max(1, len(t)) for f, t in zip(found, truth)])
+        rows.append(
+            {
+                "method": "ivf",
+                "nprobe": nprobe,
+                "recall": float(recall),
+                "mean_ms": float(latency.mean()),
+                "p95_ms": float(np.percentile(latency, 95)),
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall vs latency benchmark")
+    parser.add_argument(
+        "--synthetic", type=int, metavar="ROWS", help="Benchmark a synthetic corpus of ROWS vectors"
+    )
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=Config.RETRIEVAL_TOP_K)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            index = build_synthetic_index(Path(tmp) / "index", args.synthetic, args.dim)
+        else:
+            index = NumpyVectorIndex(Config.NUMPY_INDEX_DIR)
+
+        ivf = IVFIndex.build(index, nlist=args.nlist)
+        rng = np.random.default_rng(1)
+        rows = rng.choice(len(index), size=min(args.queries, len(index)), replace=False)
+        queries = np.asarray(index.vectors[np.sort(rows)], dtype=np.float32)
+        queries = queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32)
+
+        results = benchmark_recall(index, ivf, queries, k=args.k, nprobe_values=args.nprobe)
+        index.close()
+
+    if args.json:
+        report = {"rows": len(index), "nlist": ivf.nlist, "k": args.k, "results": results}
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{len(index)} rows, nlist={ivf.nlist}, k={args.k}, {len(queries)} queries")
+    print(f"{'method':<8}{'nprobe':>8}{'recall':>10}{'mean ms':>10}{'p95 ms':>10}")
+    for row in results:
+        nprobe = row["nprobe"] if row["nprobe"] is not None else "-"
+        print(
+            f"{row['method']:<8}{nprobe:>8}"
+            f"{row['recall']:>10.3f}{row['mean_ms']:>10.3f}{row['p95_ms']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
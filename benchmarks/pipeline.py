@@ -0,0 +1,191 @@
+"""
+Offline end-to-end benchmark of RAGQueryEngine.run_query. The engine runs
+against the local stand-ins in src/fakes.py (FakeChatModel, HashEmbeddings)
+and a synthetic corpus indexed with the NumPy backend, so no OpenRouter or
+Jina quota is used. Every combination of corpus size, k, concurrency and
+answer cache on/off is run as one workload. The report gives throughput,
+end-to-end latency percentiles, per-stage p50s and result codes.
+
+    uv run python3 benchmarks/pipeline.py --corpus-sizes 1000 20000 --k 4 8 \\
+        --concurrency 1 8 --cache off on --output bench_pipeline.json
+
+Reports carry the git commit, so runs from two commits can be compared.
+"""
+
+import os
+import sys
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Select the stand-ins before src.config is imported (it validates API keys on import)
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["EMBEDDING_BACKEND"] = "hash"
+os.environ["RETRIEVER_BACKEND"] = "numpy"
+
+import numpy as np
+from src.config import Config
+from src.fakes import build_synthetic_index, synthetic_queries
+from src.metrics import get_metrics
+from src.rag_query import RAGQueryEngine
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def run_workload(queries: list, concurrency: int, faithfulness: bool) -> dict:
+    """Runs `queries` through a fresh engine on `concurrency` threads and summarizes the run."""
+    get_metrics().reset()
+    engine = RAGQueryEngine()
+    latencies = []
+
+    def timed(query):
+        start = time.perf_counter()
+        result = engine.run_query(query, skip_faithfulness=not faithfulness)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, queries))
+    elapsed = time.perf_counter() - start
+    if engine.eval_queue is not None:
+        engine.eval_queue.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    codes = {}
+    for result in results:
+        codes[result["error_code"]] = codes.get(result["error_code"], 0) + 1
+    report = {
+        "queries": len(queries),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round(len(queries) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 3),
+            **{f"p{q}": round(float(np.percentile(latencies_ms, q)), 3) for q in (50, 95, 99)},
+            "max": round(float(latencies_ms.max()), 3),
+        },
+        "stage_p50_ms": {
+            stage: round(p["p50_ms"], 3) for stage, p in get_metrics().percentiles().items()
+        },
+        "codes": codes,
+    }
+    if engine.answer_cache is not None:
+        report["cache_hit_rate"] = round(engine.answer_cache.stats()["hit_rate"], 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--k", type=int, nargs="+", default=[Config.RETRIEVAL_TOP_K])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--cache", choices=["off", "on"], nargs="+", default=["off", "on"])
+    parser.add_argument("--queries", type=int, default=200, help="Queries per workload")
+    parser.add_argument(
+        "--distinct-queries", type=int, default=None, help="Distinct phrasings to draw from"
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=Config.FAKE_LLM_LATENCY_SECONDS,
+        help="Seconds to first token",
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=Config.FAKE_LLM_TOKENS_PER_SECOND
+    )
+    parser.add_argument(
+        "--embed-latency", type=float, default=Config.FAKE_EMBEDDING_LATENCY_SECONDS
+    )
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=Config.retrieval_confidence_threshold(),
+        help="Retrieval confidence threshold (default: the hash-embedding cut-off)",
+    )
+    parser.add_argument(
+        "--faithfulness", action="store_true", help="Also run the faithfulness checks"
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    Config.FAKE_LLM_LATENCY_SECONDS = args.llm_latency
+    Config.FAKE_LLM_TOKENS_PER_SECOND = args.tokens_per_second
+    Config.FAKE_EMBEDDING_LATENCY_SECONDS = args.embed_latency
+    Config.RETRIEVAL_COSINE_THRESHOLDS = {
+        **Config.RETRIEVAL_COSINE_THRESHOLDS,
+        "hash": args.min_score,
+    }
+    queries = synthetic_queries(args.queries, args.distinct_queries)
+
+    workloads = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for corpus_size in args.corpus_sizes:
+            Config.NUMPY_INDEX_DIR = Path(tmp) / f"index-{corpus_size}"
+            build_synthetic_index(Config.NUMPY_INDEX_DIR, corpus_size).close()
+            for k, concurrency, cache in itertools.product(args.k, args.concurrency, args.cache):
+                Config.RETRIEVAL_TOP_K = k
+                Config.ANSWER_CACHE_ENABLED = cache == "on"
+                params = {
+                    "corpus_size": corpus_size,
+                    "k": k,
+                    "concurrency": concurrency,
+                    "cache": cache,
+                }
+                stats = run_workload(queries, concurrency, args.faithfulness)
+                workloads.append({**params, **stats})
+                if not args.json:
+                    w = workloads[-1]
+                    print(
+                        f"corpus={corpus_size:<7} k={k:<3} "
+                        f"concurrency={concurrency:<3} cache={cache:<3} "
+                        f"{w['throughput_qps']:>8.1f} q/s  p50={w['latency_ms']['p50']:.1f}ms "
+                        f"p95={w['latency_ms']['p95']:.1f}ms p99={w['latency_ms']['p99']:.1f}ms"
+                    )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "queries": args.queries,
+            "distinct_queries": args.distinct_queries,
+            "llm_latency_s": args.llm_latency,
+            "tokens_per_second": args.tokens_per_second,
+            "embed_latency_s": args.embed_latency,
+            "min_score": args.min_score,
+            "faithfulness": args.faithfulness,
+        },
+        "workloads": workloads,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        if not args.json:
+            print(f"\nReport saved to {args.output}")
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from src.config import Config
+
+
+def normalize_query(text: str) -> str:
+    """
+    Lowercases, drops punctuation and collapses whitespace
+    ("Yield sign rules?" -> "yield sign rules").
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def knowledge_base_version(manifest_path: Path = None):
+    """
+    Identifies the current ingest. Every ingest that changes the store rewrites
+    the manifest, so its (mtime, size) changes whenever cached answers go stale.
+    """
+    try:
+        stat = Path(manifest_path or Config.INGEST_MANIFEST_FILE).stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class AnswerCache:
+    """
+    In-memory cache of full `run_query` results with two lookup tiers:
+      1. exact  - the normalized query text
+      2. semantic - cosine similarity of the query embedding to a cached
+         query's embedding, at or above `similarity_threshold`
+
+    Entries expire after `ttl_seconds`, the least recently used entry is evicted
+    beyond `max_entries`, and everything is dropped when the knowledge base
+    version changes (i.e. after a re-ingest). Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl_seconds: float = None,
+        similarity_threshold: float = None,
+        version_fn=knowledge_base_version,
+    ):
+        self.max_entries = max_entries or Config.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else Config.ANSWER_CACHE_TTL_SECONDS
+        )
+        self.similarity_threshold = (
+            similarity_threshold
+            if similarity_threshold is not None
+            else Config.ANSWER_CACHE_SIMILARITY_THRESHOLD
+        )
+        self.version_fn = version_fn
+        self._version = version_fn()
+        self._entries = OrderedDict()  # normalized query -> entry dict
+        self._lock = threading.Lock()
+
+        # Query embeddings live in one matrix so the semantic tier is a single matmul
+        self._vectors = None
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self._slot_keys = [None] * self.max_entries
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        """Clears the cache if the knowledge base was re-ingested. Caller holds the lock."""
+        version = self.version_fn()
+        if version != self._version:
+            self._clear()
+            self._version = version
+            self.invalidations += 1
+
+    def _clear(self):
+        self._entries.clear()
+        self._vectors = None
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self._slot_keys = [None] * self.max_entries
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        if entry["slot"] is not None:
+            self._slot_keys[entry["slot"]] = None
+            self._free_slots.append(entry["slot"])
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created"] > self.ttl_seconds
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _semantic_match(self, query_vector, now: float):
+        """Key of the most similar live entry above the threshold. Caller holds the lock."""
+        if self._vectors is None or len(self._free_slots) == self.max_entries:
+            return None
+        scores = self._vectors @ self._unit(query_vector)
+        for slot in np.argsort(-scores):
+            key = self._slot_keys[slot]
+            if scores[slot] < self.similarity_threshold:
+                return None
+            if key is None:
+                continue
+            if self._expired(self._entries[key], now):
+                self._remove(key)
+                self.expirations += 1
+                continue
+            return key
+        return None
+
+    def get(self, query: str, embed=None):
+        """
+        Returns (result, tier) with tier "exact" or "semantic", or (None, None)
+        on a miss. `embed(query)` returns the query embedding and enables the
+        semantic tier; it is only called when the exact tier misses.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            self._check_version()
+            entry = self._lookup_exact(key, time.monotonic())
+            if entry is not None:
+                self.exact_hits += 1
+                return copy.deepcopy(entry["result"]), "exact"
+
+        if embed is not None and self.similarity_threshold:
+            # Embedding may be a network call, so it runs outside the lock
+            query_vector = embed(query)
+            with self._lock:
+                match = self._semantic_match(query_vector, time.monotonic())
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return copy.deepcopy(self._entries[match]["result"]), "semantic"
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def _lookup_exact(self, key: str, now: float):
+        """Returns the live entry for `key`, refreshing its recency. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry, now):
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, query: str, result: dict, embed=None):
+        """Caches a result; `embed(query)` makes it reachable through the semantic tier."""
+        key = normalize_query(query)
+        query_vector = embed(query) if embed is not None and self.similarity_threshold else None
+        with self._lock:
+            self._check_version()
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+            slot = None
+            if query_vector is not None:
+                vector = self._unit(query_vector)
+                if self._vectors is None:
+                    self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                slot = self._free_slots.pop()
+                self._vectors[slot] = vector
+                self._slot_keys[slot] = key
+
+            self._entries[key] = {
+                "result": copy.deepcopy(result),
+                "created": time.monotonic(),
+                "slot": slot,
+            }
+
+    def invalidate(self, query: str = None):
+        """Drops one query's entry, or everything when `query` is None."""
+        with self._lock:
+            if query is None:
+                self._clear()
+                self.invalidations += 1
+                return
+            key = normalize_query(query)
+            if key in self._entries:
+                self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "entries": len(self),
+        }
@@ -20,15 +20,142 @@ class Config:
     OUTPUT_DIR = BASE_DIR / "output"
     KB_DIR = BASE_DIR / "knowledge_base"
     CHROMA_DB_DIR = KB_DIR / "chroma_db"
+    INGEST_MANIFEST_FILE = KB_DIR / "ingest_manifest.json"
+    INGEST_CHECKPOINT_FILE = KB_DIR / "ingest_checkpoint.log"
+    NUMPY_INDEX_DIR = KB_DIR / "numpy_index"
+    IVF_INDEX_FILE = KB_DIR / "ivf_index.npz"
+    BM25_INDEX_FILE = KB_DIR / "bm25_index.npz"
+
+    # Retrieval Backend: "chroma" or "numpy" (memory-mapped exact cosine index)
+    RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma")
+    RETRIEVAL_TOP_K = 4
+    NUMPY_INDEX_ENABLED = True  # Export the NumPy index at the end of every ingest
+    NUMPY_INDEX_DTYPE = "float32"  # or "float16" to halve the index size
+
+    # Approximate (IVF) index over the NumPy index, used by RETRIEVER_BACKEND="ivf"
+    IVF_INDEX_ENABLED = True  # Train the IVF index at the end of every ingest
+    IVF_NLIST = None  # Number of clusters (None = about 4 * sqrt(rows))
+    IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))  # Clusters scanned per query
+    IVF_TRAIN_ITERATIONS = 20
+
+    # Lexical BM25 index fused with dense search, used by RETRIEVER_BACKEND="hybrid"
+    BM25_INDEX_ENABLED = True  # Build the inverted index at the end of every ingest
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+    HYBRID_TOP_K = 3  # Fused ranking is more precise, so fewer chunks reach the prompt
+    HYBRID_CANDIDATES = 20  # Depth of each ranking fed into the fusion
+    RRF_K = 60  # Reciprocal rank fusion damping constant
+
+    # Embedding Backend: "jina" (remote API), "local" (in-process Hugging Face model on CPU)
+    # or "hash" (src/fakes.py feature-hashing stand-in for offline benchmarks)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "jina")
+    LOCAL_EMBEDDING_MODEL = os.getenv(
+        "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+    )
+    LOCAL_EMBEDDING_BATCH_SIZE = 32
+    LOCAL_EMBEDDING_THREADS = None  # None = torch default (all cores)
+    HASH_EMBEDDING_DIM = 384
+    FAKE_EMBEDDING_LATENCY_SECONDS = float(os.getenv("FAKE_EMBEDDING_LATENCY_SECONDS", "0"))
+
+    # LLM Backend: "openrouter" or "fake" (src/fakes.py stand-in: no network, no API keys)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openrouter")
+    # Time to first token, then streaming speed (0 tokens/s = instant)
+    FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.2"))
+    FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "100"))
+
+    # Embedding Cache Settings
+    EMBEDDING_CACHE_ENABLED = True
+    EMBEDDING_CACHE_FILE = KB_DIR / "embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES = 50_000
+
+    # Answer Cache (in-memory, cleared automatically after every re-ingest)
+    ANSWER_CACHE_ENABLED = True
+    ANSWER_CACHE_MAX_ENTRIES = 1024
+    ANSWER_CACHE_TTL_SECONDS = 3600  # 0 = never expire
+    ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95  # Cosine cut-off for paraphrases (0 = exact tier only)
+
+    # Ingestion Parsing (None = one worker process per CPU core)
+    CHUNK_SIZE = 1000
+    CHUNK_OVERLAP = 200
+    INGEST_WORKERS = None
+    PDF_PAGES_PER_TASK = 8
+    PIPELINE_QUEUE_SIZE = 256
+
+    # Near-Duplicate Chunk Elimination (MinHash over word shingles + LSH banding)
+    DEDUP_ENABLED = True
+    DEDUP_THRESHOLD = 0.85
+    DEDUP_NUM_PERM = 64
+    DEDUP_BANDS = 16
+    DEDUP_SHINGLE_SIZE = 5
+
+    # Ingestion Embedding Pipeline
+    EMBED_BATCH_SIZE = 32
+    EMBED_CONCURRENCY = 4
+    EMBED_MAX_RETRIES = 5
+    EMBED_BACKOFF_SECONDS = 2.0
+
+    # Faithfulness Evaluation (background judge, off the request path)
+    EVAL_BACKGROUND = True  # False = judge inline before run_query returns
+    EVAL_SAMPLE_RATE = float(os.getenv("EVAL_SAMPLE_RATE", "0.5"))  # Fraction of answers judged
+    EVAL_WORKERS = 2
+    EVAL_BATCH_SIZE = 8  # Answers judged per LLM call
+    EVAL_BATCH_LINGER_SECONDS = 2.0  # Max wait for a partial batch to fill
+    EVAL_RESULTS_MAX_ENTRIES = 4096  # Finished scores kept for join_results (LRU)
+    # Local first-stage scorer: only answers scored between the thresholds go to the LLM judge
+    FAITHFULNESS_LOCAL_FIRST = True
+    FAITHFULNESS_ACCEPT_THRESHOLD = 0.75
+    FAITHFULNESS_REJECT_THRESHOLD = 0.35
+    # Share of locally decided answers also sent to the judge, to measure agreement
+    FAITHFULNESS_AUDIT_RATE = 0.1
+    FAITHFULNESS_LOCAL_EMBEDDINGS = False  # Blend in local-model sentence similarity
+    FAITHFULNESS_SEMANTIC_WEIGHT = 0.5
+    EVAL_RESULTS_FILE = OUTPUT_DIR / "faithfulness.jsonl"
 
     # Security Guardrail Settings
     MAX_QUERY_LENGTH = 500
     MAX_RESPONSE_WORDS = 500
-    RETRIEVAL_CONFIDENCE_THRESHOLD = 0.7
+    RETRIEVAL_CONFIDENCE_THRESHOLD = 0.7  # Chroma retriever (its documents carry no score)
+    # The numpy, ivf and hybrid backends score documents by raw cosine similarity,
+    # whose range depends on the embedding model: cut-off per EMBEDDING_BACKEND
+    RETRIEVAL_COSINE_THRESHOLDS = {"jina": 0.3, "local": 0.3, "hash": 0.0}
     LLM_TIMEOUT_SECONDS = 30
+    EXECUTION_POOL_WORKERS = 32  # Threads available for concurrent time-limited calls
+
+    # Batch Query Scheduling (run_batch / automated mode)
+    LLM_PROVIDER = "fake" if LLM_BACKEND == "fake" else "openrouter"  # The fake is not rate limited
+    PROVIDER_RATE_LIMITS = {"openrouter": (20 / 60, 5)}  # provider -> (requests/sec, burst)
+    QUERY_CONCURRENCY = 4  # Starting number of queries in flight
+    QUERY_MAX_CONCURRENCY = 8  # Ceiling for adaptive concurrency
+    QUERY_MAX_RETRIES = 5  # Retries per query after a 429
+    QUERY_BACKOFF_SECONDS = 5.0  # Base backoff when a 429 carries no Retry-After
+
+    # Load Testing (main.py --mode loadtest)
+    LOADTEST_DURATION_SECONDS = 30.0  # Measured window
+    LOADTEST_WARMUP_SECONDS = 5.0  # Run before the window, not measured
+    LOADTEST_MAX_IN_FLIGHT = 32  # Open-loop threads (capped at EXECUTION_POOL_WORKERS)
+    LOADTEST_PROGRESS_SECONDS = 1.0
+    LOADTEST_CORPUS_SIZE = 2000  # Synthetic chunks indexed for --stand-ins
+
+    # Per-stage latency metrics (src/metrics.py): trace on every result, process-wide histograms
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_FILE = OUTPUT_DIR / "metrics.prom"  # Prometheus text format (textfile collector)
+    METRICS_EXPORT_SECONDS = 15.0
+    # Histogram upper bounds in seconds: 0.1 ms to ~80 s, each 25% above the last
+    METRICS_LATENCY_BUCKETS = tuple(round(0.0001 * 1.25**i, 7) for i in range(62))
 
     SECURITY_LOG_DIR = BASE_DIR / "logs"
     SECURITY_LOG_FILE = SECURITY_LOG_DIR / "security.log"
+    # Audit log: JSON lines written by a background listener (src/security/audit_log.py)
+    AUDIT_LOG_QUEUE_SIZE = 10_000  # Records waiting to be written
+    # Queue full: "drop" the record, or "block" up to AUDIT_LOG_BLOCK_SECONDS then drop
+    AUDIT_LOG_OVERFLOW = "drop"
+    AUDIT_LOG_BLOCK_SECONDS = 0.05
+    AUDIT_LOG_BATCH_SIZE = 64  # Records per file flush
+    AUDIT_LOG_FLUSH_SECONDS = 1.0  # Flush a partial batch after this much idle time
+    AUDIT_LOG_ROTATION = "size"  # "size" (AUDIT_LOG_MAX_BYTES) or "time" (AUDIT_LOG_ROTATE_WHEN)
+    AUDIT_LOG_MAX_BYTES = 10 * 1024 * 1024
+    AUDIT_LOG_ROTATE_WHEN = "midnight"
+    AUDIT_LOG_BACKUPS = 5
 
     PII_PATTERNS = {
         "email": r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+",
@@ -36,6 +163,10 @@ class Config:
         "license_plate": r"\b[A-Z]{3}[-\s]?\d{3,4}\b|\b\d{3,4}[-\s]?[A-Z]{3}\b",
     }
 
+    PII_PREFILTER = r"@|\d{3}"  # Every PII_PATTERNS match contains one; None to always scan
+    # Chars held back between chunks when redacting streams (>= longest match)
+    PII_STREAM_HOLDBACK = 256
+
     OFF_TOPIC_KEYWORDS = [
         "driving",
         "driver",
@@ -102,13 +233,22 @@ class Config:
 
     JAILBREAK_KEYWORDS = ["dan", "jailbreak", "unfiltered", "do anything now"]
 
+    @classmethod
+    def retrieval_confidence_threshold(cls) -> float:
+        """Minimum top-chunk score for the configured retriever and embedding backends."""
+        if cls.RETRIEVER_BACKEND in ("numpy", "ivf", "hybrid"):
+            return cls.RETRIEVAL_COSINE_THRESHOLDS.get(
+                cls.EMBEDDING_BACKEND, cls.RETRIEVAL_CONFIDENCE_THRESHOLD
+            )
+        return cls.RETRIEVAL_CONFIDENCE_THRESHOLD
+
     @classmethod
     def validate_keys(cls):
         """Validates that necessary API keys are present."""
         missing_keys = []
-        if not cls.JINA_API_KEY:
+        if cls.EMBEDDING_BACKEND == "jina" and not cls.JINA_API_KEY:
             missing_keys.append("JINA_API_KEY")
-        if not cls.GROQ_API_KEY:
+        if cls.LLM_BACKEND != "fake" and not cls.GROQ_API_KEY:
             missing_keys.append("GROQ_API_KEY")
 
         if missing_keys:
@@ -0,0 +1,103 @@
+import hashlib
+import re
+import numpy as np
+from src.config import Config
+
+# Mersenne prime 2^31 - 1: keeps (a * x + b) inside uint64 for 31-bit shingle hashes
+_PRIME = np.uint64((1 << 31) - 1)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class MinHashDeduplicator:
+    """
+    Streaming near-duplicate filter using MinHash signatures over word shingles
+    and locality-sensitive hashing (banding) to find candidate matches.
+
+    Texts are compared by estimated Jaccard similarity of their shingle sets.
+    A text whose similarity to any previously kept text reaches `threshold`
+    is reported as a duplicate; otherwise it is added to the index.
+    """
+
+    def __init__(
+        self,
+        threshold: float = None,
+        num_perm: int = None,
+        bands: int = None,
+        shingle_size: int = None,
+        seed: int = 5550,
+    ):
+        self.threshold = threshold or Config.DEDUP_THRESHOLD
+        self.num_perm = num_perm or Config.DEDUP_NUM_PERM
+        self.bands = bands or Config.DEDUP_BANDS
+        self.shingle_size = shingle_size or Config.DEDUP_SHINGLE_SIZE
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.rows = self.num_perm // self.bands
+
+        # Fixed seed keeps signatures stable across runs (incremental/resume)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=self.num_perm, dtype=np.uint64)
+
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+        self.checked = 0
+        self.removed = 0
+
+    def _shingles(self, text: str) -> set:
+        words = _WORD_RE.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self._shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, int(_PRIME), dtype=np.uint64)
+        hashes = np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little"
+                )
+                & 0x7FFFFFFF
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows].tobytes()
+
+    def add(self, text: str):
+        """Indexes a text as kept without checking it (e.g. chunks already in the store)."""
+        self._insert(self.signature(text))
+
+    def _insert(self, signature: np.ndarray):
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(index)
+
+    def is_duplicate(self, text: str) -> bool:
+        """Returns True for a near-duplicate of an indexed text; otherwise indexes it."""
+        self.checked += 1
+        signature = self.signature(text)
+
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        for index in candidates:
+            similarity = np.mean(self._signatures[index] == signature)
+            if similarity >= self.threshold:
+                self.removed += 1
+                return True
+
+        self._insert(signature)
+        return False
@@ -1,5 +1,15 @@
+import threading
 from langchain_community.embeddings import JinaEmbeddings
+from langchain_core.embeddings import Embeddings
 from src.config import Config
+from src.embedding_cache import CachedEmbeddings, get_embedding_cache
+
+
+def _with_cache(model: Embeddings, model_name: str) -> Embeddings:
+    """Wraps a model in the on-disk embedding cache if caching is enabled."""
+    if Config.EMBEDDING_CACHE_ENABLED:
+        return CachedEmbeddings(model, get_embedding_cache(), model_name)
+    return model
 
 
 class JinaEmbeddingModel:
@@ -21,19 +31,147 @@ class JinaEmbeddingModel:
         self.model_name = model_name
         self._model = self._create_embeddings_model(model_name)
 
-    def _create_embeddings_model(self, model_name: str) -> JinaEmbeddings:
-        """Create and return the JinaEmbeddings instance."""
+    def _create_embeddings_model(self, model_name: str):
+        """Create the JinaEmbeddings instance, wrapped in the on-disk cache if enabled."""
         try:
-            return JinaEmbeddings(jina_api_key=self.api_key, model_name=model_name)
+            model = JinaEmbeddings(jina_api_key=self.api_key, model_name=model_name)
         except Exception as e:
             raise RuntimeError(f"Failed to initialize Jina Embeddings: {e}")
 
+        return _with_cache(model, model_name)
+
     @property
-    def embeddings_model(self) -> JinaEmbeddings:
+    def embeddings_model(self):
         """Return the initialized embedding model."""
         return self._model
 
     @embeddings_model.setter
     def embeddings_model(self, model_name: str):
         """Set the embedding model."""
+        self.model_name = model_name
         self._model = self._create_embeddings_model(model_name)
+
+    @property
+    def cache_stats(self) -> dict:
+        """Return hit/miss counters of the embedding cache, or {} if caching is disabled."""
+        if isinstance(self._model, CachedEmbeddings):
+            return self._model.cache.stats()
+        return {}
+
+
+class LocalSentenceEmbeddings(Embeddings):
+    """
+    Runs a Hugging Face sentence-embedding model in-process on CPU.
+    Texts are encoded in batches, mean-pooled over the attention mask and
+    L2-normalised, so cosine similarity equals the dot product.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 32,
+        num_threads: int = None,
+        max_length: int = 512,
+    ):
+        # torch/transformers are heavy; only pay the import cost when this backend is selected
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self._torch = torch
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+        # One forward pass at a time; torch already parallelises inside each pass
+        self._lock = threading.Lock()
+
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        torch = self._torch
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start : start + self.batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="pt",
+            )
+            with self._lock, torch.inference_mode():
+                hidden = self.model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed([text])[0]
+
+
+class LocalEmbeddingModel:
+    def __init__(
+        self,
+        model_name: str = None,
+        batch_size: int = None,
+        num_threads: int = None,
+    ):
+        """
+        Initialize a local, in-process embedding model (no network at query time).
+
+        Args:
+            model_name (str, optional): Hugging Face model ID.
+                Defaults to Config.LOCAL_EMBEDDING_MODEL.
+            batch_size (int, optional): Texts per forward pass.
+                Defaults to Config.LOCAL_EMBEDDING_BATCH_SIZE.
+            num_threads (int, optional): Torch CPU threads.
+                Defaults to Config.LOCAL_EMBEDDING_THREADS.
+        """
+        self.model_name = model_name or Config.LOCAL_EMBEDDING_MODEL
+        self.batch_size = batch_size or Config.LOCAL_EMBEDDING_BATCH_SIZE
+        self.num_threads = num_threads or Config.LOCAL_EMBEDDING_THREADS
+        self._model = self._create_embeddings_model(self.model_name)
+
+    def _create_embeddings_model(self, model_name: str):
+        """Load the local model, wrapped in the on-disk cache if enabled."""
+        try:
+            model = LocalSentenceEmbeddings(
+                model_name, batch_size=self.batch_size, num_threads=self.num_threads
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load local embedding model {model_name}: {e}")
+
+        return _with_cache(model, f"local:{model_name}")
+
+    @property
+    def embeddings_model(self):
+        """Return the initialized embedding model."""
+        return self._model
+
+    @property
+    def cache_stats(self) -> dict:
+        """Return hit/miss counters of the embedding cache, or {} if caching is disabled."""
+        if isinstance(self._model, CachedEmbeddings):
+            return self._model.cache.stats()
+        return {}
+
+
+def get_embedding_model():
+    """Returns the embedding model chosen by Config.EMBEDDING_BACKEND: "jina", "local" or "hash"."""
+    if Config.EMBEDDING_BACKEND == "jina":
+        return JinaEmbeddingModel()
+    if Config.EMBEDDING_BACKEND == "local":
+        return LocalEmbeddingModel()
+    if Config.EMBEDDING_BACKEND == "hash":
+        # Offline stand-in; src.fakes also carries the synthetic corpus, so import it only here
+        from src.fakes import HashEmbeddingModel
+
+        return HashEmbeddingModel()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {Config.EMBEDDING_BACKEND}")
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.config import Config
+
+
+class EmbeddingPipeline:
+    """
+    Embeds chunks in fixed-size batches on a bounded thread pool and hands each
+    finished batch to `write_batch(ids, documents, vectors)` as soon as it completes.
+    Failed batches are retried with exponential backoff so a transient 429 does
+    not abort the whole ingestion.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        write_batch,
+        batch_size: int = None,
+        concurrency: int = None,
+        max_retries: int = None,
+        backoff_seconds: float = None,
+    ):
+        self.embeddings = embeddings
+        self.write_batch = write_batch
+        self.batch_size = batch_size or Config.EMBED_BATCH_SIZE
+        self.concurrency = concurrency or Config.EMBED_CONCURRENCY
+        self.max_retries = (
+            Config.EMBED_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff_seconds = (
+            Config.EMBED_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        )
+        self.stats = {"chunks": 0, "batches": 0, "retries": 0, "seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _batches(self, chunks):
+        """Groups an iterable of (chunk_id, Document) pairs into lists of batch_size."""
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _embed_with_retry(self, batch):
+        texts = [doc.page_content for _, doc in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                return batch, self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                # Exponential backoff with jitter so parallel workers do not retry in lockstep
+                delay = self.backoff_seconds * (2**attempt) * (0.5 + random.random())
+                with self._stats_lock:
+                    self.stats["retries"] += 1
+                print(
+                    f"Embedding batch failed ({e}). "
+                    f"Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s..."
+                )
+                time.sleep(delay)
+
+    def _write(self, future):
+        batch, vectors = future.result()
+        self.write_batch(
+            [chunk_id for chunk_id, _ in batch], [doc for _, doc in batch], vectors
+        )
+        self.stats["chunks"] += len(batch)
+        self.stats["batches"] += 1
+
+    def throughput(self) -> float:
+        """Chunks per second over the run so far."""
+        return self.stats["chunks"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+
+    def run(self, chunks) -> dict:
+        """
+        Embeds and writes every chunk. At most `2 * concurrency` batches are in
+        flight at once, so memory stays bounded even for a very long input.
+        """
+        start = time.perf_counter()
+        max_in_flight = self.concurrency * 2
+        in_flight = set()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for batch in self._batches(chunks):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._write(future)
+                    self._report(start)
+                in_flight.add(executor.submit(self._embed_with_retry, batch))
+
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._write(future)
+                self._report(start)
+
+        self.stats["seconds"] = time.perf_counter() - start
+        print(
+            f"Embedded {self.stats['chunks']} chunks in {self.stats['batches']} batches "
+            f"({self.throughput():.1f} chunks/sec, {self.stats['retries']} retries)"
+        )
+        return self.stats
+
+    def _report(self, start: float):
+        self.stats["seconds"] = time.perf_counter() - start
+        print(
+            f"  ...{self.stats['chunks']} chunks written ({self.throughput():.1f} chunks/sec)"
+        )
@@ -0,0 +1,185 @@
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from src.config import Config
+from src.scheduler import get_rate_limiter
+
+
+class JsonlResultSink:
+    """Appends one JSON object per finished evaluation to a file (thread-safe)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict):
+        line = json.dumps(record)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class FaithfulnessQueue:
+    """
+    Runs faithfulness checks on a background worker pool so answers return
+    without waiting for the judge. A `sample_rate` fraction of submitted answers
+    is evaluated. Sampled answers are judged `batch_size` at a time with
+    RAGEvaluator.check_faithfulness_batch; a partial batch is sent after
+    `linger_seconds`, or at once by `flush`/`drain`. Each finished score is
+    recorded in RAGEvaluator.stats (by the evaluator itself) and passed to
+    `sink`. It is also kept in `results` under its query id, so `join_results`
+    can fill it into result dicts; only the `max_results` most recently
+    finished or joined scores are kept.
+    """
+
+    def __init__(
+        self,
+        evaluator,
+        workers: int = None,
+        sample_rate: float = None,
+        sink=None,
+        limiter=None,
+        seed=None,
+        batch_size: int = None,
+        linger_seconds: float = None,
+        max_results: int = None,
+    ):
+        self.evaluator = evaluator
+        self.sample_rate = sample_rate if sample_rate is not None else Config.EVAL_SAMPLE_RATE
+        self.sink = sink
+        self.batch_size = batch_size or Config.EVAL_BATCH_SIZE
+        self.linger_seconds = (
+            linger_seconds if linger_seconds is not None else Config.EVAL_BATCH_LINGER_SECONDS
+        )
+        self.max_results = max_results or Config.EVAL_RESULTS_MAX_ENTRIES
+        self.results = OrderedDict()
+        self.stats = {"submitted": 0, "sampled_out": 0, "completed": 0, "failed": 0, "batches": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pending = {}  # future -> number of answers in its batch
+        self._buffer = []
+        self._timer = None
+        # Shares the provider's rate limit with live queries by default
+        self._limiter = limiter or get_rate_limiter(Config.LLM_PROVIDER)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or Config.EVAL_WORKERS, thread_name_prefix="faithfulness"
+        )
+
+    def submit(self, query: str, answer: str, context: str, query_id: str = None):
+        """Queues an evaluation. Returns its query id, or None if it was sampled out."""
+        with self._lock:
+            self.stats["submitted"] += 1
+            if self._random.random() >= self.sample_rate:
+                self.stats["sampled_out"] += 1
+                return None
+        query_id = query_id or uuid.uuid4().hex
+        with self._lock:
+            self._buffer.append((query_id, query, answer, context))
+            full = len(self._buffer) >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.linger_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return query_id
+
+    def flush(self):
+        """Sends the buffered (possibly partial) batch to the worker pool now."""
+        with self._lock:
+            jobs, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not jobs:
+                return
+            future = self._executor.submit(self._evaluate, jobs)
+            self._pending[future] = len(jobs)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.pop(future, None)
+
+    def _evaluate(self, jobs: list):
+        # One bucket token per judge call (batch or single-item fallback), not per answer
+        start = time.perf_counter()
+        try:
+            scores = self.evaluator.check_faithfulness_batch(
+                [(query, answer, context) for _, query, answer, context in jobs],
+                batch_size=self.batch_size,
+                acquire=self._limiter.acquire,
+            )
+        except Exception as e:
+            logging.warning(f"Background faithfulness evaluation failed: {e}")
+            with self._lock:
+                self.stats["failed"] += len(jobs)
+            return
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self.stats["batches"] += 1
+            for (query_id, *_), score in zip(jobs, scores):
+                self.results[query_id] = score
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+            self.stats["completed"] += len(jobs)
+        if self.sink is not None:
+            for (query_id, query, _, _), score in zip(jobs, scores):
+                self.sink(
+                    {
+                        "query_id": query_id,
+                        "query": query,
+                        "faithfulness": score,
+                        "latency_ms": latency_ms,
+                        "batch_size": len(jobs),
+                        "timestamp": time.time(),
+                    }
+                )
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._pending.values()) + len(self._buffer)
+
+    def drain(self, timeout: float = None) -> bool:
+        """Waits for queued evaluations to finish. Returns False if `timeout` ran out first."""
+        self.flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return True
+            for future in pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                try:
+                    future.result(timeout=remaining)
+                except Exception:
+                    pass
+
+    def join_results(self, results: list) -> list:
+        """
+        Fills finished scores into result dicts whose faithfulness is still
+        pending. Cache hits are looked up under the query they were cached from.
+        """
+        with self._lock:
+            for result in results:
+                query_id = result.get("cached_from", result.get("query_id"))
+                if query_id in self.results:
+                    # Still referenced by cached answers: keep it recently used
+                    self.results.move_to_end(query_id)
+                    result["eval"]["faithfulness"] = self.results[query_id]
+        return results
+
+    def close(self, wait: bool = True):
+        self.flush()
+        self._executor.shutdown(wait=wait)
@@ -1,34 +1,47 @@
 import logging
 import json
+import random
+import re
+import threading
+import time
 from src.config import Config
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from src.embedder import LocalEmbeddingModel
+from src.faithfulness_scorer import LocalFaithfulnessScorer
 
 
 class RAGEvaluator:
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, local_scorer=None):
         self.llm = llm  # Passed from RAGQueryEngine
+        self.local_scorer = local_scorer or LocalFaithfulnessScorer(
+            embeddings=(
+                LocalEmbeddingModel().embeddings_model
+                if Config.FAITHFULNESS_LOCAL_EMBEDDINGS
+                else None
+            )
+        )
+        self.local_first = Config.FAITHFULNESS_LOCAL_FIRST
         self.stats = {
             "total_queries": 0,
             "guardrails_triggered": {},
             "faithfulness_scores": [],
             "relevance_scores": [],
+            "faithfulness_stages": {
+                "local_calls": 0,
+                "local_ms": 0.0,
+                "llm_calls": 0,
+                "llm_ms": 0.0,
+                "escalated": 0,
+                "audited": 0,
+                "compared": 0,
+                "agreed": 0,
+            },
         }
+        self._lock = threading.Lock()  # Queries may run concurrently (run_batch)
+        self._random = random.Random()
 
-    def check_faithfulness(self, query: str, answer: str, context: str):
-        """
-        Uses LLM to evaluate if the answer is faithful to the retrieved context.
-        Returns 1.0 (Yes), 0.0 (No), or "N/A".
-        """
-        if (
-            not answer
-            or not context
-            or "sorry" in answer.lower()
-            or "i don't know" in answer.lower()
-        ):
-            return "N/A"
-
-        prompt = ChatPromptTemplate.from_template("""
+    FAITHFULNESS_PROMPT = ChatPromptTemplate.from_template("""
         You are an evaluator for a RAG system. 
         Your task is to determine if the provided Answer is faithful to the Given Context.
         
@@ -43,27 +56,237 @@ class RAGEvaluator:
         
         Faithful (Yes/No):""")
 
-        # LLM-based verification
-        if self.llm:
-            try:
-                chain = prompt | self.llm | StrOutputParser()
-                result = chain.invoke(
-                    {"context": context, "query": query, "answer": answer}
-                ).strip()
-            except Exception as e:
-                logging.warning(
-                    f"Evaluation LLM failed: {e}. Using heuristic fallback."
-                )
-                result = self._heuristic_faithfulness(answer, context)
-        else:
-            result = self._heuristic_faithfulness(answer, context)
+    BATCH_FAITHFULNESS_PROMPT = ChatPromptTemplate.from_template("""
+        You are an evaluator for a RAG system.
+        For each numbered item below, determine if its Answer is faithful to its Given Context.
+
+        Rules:
+        1. Answer 'Yes' if the answer is strictly supported by the context.
+        2. Answer 'No' if the answer contains information not present in the context
+           (hallucinations).
+        3. Do not use your own knowledge; only use each item's own Given Context.
+        4. Reply with exactly one line per item in the form "<number>: Yes" or
+           "<number>: No", and nothing else.
 
-        score = 1.0 if "yes" in result.lower() else 0.0
-        self.stats["faithfulness_scores"].append(score)
+        {items}
+
+        Verdicts:""")
+
+    # Matches verdict lines such as "3: Yes", "[3] No", "Item 3: yes" or "3. **No**"
+    VERDICT_PATTERN = re.compile(
+        r"^\s*(?:item\s*)?\[?(\d+)\]?\s*[:.)\-]?\s*\**\s*(yes|no)\b", re.IGNORECASE | re.MULTILINE
+    )
+
+    @staticmethod
+    def _skip_faithfulness(answer: str, context: str) -> bool:
+        return (
+            not answer
+            or not context
+            or "sorry" in answer.lower()
+            or "i don't know" in answer.lower()
+        )
+
+    def _record_faithfulness(self, result) -> float:
+        # The heuristic fallback returns a numeric score rather than a Yes/No verdict
+        if isinstance(result, float):
+            score = result
+        else:
+            score = 1.0 if "yes" in result.lower() else 0.0
+        with self._lock:
+            self.stats["faithfulness_scores"].append(score)
         return score
 
-    def _heuristic_faithfulness(self, answer: str, context: str) -> float:
-        """Fallback heuristic when LLM is unavailable."""
+    def _record_stage(self, stage: str, start: float, calls: int = 1):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stages = self.stats["faithfulness_stages"]
+            stages[f"{stage}_calls"] += calls
+            stages[f"{stage}_ms"] += elapsed_ms
+
+    def _local_stage(self, answer: str, context: str):
+        """
+        Scores the answer locally. Returns (local score, escalate): escalate is
+        True for borderline scores and for a FAITHFULNESS_AUDIT_RATE sample of
+        the rest, so agreement with the LLM judge can be measured.
+        """
+        if not self.local_first:
+            return None, True
+        start = time.perf_counter()
+        score = self.local_scorer.score(answer, context)
+        self._record_stage("local", start)
+        borderline = (
+            Config.FAITHFULNESS_REJECT_THRESHOLD < score < Config.FAITHFULNESS_ACCEPT_THRESHOLD
+        )
+        audited = not borderline and self._random.random() < Config.FAITHFULNESS_AUDIT_RATE
+        with self._lock:
+            stages = self.stats["faithfulness_stages"]
+            stages["escalated"] += borderline
+            stages["audited"] += audited
+        return score, borderline or audited
+
+    def _record_agreement(self, local_score, verdict: str):
+        if local_score is None:
+            return
+        midpoint = (
+            Config.FAITHFULNESS_ACCEPT_THRESHOLD + Config.FAITHFULNESS_REJECT_THRESHOLD
+        ) / 2
+        agreed = (local_score >= midpoint) == ("yes" in verdict.lower())
+        with self._lock:
+            self.stats["faithfulness_stages"]["compared"] += 1
+            self.stats["faithfulness_stages"]["agreed"] += agreed
+
+    def _judge(self, query: str, answer: str, context: str, local_score=None) -> float:
+        """Second stage: asks the LLM judge, falling back to the local score if it fails."""
+        start = time.perf_counter()
+        try:
+            chain = self.FAITHFULNESS_PROMPT | self.llm | StrOutputParser()
+            verdict = chain.invoke({"context": context, "query": query, "answer": answer})
+        except Exception as e:
+            verdict = e
+        return self._judge_verdict(verdict, start, answer, context, local_score)
+
+    async def _ajudge(self, query: str, answer: str, context: str, local_score=None) -> float:
+        """Async variant of _judge (awaits the LLM instead of blocking)."""
+        start = time.perf_counter()
+        try:
+            chain = self.FAITHFULNESS_PROMPT | self.llm | StrOutputParser()
+            verdict = await chain.ainvoke({"context": context, "query": query, "answer": answer})
+        except Exception as e:
+            verdict = e
+        return self._judge_verdict(verdict, start, answer, context, local_score)
+
+    def _judge_verdict(
+        self, verdict, start: float, answer: str, context: str, local_score
+    ) -> float:
+        """Records a judge call's verdict, or falls back to the local score if the call raised."""
+        if isinstance(verdict, Exception):
+            logging.warning(f"Evaluation LLM failed: {verdict}. Using heuristic fallback.")
+            return self._record_faithfulness(
+                self._heuristic_faithfulness(answer, context, local_score)
+            )
+        verdict = verdict.strip()
+        self._record_stage("llm", start)
+        self._record_agreement(local_score, verdict)
+        return self._record_faithfulness(verdict)
+
+    def check_faithfulness(self, query: str, answer: str, context: str):
+        """
+        Evaluates if the answer is faithful to the retrieved context. The local
+        scorer decides clear cases (returning its continuous score); borderline
+        answers go to the LLM judge. Returns a score in [0, 1], or "N/A".
+        """
+        if self._skip_faithfulness(answer, context):
+            return "N/A"
+
+        local_score, escalate = self._local_stage(answer, context)
+        if self.llm and escalate:
+            return self._judge(query, answer, context, local_score)
+        return self._record_faithfulness(
+            self._heuristic_faithfulness(answer, context, local_score)
+        )
+
+    async def acheck_faithfulness(self, query: str, answer: str, context: str):
+        """Async variant of check_faithfulness (awaits the LLM instead of blocking)."""
+        if self._skip_faithfulness(answer, context):
+            return "N/A"
+
+        local_score, escalate = self._local_stage(answer, context)
+        if self.llm and escalate:
+            return await self._ajudge(query, answer, context, local_score)
+        return self._record_faithfulness(
+            self._heuristic_faithfulness(answer, context, local_score)
+        )
+
+    @staticmethod
+    def _format_batch(items: list) -> str:
+        return "\n\n".join(
+            f"Item {number}:\nGiven Context: {context}\nQuery: {query}\nAnswer: {answer}"
+            for number, (query, answer, context) in enumerate(items, start=1)
+        )
+
+    @classmethod
+    def _parse_verdicts(cls, text: str, count: int) -> dict:
+        """Maps each item number (1-based) to its first 'Yes'/'No' verdict."""
+        verdicts = {}
+        for match in cls.VERDICT_PATTERN.finditer(text):
+            number = int(match.group(1))
+            if 1 <= number <= count and number not in verdicts:
+                verdicts[number] = match.group(2)
+        return verdicts
+
+    def check_faithfulness_batch(self, triples: list, batch_size: int = None, acquire=None) -> list:
+        """
+        Judges many (query, answer, context) triples with one LLM call per
+        `batch_size` of them instead of one call each. Returns a score per
+        triple, in order, with the same values as check_faithfulness (only
+        answers the local scorer escalates reach the judge). Items whose
+        verdict cannot be parsed (or whose batch call fails) are judged again
+        one at a time. `acquire()` (e.g. a rate limiter's) is called before
+        every judge call, single-item fallbacks included.
+        """
+        acquire = acquire or (lambda: None)
+        batch_size = batch_size or Config.EVAL_BATCH_SIZE
+        scores = ["N/A"] * len(triples)
+        todo = [
+            i for i, (_, answer, context) in enumerate(triples)
+            if not self._skip_faithfulness(answer, context)
+        ]
+        if not self.llm:
+            for i in todo:
+                scores[i] = self.check_faithfulness(*triples[i])
+            return scores
+
+        local_scores, escalated = {}, []
+        for i in todo:
+            _, answer, context = triples[i]
+            local_scores[i], escalate = self._local_stage(answer, context)
+            if escalate:
+                escalated.append(i)
+            else:
+                scores[i] = self._record_faithfulness(
+                    self._heuristic_faithfulness(answer, context, local_scores[i])
+                )
+        if not escalated:
+            return scores
+
+        batches = [
+            escalated[start : start + batch_size] for start in range(0, len(escalated), batch_size)
+        ]
+        chain = self.BATCH_FAITHFULNESS_PROMPT | self.llm | StrOutputParser()
+        for _ in batches:
+            acquire()
+        start = time.perf_counter()
+        outputs = chain.batch(
+            [{"items": self._format_batch([triples[i] for i in batch])} for batch in batches],
+            config={"max_concurrency": Config.EVAL_WORKERS},
+            return_exceptions=True,
+        )
+        self._record_stage("llm", start, calls=len(batches))
+
+        retry = []
+        for batch, output in zip(batches, outputs):
+            if isinstance(output, Exception):
+                logging.warning(f"Batch evaluation LLM failed: {output}. Judging items singly.")
+                retry.extend(batch)
+                continue
+            verdicts = self._parse_verdicts(output, len(batch))
+            for number, i in enumerate(batch, start=1):
+                if number in verdicts:
+                    self._record_agreement(local_scores[i], verdicts[number])
+                    scores[i] = self._record_faithfulness(verdicts[number])
+                else:
+                    retry.append(i)
+        if retry:
+            logging.warning(f"Could not parse {len(retry)} batch verdict(s). Judging items singly.")
+        for i in retry:
+            acquire()
+            scores[i] = self._judge(*triples[i], local_scores[i])
+        return scores
+
+    def _heuristic_faithfulness(
+        self, answer: str, context: str, local_score: float = None
+    ) -> float:
+        """Used when the LLM judge is unavailable, failed, or was not needed: the local score."""
         if any(
             ref in answer.lower()
             for ref in [
@@ -74,16 +297,34 @@ class RAGEvaluator:
             ]
         ):
             return 1.0
-        return 1.0 if len(context) > 100 else 0.0
+        if local_score is None:
+            local_score = self.local_scorer.score(answer, context)
+        return local_score
+
+    def faithfulness_stage_report(self) -> dict:
+        """Average latency per stage and how often the local verdict matched the LLM judge."""
+        with self._lock:
+            stages = dict(self.stats["faithfulness_stages"])
+        report = {}
+        for stage in ("local", "llm"):
+            calls = stages[f"{stage}_calls"]
+            report[f"{stage}_calls"] = calls
+            report[f"{stage}_avg_ms"] = stages[f"{stage}_ms"] / calls if calls else 0.0
+        report["escalated"] = stages["escalated"]
+        report["audited"] = stages["audited"]
+        report["compared"] = stages["compared"]
+        report["agreement"] = stages["agreed"] / stages["compared"] if stages["compared"] else None
+        return report
 
     def calculate_retrieval_relevance(
-        self, chunks: list, threshold: float = None
+        self, chunks: list, threshold: float = None, record: bool = True
     ) -> dict:
         """
-        Calculates relevance metrics based on chunk similarity scores.
+        Calculates relevance metrics based on chunk similarity scores. With
+        `record=False` the caller records the score later (`record_relevance`).
         """
         if threshold is None:
-            threshold = Config.RETRIEVAL_CONFIDENCE_THRESHOLD
+            threshold = Config.retrieval_confidence_threshold()
 
         scores = []
         for chunk in chunks:
@@ -96,9 +337,10 @@ class RAGEvaluator:
                 scores.append(1.0)
 
         avg_score = sum(scores) / len(scores) if scores else 0.0
-        top_score = scores[0] if scores else 0.0
+        top_score = max(scores) if scores else 0.0
 
-        self.stats["relevance_scores"].append(avg_score)
+        if record:
+            self.record_relevance(avg_score)
 
         return {
             "avg_relevance": avg_score,
@@ -106,13 +348,18 @@ class RAGEvaluator:
             "below_threshold": top_score < threshold,
         }
 
+    def record_relevance(self, score: float):
+        with self._lock:
+            self.stats["relevance_scores"].append(score)
+
     def log_event(self, event_type: str = None):
         """Logs security or evaluation events for the summary dashboard."""
-        self.stats["total_queries"] += 1
-        if event_type:
-            self.stats["guardrails_triggered"][event_type] = (
-                self.stats["guardrails_triggered"].get(event_type, 0) + 1
-            )
+        with self._lock:
+            self.stats["total_queries"] += 1
+            if event_type:
+                self.stats["guardrails_triggered"][event_type] = (
+                    self.stats["guardrails_triggered"].get(event_type, 0) + 1
+                )
 
     def generate_eval_summary(self) -> str:
         """Prints a summary dashboard of RAG performance and security."""
@@ -134,6 +381,20 @@ class RAGEvaluator:
         summary += f"Total Queries:         {self.stats['total_queries']}\n"
         summary += f"Avg Faithfulness:      {avg_faithfulness:.2f}\n"
         summary += f"Avg Retrieval Score:   {avg_relevance:.2f}\n"
+        stages = self.faithfulness_stage_report()
+        summary += (
+            f"Local Scorer:          {stages['local_calls']} answers, "
+            f"{stages['local_avg_ms']:.2f} ms avg\n"
+        )
+        summary += (
+            f"LLM Judge:             {stages['llm_calls']} calls, "
+            f"{stages['llm_avg_ms']:.0f} ms avg\n"
+        )
+        if stages["agreement"] is not None:
+            summary += (
+                f"Stage Agreement:       {stages['agreement']:.0%} "
+                f"of {stages['compared']} compared\n"
+            )
         summary += "-" * 50 + "\n"
         summary += "GUARDRAILS TRIGGERED:\n"
         for g_type, count in self.stats["guardrails_triggered"].items():
@@ -0,0 +1,81 @@
+import re
+import numpy as np
+from src.config import Config
+from src.retrieval.bm25_index import tokenize
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _stem(token: str) -> str:
+    # Plural/singular insensitive ("signs" supports "sign") without a stemmer dependency
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _terms(text: str) -> list[str]:
+    return [_stem(t) for t in tokenize(text)]
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in SENTENCE_SPLIT.split(text) if s.strip()]
+
+
+class LocalFaithfulnessScorer:
+    """
+    Scores how well an answer is supported by its context without an LLM.
+
+    Every answer sentence gets a lexical support score: the share of its
+    content words found in the context, averaged with the share of its word
+    bigrams found there (so reordered or recombined facts score lower). With
+    `embeddings` (a local model, e.g. LocalEmbeddingModel), each sentence's
+    best cosine similarity to a context sentence is blended in with
+    `semantic_weight`. The answer score is the word-count weighted mean over
+    sentences, in [0, 1]; answers without content words score 0.5 (undecided).
+    """
+
+    def __init__(self, embeddings=None, semantic_weight: float = None):
+        self.embeddings = embeddings
+        self.semantic_weight = (
+            semantic_weight if semantic_weight is not None else Config.FAITHFULNESS_SEMANTIC_WEIGHT
+        )
+
+    @staticmethod
+    def lexical_support(
+        sentence_terms: list[str], context_terms: set, context_bigrams: set
+    ) -> float:
+        unigram = sum(t in context_terms for t in sentence_terms) / len(sentence_terms)
+        bigrams = list(zip(sentence_terms, sentence_terms[1:]))
+        if not bigrams:
+            return unigram
+        return 0.5 * unigram + 0.5 * sum(b in context_bigrams for b in bigrams) / len(bigrams)
+
+    def _semantic_support(self, sentences: list[str], context: str) -> np.ndarray:
+        context_sentences = split_sentences(context) or [context]
+        vectors = np.asarray(
+            self.embeddings.embed_documents(sentences + context_sentences), dtype=np.float32
+        )
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarity = vectors[: len(sentences)] @ vectors[len(sentences):].T
+        return np.clip(similarity.max(axis=1), 0.0, 1.0)
+
+    def score(self, answer: str, context: str) -> float:
+        context_list = _terms(context)
+        context_terms = set(context_list)
+        context_bigrams = set(zip(context_list, context_list[1:]))
+
+        sentences, weights, support = [], [], []
+        for sentence in split_sentences(answer):
+            terms = _terms(sentence)
+            if terms:
+                sentences.append(sentence)
+                weights.append(len(terms))
+                support.append(self.lexical_support(terms, context_terms, context_bigrams))
+        if not sentences:
+            return 0.5
+
+        support = np.asarray(support)
+        if self.embeddings is not None and self.semantic_weight > 0:
+            semantic = self._semantic_support(sentences, context)
+            support = (1 - self.semantic_weight) * support + self.semantic_weight * semantic
+        return float(np.average(support, weights=weights))
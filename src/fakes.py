@@ -0,0 +1,218 @@
+"""
+Deterministic local stand-ins for the remote services, so the whole query
+pipeline can be run and benchmarked offline without OpenRouter or Jina
+quota: a chat model with configurable latency and token rate
+(LLM_BACKEND="fake"), a feature-hashing embedder (EMBEDDING_BACKEND="hash")
+and a synthetic handbook-like corpus to index.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from pathlib import Path
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from src.config import Config
+from src.retrieval import NumpyIndexWriter, NumpyVectorIndex
+from src.retrieval.bm25_index import tokenize
+
+FIRST_CHUNK = re.compile(r"<chunk_1>\n(.*?)\n</chunk_1>", re.DOTALL)
+BATCH_ITEM = re.compile(r"^\s*Item (\d+):", re.MULTILINE)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers from its prompt, without a network call.
+
+    Answers are the first `answer_words` words of the first retrieved chunk,
+    so they pass the output guardrails and the faithfulness checks. Judge
+    prompts get "Yes" verdicts. Each reply takes `latency` seconds (time to
+    first token) plus one token per 1 / `tokens_per_second` seconds
+    (0 = instant); streamed replies are paced the same way, token by token.
+    """
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    answer_words: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _reply(self, messages) -> str:
+        prompt = "\n".join(str(m.content) for m in messages)
+        if "Verdicts:" in prompt:
+            return "\n".join(f"{n}: Yes" for n in BATCH_ITEM.findall(prompt))
+        if "Given Context:" in prompt:
+            return "Yes"
+        match = FIRST_CHUNK.search(prompt)
+        if match is None:
+            return "I don't know."
+        return " ".join(match.group(1).split()[: self.answer_words])
+
+    def _delays(self, reply: str):
+        """Seconds before the first token, and for the remaining tokens."""
+        per_token = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        return self.latency, per_token * len(reply.split())
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply(messages)
+        first, rest = self._delays(reply)
+        time.sleep(first + rest)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply(messages)
+        first, rest = self._delays(reply)
+        await asyncio.sleep(first + rest)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        words = self._reply(messages).split(" ")
+        time.sleep(self.latency)
+        per_token = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, word in enumerate(words):
+            time.sleep(per_token)
+            content = word if i == 0 else " " + word
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content))
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Feature-hashing bag-of-words embedder: each content word (bm25 `tokenize`)
+    adds +/-1 to one of `dim` buckets chosen by a stable hash, and the vector
+    is L2-normalised. Texts sharing words get a positive cosine similarity, so
+    retrieval over a synthetic corpus behaves sensibly. `latency` simulates a
+    remote call per request.
+    """
+
+    def __init__(self, dim: int = None, latency: float = None):
+        self.dim = dim or Config.HASH_EMBEDDING_DIM
+        self.latency = latency if latency is not None else Config.FAKE_EMBEDDING_LATENCY_SECONDS
+
+    def _vector(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            hashed = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            digest = int.from_bytes(hashed, "little")
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._vector(text)
+
+
+class HashEmbeddingModel:
+    """
+    Same interface as JinaEmbeddingModel / LocalEmbeddingModel, around
+    HashEmbeddings (never cached).
+    """
+
+    def __init__(self, dim: int = None, latency: float = None):
+        self.model_name = f"hash-{dim or Config.HASH_EMBEDDING_DIM}"
+        self._model = HashEmbeddings(dim, latency)
+
+    @property
+    def embeddings_model(self):
+        return self._model
+
+    @property
+    def cache_stats(self) -> dict:
+        return {}
+
+
+# (topic, rule) pairs; the synthetic_queries phrasings all pass the off-topic filter
+SYNTHETIC_TOPICS = [
+    (
+        "yield sign",
+        "slow down and give the right of way to vehicles and pedestrians "
+        "already in the intersection",
+    ),
+    ("school bus", "stop at least 20 metres away while its red lights are flashing"),
+    ("crosswalk", "stop and let the pedestrian finish crossing before you proceed"),
+    ("emergency vehicle", "pull over to the right and stop until it has passed"),
+    ("speed limit", "is 50 km/h in cities and towns unless a sign shows otherwise"),
+    ("roundabout", "yield to traffic already in the circle and signal before you exit"),
+    (
+        "railway crossing",
+        "stop at least 5 metres from the nearest rail when a train is approaching",
+    ),
+    ("winter tire", "gives better traction on snow and ice than an all-season tire"),
+    ("demerit point", "is added to your record for each traffic offence you are convicted of"),
+    ("parking brake", "must be set whenever you park on a hill"),
+    ("blind spot", "is checked by looking over your shoulder before you change lanes"),
+    ("learner permit", "requires a fully licensed driver to sit beside you"),
+]
+
+SYNTHETIC_FILLER = [
+    "Drivers must follow these rules at all times.",
+    "Fines and demerit points apply to every violation.",
+    "Always check your mirrors and signal your intentions early.",
+    "Road conditions can change quickly in Nova Scotia.",
+    "Police may stop any vehicle that does not comply.",
+    "Keep a safe following distance from the vehicle ahead.",
+    "Adjust your speed for weather, traffic and visibility.",
+    "New drivers should practise this with an experienced driver.",
+]
+
+
+def synthetic_corpus(rows: int, seed: int = 0) -> list[str]:
+    """`rows` handbook-like chunks, each stating one topic's rule among filler sentences."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(rows):
+        topic, rule = SYNTHETIC_TOPICS[i % len(SYNTHETIC_TOPICS)]
+        filler = rng.sample(SYNTHETIC_FILLER, 3)
+        chunks.append(f"Section {i + 1}. {topic.capitalize()}: {rule}. " + " ".join(filler))
+    return chunks
+
+
+def synthetic_queries(count: int, distinct: int = None, seed: int = 0) -> list[str]:
+    """
+    `count` questions about the synthetic topics, drawn from `distinct`
+    different phrasings (fewer distinct questions = more answer-cache hits).
+    """
+    templates = [
+        "What are the rules for the {topic} when driving?",
+        "What should a driver know about the {topic}?",
+        "How does the {topic} affect driving in Nova Scotia?",
+    ]
+    pool = [t.format(topic=topic) for t in templates for topic, _ in SYNTHETIC_TOPICS]
+    pool = pool[: distinct or len(pool)]
+    rng = random.Random(seed)
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def build_synthetic_index(
+    index_dir: Path, rows: int, embeddings: Embeddings = None, seed: int = 0
+):
+    """
+    Writes a NumpyVectorIndex of `rows` synthetic chunks embedded with
+    `embeddings` (default HashEmbeddings).
+    """
+    embeddings = embeddings or HashEmbeddings(latency=0.0)
+    texts = synthetic_corpus(rows, seed)
+    writer = NumpyIndexWriter(index_dir)
+    for start in range(0, rows, 1000):
+        batch = texts[start : start + 1000]
+        ids = [f"synthetic-{start + i}" for i in range(len(batch))]
+        metadatas = [
+            {"source": "synthetic_handbook.pdf", "page": (start + i) // 4}
+            for i in range(len(batch))
+        ]
+        writer.add(ids, batch, metadatas, embeddings.embed_documents(batch))
+    writer.finalize()
+    return NumpyVectorIndex(index_dir)
@@ -1,62 +1,306 @@
 import shutil
 from pathlib import Path
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
-from src.embedder import JinaEmbeddingModel
+from src.embedder import get_embedding_model
 from src.config import Config
+from src.embedding_cache import get_embedding_cache
+from src.dedup import MinHashDeduplicator
+from src.ingest_checkpoint import IngestCheckpoint
+from src.ingest_manifest import IngestManifest, hash_file
+from src.ingest_pipeline import StreamingIngestPipeline
+from src.pdf_loader import PageSplitter, ParallelPDFLoader
+from src.retrieval import BM25Index, IVFIndex, NumpyIndexWriter, NumpyVectorIndex
+
+
+def _upsert_vectors(vectorstore: Chroma, ids: list, docs: list, vectors: list):
+    """
+    Writes chunks with the vectors the embedding pipeline computed. This is the
+    only use of Chroma's private collection: the wrapper has no public method
+    that takes precomputed embeddings (add_texts/add_documents embed again).
+    """
+    vectorstore._collection.upsert(
+        ids=ids,
+        embeddings=vectors,
+        documents=[doc.page_content for doc in docs],
+        metadatas=[doc.metadata for doc in docs],
+    )
 
 
 class KnowledgeBaseIngestor:
-    def __init__(self, data_file_name: str):
-        self.data_path = Config.DATA_DIR / data_file_name
+    def __init__(
+        self,
+        data_file_name: str = None,
+        incremental: bool = False,
+        batch_size: int = None,
+        concurrency: int = None,
+        data_dir: Path = None,
+        workers: int = None,
+        resume: bool = False,
+        dedup: bool = None,
+    ):
+        # Either a single file from Config.DATA_DIR or every PDF in a directory
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.data_path = (
+            Config.DATA_DIR / data_file_name if data_file_name and not data_dir else None
+        )
         self.chroma_db_dir = Config.CHROMA_DB_DIR
+        self.incremental = incremental
+        self.batch_size = batch_size or Config.EMBED_BATCH_SIZE
+        self.concurrency = concurrency or Config.EMBED_CONCURRENCY
+        self.workers = workers
+        self.resume = resume
+        self.dedup = Config.DEDUP_ENABLED if dedup is None else dedup
+        self.manifest = IngestManifest(Config.INGEST_MANIFEST_FILE)
+        self.embedding_model = None
+        self.checkpoint = IngestCheckpoint(Config.INGEST_CHECKPOINT_FILE)
 
     def setup_directories(self):
         print("Setting up storage directories...")
-        self.output_dir.mkdir(exist_ok=True)
+        Config.KB_DIR.mkdir(exist_ok=True)
+
+        if self.incremental and self.chroma_db_dir.exists():
+            # Keep the existing store online; only changed chunks are touched
+            return self.chroma_db_dir
 
         if self.chroma_db_dir.exists():
             print("Clearing existing vector store...")
             shutil.rmtree(self.chroma_db_dir)
+        # Persist the reset right away so a resumed run never trusts the old manifest
+        self.manifest.reset()
+        self.manifest.save()
 
         return self.chroma_db_dir
 
-    def load_documents(self):
-        print(f"Loading document from {self.data_path}...")
+    def resolve_data_paths(self) -> list[Path]:
+        """Returns the PDFs this run should ingest."""
+        if self.data_dir is not None:
+            if not self.data_dir.is_dir():
+                print(f"Error: Data directory not found at {self.data_dir.absolute()}")
+                exit(1)
+            paths = sorted(self.data_dir.glob("*.pdf"))
+            if not paths:
+                print(f"Error: No PDF files found in {self.data_dir.absolute()}")
+                exit(1)
+            return paths
+
         if not self.data_path.exists():
             print(f"Error: Data file not found at {self.data_path.absolute()}")
             exit(1)
+        return [self.data_path]
+
+    def _open_vector_store(self):
+        if self.embedding_model is None:
+            self.embedding_model = get_embedding_model()
+        return Chroma(
+            persist_directory=str(self.chroma_db_dir),
+            embedding_function=self.embedding_model.embeddings_model,
+        )
+
+    def _check_embedding_model(self):
+        """Vectors from different models cannot share a store: force a rebuild on a switch."""
+        self.embedding_model = get_embedding_model()
+        model_id = f"{Config.EMBEDDING_BACKEND}:{self.embedding_model.model_name}"
+        previous = self.manifest.embedding_model
+        if (self.incremental or self.resume) and previous and previous != model_id:
+            print(
+                f"Embedding model changed ({previous} -> {model_id}). Rebuilding the vector store."
+            )
+            self.incremental = False
+            self.resume = False
+        self.manifest.embedding_model = model_id
+
+    @staticmethod
+    def _store_writer(vectorstore, checkpoint: IngestCheckpoint = None):
+        """
+        Returns a write_batch(ids, docs, vectors) callback that upserts precomputed
+        vectors and, once the write has succeeded, commits the batch to the checkpoint.
+        """
+
+        def write_batch(ids, docs, vectors):
+            _upsert_vectors(vectorstore, ids, docs, vectors)
+            if checkpoint is not None:
+                checkpoint.commit(ids)
+
+        return write_batch
 
-        loader = PyPDFLoader(str(self.data_path))
-        return loader.load()
+    def _drop_removed_files(self, vectorstore, current_names: set) -> int:
+        """In directory mode, deletes chunks of PDFs that are no longer in the directory."""
+        if self.data_dir is None:
+            return 0
+        removed = self.manifest.tracked_files() - current_names
+        for file_name in sorted(removed):
+            stale_ids = self.manifest.remove_file(file_name)
+            print(f"Removing {len(stale_ids)} chunks of deleted file {file_name}")
+            if stale_ids:
+                vectorstore.delete(ids=sorted(stale_ids))
+        return len(removed)
 
-    def split_documents(self, docs, chunk_size: int = 1000, chunk_overlap: int = 200):
-        print("Splitting text...")
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    def _seed_deduplicator(self, vectorstore, deduplicator, exclude: set):
+        """
+        Indexes the stored chunks of files outside this run (the unchanged ones
+        in incremental mode), so new chunks that near-duplicate them are dropped too.
+        """
+        ids = sorted(
+            chunk_id
+            for file_name in self.manifest.tracked_files() - exclude
+            for chunk_id in self.manifest.chunk_ids(file_name)
         )
-        return text_splitter.split_documents(docs)
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start : start + self.batch_size]
+            for text in vectorstore.get(ids=batch, include=["documents"])["documents"]:
+                deduplicator.add(text)
 
-    def create_vector_store(self, splits):
-        print("Initializing embeddings and vector store...")
-        embedding_model = JinaEmbeddingModel()
-        embeddings = embedding_model.embeddings_model
+    def ingest_files(self, vectorstore, paths: list[Path], file_hashes: dict):
+        """
+        Streams `paths` through parse -> split -> embed -> write with bounded
+        memory. Chunks already recorded in the manifest or committed to the
+        checkpoint by an interrupted run are skipped, and chunks that
+        disappeared from a changed file are deleted afterwards.
+        """
+        seen = {path.name: {} for path in paths}
+        previous = {path.name: self.manifest.chunk_ids(path.name) for path in paths}
+        committed = self.checkpoint.committed
+        deduplicator = MinHashDeduplicator() if self.dedup else None
+        if deduplicator is not None:
+            self._seed_deduplicator(vectorstore, deduplicator, set(seen))
+        skipped = 0
+        resumed = 0
 
-        vectorstore = Chroma.from_documents(
-            documents=splits,
-            embedding=embeddings,
-            persist_directory=str(self.chroma_db_dir),
+        def keep(chunk_id, doc):
+            nonlocal skipped, resumed
+            file_name = Path(doc.metadata["source"]).name
+            if chunk_id in seen[file_name]:
+                return False
+            seen[file_name][chunk_id] = doc.metadata.get("page", -1)
+            if chunk_id in previous[file_name] or chunk_id in committed:
+                if chunk_id in previous[file_name]:
+                    skipped += 1
+                else:
+                    resumed += 1
+                # Already stored: still a reference for near-duplicate detection
+                if deduplicator is not None:
+                    deduplicator.add(doc.page_content)
+                return False
+            return True
+
+        def drop(chunk_id, doc):
+            # Never embedded, so not recorded: a later run re-checks it against
+            # whatever is stored then, in case the chunk it duplicated is gone
+            seen[Path(doc.metadata["source"]).name].pop(chunk_id, None)
+
+        pipeline = StreamingIngestPipeline(
+            ParallelPDFLoader(workers=self.workers),
+            PageSplitter(),
+            vectorstore.embeddings,
+            self._store_writer(vectorstore, self.checkpoint),
+            batch_size=self.batch_size,
+            concurrency=self.concurrency,
+            deduplicator=deduplicator,
         )
-        return vectorstore
+        self.checkpoint.start(resume=self.resume)
+        try:
+            pipeline.run(paths, keep=keep, on_duplicate=drop)
+        finally:
+            self.checkpoint.close()
+        if resumed:
+            print(f"Resume: skipped {resumed} chunks committed by the interrupted run.")
+
+        stale_total = 0
+        for path in paths:
+            stale_ids = previous[path.name] - set(seen[path.name])
+            if stale_ids:
+                vectorstore.delete(ids=sorted(stale_ids))
+                stale_total += len(stale_ids)
+            self.manifest.update_file(
+                path.name, file_hashes[path.name], seen[path.name]
+            )
+        self.manifest.save()
+        self.checkpoint.clear()
+
+        if self.incremental:
+            print(
+                f"Incremental update: {skipped} unchanged chunks kept, "
+                f"{stale_total} stale chunks deleted."
+            )
+
+    def build_local_indexes(self, vectorstore):
+        """
+        Exports the stored vectors into the memory-mapped NumPy index, then
+        builds the IVF and BM25 indexes over it.
+        """
+        if not Config.NUMPY_INDEX_ENABLED:
+            return
+        count = NumpyIndexWriter.build_from_chroma(vectorstore, Config.NUMPY_INDEX_DIR)
+        print(f"NumPy vector index built with {count} rows at {Config.NUMPY_INDEX_DIR}")
+
+        if not count:
+            return
+        index = NumpyVectorIndex(Config.NUMPY_INDEX_DIR)
+        try:
+            if Config.IVF_INDEX_ENABLED:
+                ivf = IVFIndex.build(index)
+                ivf.save(Config.IVF_INDEX_FILE)
+                print(f"IVF index built with {ivf.nlist} lists at {Config.IVF_INDEX_FILE}")
+            if Config.BM25_INDEX_ENABLED:
+                bm25 = BM25Index.build(index)
+                bm25.save(Config.BM25_INDEX_FILE)
+                print(f"BM25 index built with {len(bm25.terms)} terms at {Config.BM25_INDEX_FILE}")
+        finally:
+            index.close()
+
+    def report_cache_stats(self):
+        if Config.EMBEDDING_CACHE_ENABLED:
+            stats = get_embedding_cache().stats()
+            print(
+                f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries"
+            )
 
     def run(self):
         print("Starting Ingestion Pipeline...")
+        paths = self.resolve_data_paths()
+        if self.resume:
+            if self.checkpoint.exists():
+                committed = self.checkpoint.load()
+                print(f"Resuming from checkpoint: {len(committed)} chunks already committed.")
+                # Never wipe the store we are resuming into
+                self.incremental = True
+            else:
+                print("No checkpoint found. Starting a fresh run.")
+                self.resume = False
+        if self.incremental and not self.manifest.path.exists():
+            # A store without a manifest has untracked chunks that would be duplicated
+            print("No ingest manifest found. Rebuilding the vector store.")
+            self.incremental = False
+        self._check_embedding_model()
         self.setup_directories()
-        docs = self.load_documents()
-        splits = self.split_documents(docs)
-        self.create_vector_store(splits)
-        print(f"Ingestion completed. Vector store created at {self.chroma_db_dir}")
+        file_hashes = {path.name: hash_file(path) for path in paths}
+
+        vectorstore = self._open_vector_store()
+        removed = self._drop_removed_files(vectorstore, set(file_hashes))
+
+        if self.incremental:
+            changed = [
+                path
+                for path in paths
+                if self.manifest.file_hash(path.name) != file_hashes[path.name]
+            ]
+            print(
+                f"{len(paths) - len(changed)} unchanged file(s), {len(changed)} new/changed."
+            )
+            paths = changed
+            if not paths:
+                if removed:
+                    self.manifest.save()
+                    self.build_local_indexes(vectorstore)
+                self.checkpoint.clear()
+                print("Nothing to ingest.")
+                return
+
+        self.ingest_files(vectorstore, paths, file_hashes)
+        self.build_local_indexes(vectorstore)
+        self.report_cache_stats()
+        print(f"Ingestion completed. Vector store at {self.chroma_db_dir}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+import os
+from pathlib import Path
+
+
+class IngestCheckpoint:
+    """
+    Append-only log of chunk IDs whose vectors have been written to the store.
+    Each committed batch is flushed and fsynced, so after a crash the log lists
+    exactly the work that does not need to be redone.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.committed = set()
+        self._file = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> set:
+        """Reads committed chunk IDs from a previous, interrupted run."""
+        self.committed = set()
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                # A torn final line from a crash mid-write is simply ignored
+                self.committed = {line.strip() for line in f if line.endswith("\n")}
+            self.committed.discard("")
+        return self.committed
+
+    def start(self, resume: bool = False):
+        """Opens the log for appending. A fresh run truncates any old checkpoint."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume:
+            self.committed = set()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._ends_with_torn_line():
+            # Terminate the torn line so the next ID is not glued onto it
+            self._file.write("\n")
+
+    def _ends_with_torn_line(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def commit(self, chunk_ids: list[str]):
+        """Durably records a batch of chunk IDs that has been persisted to the store."""
+        self._file.write("".join(f"{chunk_id}\n" for chunk_id in chunk_ids))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.committed.update(chunk_ids)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def clear(self):
+        """Removes the checkpoint once a run has completed successfully."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+        self.committed = set()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+from pathlib import Path
+
+
+def hash_file(path: Path, block_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_chunk(source: str, page: int, content: str) -> str:
+    """
+    Returns a stable chunk ID derived from the chunk's origin and content.
+    Identical text on the same page of the same file always maps to the same ID.
+    """
+    digest = hashlib.sha256(f"{source}\x00{page}\x00{content}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class IngestManifest:
+    """
+    Records which files and chunks are currently in the vector store so that
+    re-ingestion only embeds what changed.
+
+    Layout:
+        {"version": 1, "embedding_model": ...,
+         "files": {file_name: {"sha256": ..., "chunks": {chunk_id: page}}}}
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files = {}
+        self.embedding_model = None
+        self.load()
+
+    def load(self):
+        """Loads the manifest from disk. A missing or unreadable file means an empty store."""
+        self.files = {}
+        self.embedding_model = None
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            print(f"Warning: Ignoring unreadable manifest at {self.path}")
+            return
+        if data.get("version") != self.VERSION:
+            return
+        self.files = data.get("files", {})
+        self.embedding_model = data.get("embedding_model")
+
+    def save(self):
+        """Writes the manifest atomically so a crash never leaves a partial file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "version": self.VERSION,
+                    "embedding_model": self.embedding_model,
+                    "files": self.files,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.path)
+
+    def reset(self):
+        """Forgets every tracked file (used before a full rebuild)."""
+        self.files = {}
+
+    def file_hash(self, file_name: str):
+        entry = self.files.get(file_name)
+        return entry["sha256"] if entry else None
+
+    def chunk_ids(self, file_name: str) -> set:
+        entry = self.files.get(file_name)
+        return set(entry["chunks"]) if entry else set()
+
+    def tracked_files(self) -> set:
+        return set(self.files)
+
+    def diff(self, file_name: str, new_chunk_ids) -> tuple[set, set]:
+        """
+        Compares a file's freshly computed chunk IDs against the recorded ones.
+        Returns (ids_to_add, ids_to_delete).
+        """
+        old_ids = self.chunk_ids(file_name)
+        new_ids = set(new_chunk_ids)
+        return new_ids - old_ids, old_ids - new_ids
+
+    def update_file(self, file_name: str, sha256: str, chunks: dict):
+        """Records the current state of a file. `chunks` maps chunk_id -> page."""
+        self.files[file_name] = {"sha256": sha256, "chunks": dict(chunks)}
+
+    def remove_file(self, file_name: str) -> set:
+        """Stops tracking a file and returns the chunk IDs that belonged to it."""
+        entry = self.files.pop(file_name, None)
+        return set(entry["chunks"]) if entry else set()
@@ -0,0 +1,213 @@
+import queue
+import threading
+import time
+from src.config import Config
+from src.embedding_pipeline import EmbeddingPipeline
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+    pass
+
+
+class StageStats:
+    """Item count and busy time for one pipeline stage."""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+
+    def record(self, items: int, seconds: float):
+        self.items += items
+        self.busy_seconds += seconds
+
+    def summary(self, wall_seconds: float) -> str:
+        rate = self.items / wall_seconds if wall_seconds else 0.0
+        busy_rate = self.items / self.busy_seconds if self.busy_seconds else 0.0
+        return (
+            f" - {self.name:6}: {self.items:7} {self.unit:7} "
+            f"{rate:9.1f}/s wall  {busy_rate:9.1f}/s busy  ({self.busy_seconds:.1f}s busy)"
+        )
+
+
+class StreamingIngestPipeline:
+    """
+    Streaming ingestion: page generator -> splitter (+ near-duplicate filter)
+    -> embed batches -> store write.
+
+    Each stage runs in its own thread and hands work to the next through a
+    bounded queue, so at most a few queue-fulls of pages, chunks and vectors are
+    held in memory at any time regardless of corpus size. A slow stage applies
+    back-pressure to the ones before it.
+    """
+
+    def __init__(
+        self,
+        loader,
+        splitter,
+        embeddings,
+        write_batch,
+        batch_size: int = None,
+        concurrency: int = None,
+        queue_size: int = None,
+        deduplicator=None,
+    ):
+        self.loader = loader
+        self.splitter = splitter
+        self.embeddings = embeddings
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+        self.deduplicator = deduplicator
+
+        self.stats = {
+            "parse": StageStats("parse", "pages"),
+            "split": StageStats("split", "chunks"),
+            "embed": StageStats("embed", "chunks"),
+            "write": StageStats("write", "chunks"),
+        }
+        self._abort = threading.Event()
+        self._errors = []
+
+    def _put(self, q: queue.Queue, item):
+        """Blocking put that gives up if another stage has failed."""
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._abort.is_set():
+                    raise PipelineAborted()
+
+    def _drain(self, q: queue.Queue):
+        """Yields items until the upstream stage signals completion."""
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._abort.is_set():
+                    raise PipelineAborted()
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+    def _run_stage(self, target, out_queue: queue.Queue = None):
+        """Runs a stage body, records failures, and always signals downstream."""
+        try:
+            target()
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._abort.set()
+        finally:
+            if out_queue is not None:
+                try:
+                    self._put(out_queue, _DONE)
+                except PipelineAborted:
+                    pass
+
+    def _parse_stage(self, paths, pages_q: queue.Queue):
+        started = time.perf_counter()
+        for page in self.loader.iter_pages(paths):
+            self.stats["parse"].record(1, time.perf_counter() - started)
+            self._put(pages_q, page)
+            started = time.perf_counter()
+
+    def _split_stage(self, pages_q: queue.Queue, chunks_q: queue.Queue, keep, on_duplicate):
+        for page in self._drain(pages_q):
+            started = time.perf_counter()
+            chunks = []
+            for chunk_id, doc in self.splitter.split(page):
+                if keep is not None and not keep(chunk_id, doc):
+                    continue
+                if self.deduplicator is not None and self.deduplicator.is_duplicate(
+                    doc.page_content
+                ):
+                    if on_duplicate is not None:
+                        on_duplicate(chunk_id, doc)
+                    continue
+                chunks.append((chunk_id, doc))
+            self.stats["split"].record(len(chunks), time.perf_counter() - started)
+            for chunk in chunks:
+                self._put(chunks_q, chunk)
+
+    def _embed_stage(self, chunks_q: queue.Queue, vectors_q: queue.Queue):
+        def hand_off(ids, docs, vectors):
+            self._put(vectors_q, (ids, docs, vectors))
+
+        embedder = EmbeddingPipeline(
+            self.embeddings,
+            hand_off,
+            batch_size=self.batch_size,
+            concurrency=self.concurrency,
+        )
+        embedder.run(self._drain(chunks_q))
+        self.stats["embed"].record(embedder.stats["chunks"], embedder.stats["seconds"])
+
+    def _write_stage(self, vectors_q: queue.Queue):
+        for ids, docs, vectors in self._drain(vectors_q):
+            started = time.perf_counter()
+            self.write_batch(ids, docs, vectors)
+            self.stats["write"].record(len(ids), time.perf_counter() - started)
+
+    def run(self, paths, keep=None, on_duplicate=None) -> dict:
+        """
+        Ingests `paths`. `keep(chunk_id, doc)` may filter chunks after splitting
+        (e.g. to skip chunks already in the store), and `on_duplicate(chunk_id, doc)`
+        is told about every near-duplicate dropped before embedding. Both run on
+        the split thread. Raises the first stage error.
+        """
+        pages_q = queue.Queue(maxsize=self.queue_size)
+        chunks_q = queue.Queue(maxsize=self.queue_size)
+        vectors_q = queue.Queue(maxsize=max(1, self.queue_size // 8))
+
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(lambda: self._parse_stage(paths, pages_q), pages_q),
+                name="ingest-parse",
+            ),
+            threading.Thread(
+                target=self._run_stage,
+                args=(lambda: self._split_stage(pages_q, chunks_q, keep, on_duplicate), chunks_q),
+                name="ingest-split",
+            ),
+            threading.Thread(
+                target=self._run_stage,
+                args=(lambda: self._embed_stage(chunks_q, vectors_q), vectors_q),
+                name="ingest-embed",
+            ),
+            threading.Thread(
+                target=self._run_stage,
+                args=(lambda: self._write_stage(vectors_q),),
+                name="ingest-write",
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - start
+
+        if self._errors:
+            raise self._errors[0]
+
+        print(f"Pipeline finished in {wall_seconds:.1f}s. Per-stage throughput:")
+        for stage in self.stats.values():
+            print(stage.summary(wall_seconds))
+        if self.deduplicator is not None:
+            print(
+                f"Near-duplicate chunks removed before embedding: "
+                f"{self.deduplicator.removed} of {self.deduplicator.checked}"
+            )
+        return {"wall_seconds": wall_seconds, "stages": self.stats}
@@ -0,0 +1,248 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from src.config import Config
+from src.metrics import get_metrics
+
+
+def load_queries(path: Path) -> list[str]:
+    """
+    Reads a query corpus: one query per line (blank lines and "#" comments
+    skipped), or JSON lines with a "query" field for *.jsonl files.
+    """
+    path = Path(path)
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            queries.append(json.loads(line)["query"] if path.suffix == ".jsonl" else line)
+    if not queries:
+        raise ValueError(f"No queries found in {path}")
+    return queries
+
+
+class LoadTest:
+    """
+    Replays `queries` (in order, cycling) through `run(query) -> result dict`
+    for `warmup` + `duration` seconds and measures the `duration` window.
+
+    Arrival is open-loop when `qps` is given: requests are sent at Poisson
+    arrival times, whether or not earlier ones have finished, on up to
+    `max_in_flight` threads (at most Config.EXECUTION_POOL_WORKERS, so
+    requests never queue for the time-limited LLM call). Latency is measured from each request's
+    scheduled arrival, so time spent waiting for a free thread counts too.
+    With `concurrency` instead, that many workers each send their next query
+    as soon as the previous one returns (closed loop).
+
+    Requests that arrive during warmup run but are not counted, and the
+    process-wide stage histograms are reset at the moment warmup ends.
+    `on_progress(snapshot)` is called every `progress_seconds`.
+    """
+
+    def __init__(
+        self,
+        run,
+        queries: list,
+        qps: float = None,
+        concurrency: int = None,
+        duration: float = None,
+        warmup: float = None,
+        max_in_flight: int = None,
+        progress_seconds: float = None,
+        on_progress=None,
+        seed=None,
+    ):
+        if (qps is None) == (concurrency is None):
+            raise ValueError("Give exactly one of qps (open loop) or concurrency (closed loop)")
+        self.run = run
+        self.queries = queries
+        self.qps = qps
+        self.concurrency = concurrency
+        self.duration = duration if duration is not None else Config.LOADTEST_DURATION_SECONDS
+        self.warmup = warmup if warmup is not None else Config.LOADTEST_WARMUP_SECONDS
+        # More threads than the execution pool only queue behind it and hit LLM_TIMEOUT
+        self.max_in_flight = min(
+            max_in_flight or Config.LOADTEST_MAX_IN_FLIGHT, Config.EXECUTION_POOL_WORKERS
+        )
+        self.progress_seconds = progress_seconds or Config.LOADTEST_PROGRESS_SECONDS
+        self.on_progress = on_progress
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._sent = 0
+        self._done = 0
+        self._records = []  # (arrival, latency seconds, result) for measured requests
+
+    def _next_query(self) -> str:
+        with self._lock:
+            query = self.queries[self._next % len(self.queries)]
+            self._next += 1
+            self._sent += 1
+            return query
+
+    def _execute(self, query: str, arrival: float):
+        try:
+            result = self.run(query)
+        except Exception as e:
+            # e.g. a 429 that run_query leaves to its caller
+            result = {"error_code": f"EXCEPTION:{type(e).__name__}", "guardrails_triggered": []}
+        latency = time.perf_counter() - arrival
+        with self._lock:
+            self._done += 1
+            if arrival >= self._measure_from:
+                self._records.append((arrival, latency, result))
+
+    def _open_loop(self, end: float):
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="loadtest"
+        ) as pool:
+            arrival = time.perf_counter()
+            while True:
+                arrival += self._random.expovariate(self.qps)
+                if arrival >= end:
+                    break
+                delay = arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._execute, self._next_query(), arrival)
+
+    def _closed_loop(self, end: float):
+        def worker():
+            while time.perf_counter() < end:
+                self._execute(self._next_query(), time.perf_counter())
+
+        threads = [
+            threading.Thread(target=worker, name=f"loadtest-{i}") for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _snapshot(self, now: float) -> dict:
+        with self._lock:
+            recent = [latency for arrival, latency, _ in self._records[-1000:]]
+            return {
+                "elapsed_s": now - self._started,
+                "warming_up": now < self._measure_from,
+                "sent": self._sent,
+                "done": self._done,
+                "in_flight": self._sent - self._done,
+                "measured": len(self._records),
+                "p50_ms": float(np.percentile(recent, 50)) * 1000 if recent else 0.0,
+                "p95_ms": float(np.percentile(recent, 95)) * 1000 if recent else 0.0,
+            }
+
+    def start(self) -> dict:
+        """Runs the load test and returns the report (see `report`)."""
+        self._started = time.perf_counter()
+        self._measure_from = self._started + self.warmup
+        end = self._measure_from + self.duration
+        stop = threading.Event()
+        # Stage histograms cover the measured window only
+        reset = threading.Timer(self.warmup, get_metrics().reset)
+        reset.daemon = True
+        reset.start()
+
+        def progress():
+            while not stop.wait(self.progress_seconds):
+                if self.on_progress is not None:
+                    self.on_progress(self._snapshot(time.perf_counter()))
+
+        reporter = threading.Thread(target=progress, name="loadtest-progress", daemon=True)
+        reporter.start()
+        try:
+            if self.qps is not None:
+                self._open_loop(end)
+            else:
+                self._closed_loop(end)
+        finally:
+            reset.cancel()
+            stop.set()
+            reporter.join()
+        return self.report()
+
+    def report(self) -> dict:
+        """
+        Latency percentiles (ms), result codes, guardrails triggered and
+        answer-cache hits over the requests that arrived in the measured
+        window (in-flight ones are waited for). Throughput counts the
+        requests completed within the window.
+        """
+        end = self._measure_from + self.duration
+        completed = sum(1 for arrival, latency, _ in self._records if arrival + latency <= end)
+        latencies = np.array([latency for _, latency, _ in self._records]) * 1000
+        results = [result for _, _, result in self._records]
+        codes = Counter(result["error_code"] for result in results)
+        guardrails = Counter(
+            g for result in results for g in result.get("guardrails_triggered", [])
+        )
+        cache = Counter(
+            result.get("cache", "miss") for result in results if result["error_code"] == "None"
+        )
+        answered = sum(cache.values())
+        hits = cache["exact"] + cache["semantic"]
+        if self.qps is not None:
+            arrival = f"open-loop {self.qps} qps"
+        else:
+            arrival = f"closed-loop {self.concurrency} workers"
+        report = {
+            "arrival": arrival,
+            "warmup_s": self.warmup,
+            "duration_s": self.duration,
+            "sent": self._sent,
+            "measured": len(self._records),
+            "throughput_qps": round(completed / self.duration, 2) if self.duration > 0 else 0.0,
+            "latency_ms": {},
+            "codes": dict(codes),
+            "guardrails": dict(guardrails),
+            "cache": {
+                "exact": cache["exact"],
+                "semantic": cache["semantic"],
+                "miss": cache["miss"],
+                "hit_rate": round(hits / answered, 3) if answered else 0.0,
+            },
+        }
+        if len(latencies):
+            report["latency_ms"] = {
+                "mean": round(float(latencies.mean()), 3),
+                **{f"p{q}": round(float(np.percentile(latencies, q)), 3) for q in (50, 90, 95, 99)},
+                "max": round(float(latencies.max()), 3),
+            }
+        return report
+
+
+def format_report(report: dict) -> str:
+    """Human-readable version of a LoadTest report."""
+    lines = [
+        f"Arrival: {report['arrival']}, warmup {report['warmup_s']}s excluded",
+        f"Measured: {report['measured']} requests in {report['duration_s']}s "
+        f"({report['sent']} sent in total) -> {report['throughput_qps']:.2f} q/s",
+    ]
+    if report["latency_ms"]:
+        latency = report["latency_ms"]
+        lines.append(
+            "Latency ms: "
+            + "  ".join(f"{name}={value:.1f}" for name, value in latency.items())
+        )
+    lines.append(
+        "Result codes: "
+        + (", ".join(f"{c}={n}" for c, n in sorted(report["codes"].items())) or "none")
+    )
+    lines.append(
+        "Guardrails triggered: "
+        + (", ".join(f"{g}={n}" for g, n in sorted(report["guardrails"].items())) or "none")
+    )
+    cache = report["cache"]
+    lines.append(
+        f"Answer cache: {cache['exact']} exact + {cache['semantic']} semantic hits, "
+        f"{cache['miss']} misses ({cache['hit_rate']:.0%} hit rate)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,324 @@
+import atexit
+import bisect
+import contextvars
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from src.config import Config
+
+# Trace of the request running in the current thread / asyncio task
+_current_trace = contextvars.ContextVar("rag_request_trace", default=None)
+
+# run_query stages in pipeline order (for reports)
+STAGES = (
+    "input",
+    "cache",
+    "embedding",
+    "retrieval",
+    "confidence",
+    "generation",
+    "output",
+    "faithfulness",
+    "finalize",
+    "total",
+)
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram over fixed upper bounds in seconds
+    (Config.METRICS_LATENCY_BUCKETS). Quantiles are interpolated linearly
+    inside the bucket that holds them, as Prometheus' histogram_quantile does.
+    Not locked: MetricsRegistry serializes access.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or Config.METRICS_LATENCY_BUCKETS)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot: above the largest bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimated `q` quantile in seconds (0.0 with no observations)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the largest bound: report the bound
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def summary(self) -> dict:
+        """Count, mean and p50/p95/p99 in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            **{f"p{int(q * 100)}_ms": self.quantile(q) * 1000 for q in (0.5, 0.95, 0.99)},
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide request metrics: one LatencyHistogram per query stage (plus
+    "total") and a count of requests per result code. Thread-safe.
+    `to_prometheus` renders them in the Prometheus text exposition format;
+    `start_exporter` rewrites a file in that format every few seconds, for the
+    node_exporter textfile collector.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or Config.METRICS_LATENCY_BUCKETS)
+        self.histograms = {}
+        self.codes = Counter()
+        self._lock = threading.Lock()
+        self._exporter = None
+
+    def record(self, stages: dict, total: float, code: str):
+        """Adds one finished request: seconds per stage, total seconds, result code."""
+        with self._lock:
+            for stage, seconds in stages.items():
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = LatencyHistogram(self.buckets)
+                histogram.observe(seconds)
+            if "total" not in self.histograms:
+                self.histograms["total"] = LatencyHistogram(self.buckets)
+            self.histograms["total"].observe(total)
+            self.codes[code] += 1
+
+    def percentiles(self) -> dict:
+        """Stage -> {count, mean_ms, p50_ms, p95_ms, p99_ms}."""
+        with self._lock:
+            return {stage: h.summary() for stage, h in self.histograms.items()}
+
+    def format_report(self) -> str:
+        """Table of per-stage latency percentiles, in pipeline order."""
+        percentiles = self.percentiles()
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        lines = [
+            f"{'stage':<14} {'count':>7} {'mean ms':>10} "
+            f"{'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"
+        ]
+        for stage in sorted(percentiles, key=lambda name: order.get(name, len(STAGES))):
+            p = percentiles[stage]
+            lines.append(
+                f"{stage:<14} {p['count']:>7} {p['mean_ms']:>10.2f} {p['p50_ms']:>10.2f} "
+                f"{p['p95_ms']:>10.2f} {p['p99_ms']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.codes.clear()
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP rag_stage_latency_seconds Time spent in each run_query stage.",
+                "# TYPE rag_stage_latency_seconds histogram",
+            ]
+            for stage, h in sorted(self.histograms.items()):
+                bucket = f'rag_stage_latency_seconds_bucket{{stage="{stage}"'
+                cumulative = 0
+                for bound, n in zip(self.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'{bucket},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{bucket},le="+Inf"}} {h.count}')
+                lines.append(f'rag_stage_latency_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'rag_stage_latency_seconds_count{{stage="{stage}"}} {h.count}')
+            lines += [
+                "# HELP rag_stage_latency_quantile_seconds Estimated p50/p95/p99 of each stage.",
+                "# TYPE rag_stage_latency_quantile_seconds gauge",
+            ]
+            for stage, h in sorted(self.histograms.items()):
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(
+                        f'rag_stage_latency_quantile_seconds{{stage="{stage}",quantile="{q}"}} '
+                        f"{h.quantile(q):.6f}"
+                    )
+            lines += [
+                "# HELP rag_requests_total Finished queries by result code.",
+                "# TYPE rag_requests_total counter",
+            ]
+            for code, n in sorted(self.codes.items()):
+                lines.append(f'rag_requests_total{{code="{code}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path):
+        """
+        Writes the metrics to `path` atomically (temp file + rename), so
+        scrapers never see a partial file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def start_exporter(self, path: Path = None, interval: float = None):
+        """
+        Rewrites the Prometheus text file every `interval` seconds on a daemon
+        thread (once per process).
+        """
+        path = path or Config.METRICS_FILE
+        interval = interval or Config.METRICS_EXPORT_SECONDS
+        with self._lock:
+            if self._exporter is not None:
+                return
+            self._exporter = threading.Event()
+        stop = self._exporter
+
+        def export():
+            while not stop.wait(interval):
+                self.write_prometheus(path)
+
+        threading.Thread(target=export, name="metrics-exporter", daemon=True).start()
+        atexit.register(self.write_prometheus, path)  # Final values on exit
+
+
+class RequestTrace:
+    """
+    Per-request stage timer, used as `with start_trace() as trace:`. While
+    open it is the current trace of its thread / asyncio task.
+
+    `enter(stage)` ends the running stage and starts the next one, so each
+    step costs one perf_counter call. Time recorded into a nested span with
+    `add` (the query embedding) is reported as its own stage and taken out of
+    the enclosing one. `attach(result)` ends the last stage, records the
+    request in the process-wide histograms and adds the trace to the result.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.started = self._mark = time.perf_counter()
+        self.stage = None
+        self.stages = {}
+        self.total = None
+        self._nested = 0.0
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current_trace.reset(self._token)
+        self.close()
+
+    def enter(self, stage: str):
+        now = time.perf_counter()
+        if self.stage is not None:
+            elapsed = now - self._mark - self._nested
+            self.stages[self.stage] = self.stages.get(self.stage, 0.0) + elapsed
+        self.stage, self._mark, self._nested = stage, now, 0.0
+
+    def add(self, stage: str, seconds: float):
+        if self.total is not None:
+            return  # Request already finished
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self._nested += seconds
+
+    def close(self):
+        if self.total is None:
+            self.enter(None)
+            self.total = self._mark - self.started
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": round(self.total * 1000, 3),
+            "stages_ms": {stage: round(s * 1000, 3) for stage, s in self.stages.items()},
+        }
+
+    def attach(self, result: dict) -> dict:
+        self.close()
+        get_metrics().record(self.stages, self.total, result.get("error_code", "None"))
+        result["trace"] = self.as_dict()
+        return result
+
+
+class _NullTrace:
+    """Stand-in used when metrics are disabled: every call is a no-op."""
+
+    enabled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def enter(self, stage):
+        pass
+
+    def add(self, stage, seconds):
+        pass
+
+    def attach(self, result):
+        return result
+
+
+NULL_TRACE = _NullTrace()
+
+
+def start_trace():
+    """A new RequestTrace, or NULL_TRACE when Config.METRICS_ENABLED is off."""
+    return RequestTrace() if Config.METRICS_ENABLED else NULL_TRACE
+
+
+class TimedEmbeddings:
+    """
+    Wraps an embeddings model so query embeddings made during a traced request
+    are recorded as that request's "embedding" stage (separate from search).
+    """
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+    def embed_query(self, text: str):
+        start = time.perf_counter()
+        try:
+            return self.embeddings.embed_query(text)
+        finally:
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.add("embedding", time.perf_counter() - start)
+
+    async def aembed_query(self, text: str):
+        start = time.perf_counter()
+        try:
+            return await self.embeddings.aembed_query(text)
+        finally:
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.add("embedding", time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        # embed_documents, model_name, ... are passed through untouched
+        return getattr(self.embeddings, name)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Returns the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
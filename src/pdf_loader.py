@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
+from src.config import Config
+from src.ingest_manifest import hash_chunk
+
+
+def load_pages(path: str, start: int, end: int) -> list:
+    """
+    Worker entry point: extracts pages [start, end) of one PDF as Documents.
+    Runs in a child process, so it only takes and returns picklable values.
+    """
+    reader = PdfReader(path)
+    total_pages = len(reader.pages)
+    pages = []
+    for page_number in range(start, min(end, total_pages)):
+        pages.append(
+            Document(
+                page_content=reader.pages[page_number].extract_text(),
+                metadata={
+                    "source": path,
+                    "page": page_number,
+                    "total_pages": total_pages,
+                },
+            )
+        )
+    return pages
+
+
+class PageSplitter:
+    """Splits page Documents into chunks and tags each chunk with its content-hashed ID."""
+
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size or Config.CHUNK_SIZE,
+            chunk_overlap=Config.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap,
+        )
+
+    def split(self, page: Document) -> list[tuple[str, Document]]:
+        file_name = Path(page.metadata["source"]).name
+        chunks = []
+        for split in self.splitter.split_documents([page]):
+            chunk_id = hash_chunk(file_name, split.metadata["page"], split.page_content)
+            split.metadata["chunk_id"] = chunk_id
+            chunks.append((chunk_id, split))
+        return chunks
+
+
+class ParallelPDFLoader:
+    """
+    Extracts PDF text across a process pool. Each file is cut into page ranges
+    so that a single large chapter is spread over several cores too.
+    """
+
+    def __init__(self, workers: int = None, pages_per_task: int = None):
+        self.workers = workers or Config.INGEST_WORKERS or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task or Config.PDF_PAGES_PER_TASK
+
+    def plan_tasks(self, paths):
+        """Lazily splits every PDF into (path, start_page, end_page) work items."""
+        for path in paths:
+            total_pages = len(PdfReader(str(path)).pages)
+            for start in range(0, total_pages, self.pages_per_task):
+                yield str(path), start, start + self.pages_per_task
+
+    def iter_pages(self, paths):
+        """
+        Yields page Documents as page ranges finish parsing. At most
+        `2 * workers` ranges are queued at once, so memory stays bounded and
+        downstream stages run while parsing is still in progress.
+        """
+        print(f"Parsing {len(paths)} PDF(s) on {self.workers} processes...")
+        max_in_flight = self.workers * 2
+        pending = self.plan_tasks(paths)
+        in_flight = set()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                while len(in_flight) < max_in_flight:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    in_flight.add(executor.submit(load_pages, *task))
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
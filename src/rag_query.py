@@ -1,62 +1,156 @@
+import asyncio
+import logging
 import sys
+import time
+import uuid
+from functools import lru_cache
 from pathlib import Path
 from langchain_chroma import Chroma
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from src.embedder import JinaEmbeddingModel
+from src.embedder import get_embedding_model
 from src.config import Config
-from src.security import SecurityLayer, POLICY_BLOCK, LLMTimeoutError
+from src.security import (
+    SecurityLayer,
+    StreamingOutputGuard,
+    POLICY_BLOCK,
+    LLM_TIMEOUT,
+    LLMTimeoutError,
+    audit_event,
+)
 from src.evaluation import RAGEvaluator
+from src.answer_cache import AnswerCache
+from src.scheduler import BatchScheduler
+from src.eval_queue import FaithfulnessQueue, JsonlResultSink
+from src.metrics import TimedEmbeddings, get_metrics, start_trace
+from src.retrieval import (
+    BM25Index,
+    HybridRetriever,
+    IVFIndex,
+    NumpyVectorIndex,
+    VectorIndexRetriever,
+)
 from langchain_openai import ChatOpenAI
 
 
 class RAGQueryEngine:
-    def __init__(self):
+    def __init__(self, llm=None, retriever=None, embeddings=None):
+        """
+        Builds the engine from Config. A given `llm` or `retriever` replaces
+        the configured one (e.g. offline stand-ins); with a retriever, no
+        vector store is opened and `embeddings` is only used by the answer cache.
+        """
         self.chroma_db_dir = Config.CHROMA_DB_DIR
+        self.embeddings = None
         self.vectorstore = None
+        self.index = None
+        self.lexical_index = None
         self.retriever = None
         self.chain = None
         self.prompt = None
         self.llm = None
         self.security = SecurityLayer()
         self.evaluator = RAGEvaluator(llm=None)  # Will update after LLM setup
+        self.answer_cache = AnswerCache() if Config.ANSWER_CACHE_ENABLED else None
+        self.eval_queue = (
+            FaithfulnessQueue(self.evaluator, sink=JsonlResultSink(Config.EVAL_RESULTS_FILE))
+            if Config.EVAL_BACKGROUND
+            else None
+        )
+        if Config.METRICS_ENABLED:
+            get_metrics().start_exporter()
 
         # Load components on init
-        self._load_vector_store()
-        self._setup_rag_components()
+        if retriever is None:
+            self._load_vector_store()
+        else:
+            self.embeddings = embeddings
+        self._setup_rag_components(llm, retriever)
 
     def _load_vector_store(self):
         print("Loading vector store...")
+        embedding_model = get_embedding_model()
+        self.embeddings = embedding_model.embeddings_model
+        if Config.METRICS_ENABLED:
+            # Query embedding is timed as its own stage, apart from the search
+            self.embeddings = TimedEmbeddings(self.embeddings)
+
+        if Config.RETRIEVER_BACKEND in ("numpy", "ivf", "hybrid"):
+            try:
+                self.index = NumpyVectorIndex(Config.NUMPY_INDEX_DIR)
+                if Config.RETRIEVER_BACKEND == "ivf":
+                    self.index = IVFIndex.load(self.index, Config.IVF_INDEX_FILE)
+                elif Config.RETRIEVER_BACKEND == "hybrid":
+                    self.lexical_index = BM25Index.load(self.index, Config.BM25_INDEX_FILE)
+            except (FileNotFoundError, ValueError) as e:
+                print(f"Error: {e}. Please run ingestion first.")
+                sys.exit(1)
+            return
+
         if not self.chroma_db_dir.exists():
             print(
                 f"Error: Vector store not found at {self.chroma_db_dir}. Please run ingestion first."
             )
             sys.exit(1)
 
-        embedding_model = JinaEmbeddingModel()
-        embeddings = embedding_model.embeddings_model
-
         self.vectorstore = Chroma(
-            persist_directory=str(self.chroma_db_dir), embedding_function=embeddings
+            persist_directory=str(self.chroma_db_dir), embedding_function=self.embeddings
         )
 
-    def _setup_rag_components(self):
-        self.retriever = self.vectorstore.as_retriever()
-
-        # Switching to OpenRouter (OpenAI-compatible)
-        self.llm = ChatOpenAI(
-            model="liquid/lfm-2.5-1.2b-instruct:free",
-            temperature=0.1,
-            max_tokens=512,
-            openai_api_key=Config.OPENROUTER_API_KEY,
-            openai_api_base="https://openrouter.ai/api/v1",
-            default_headers={
-                "HTTP-Referer": "https://mcda.smu.ca",  # Optional referer
-                "X-Title": "MCDA RAG Assignment",
-            },
-        )
+    def _cache_embedder(self):
+        """
+        Query embedder for the answer cache's semantic tier, memoised so a miss
+        does not embed the query twice. None (exact tier only) without embeddings.
+        """
+        if self.embeddings is None:
+            return None
+        return lru_cache(maxsize=1)(self.embeddings.embed_query)
+
+    def _build_retriever(self):
+        """Returns the retriever for the configured backend (Config.RETRIEVER_BACKEND)."""
+        if self.lexical_index is not None:
+            return HybridRetriever(
+                dense_index=self.index,
+                lexical_index=self.lexical_index,
+                embeddings=self.embeddings,
+                k=Config.HYBRID_TOP_K,
+                candidates=Config.HYBRID_CANDIDATES,
+                rrf_k=Config.RRF_K,
+            )
+        if self.index is not None:
+            return VectorIndexRetriever(
+                index=self.index, embeddings=self.embeddings, k=Config.RETRIEVAL_TOP_K
+            )
+        return self.vectorstore.as_retriever(search_kwargs={"k": Config.RETRIEVAL_TOP_K})
+
+    def _setup_rag_components(self, llm=None, retriever=None):
+        self.retriever = retriever if retriever is not None else self._build_retriever()
+
+        if llm is not None:
+            self.llm = llm
+        elif Config.LLM_BACKEND == "fake":
+            # Offline stand-in (benchmarks / load tests): no network, no quota
+            from src.fakes import FakeChatModel
+
+            self.llm = FakeChatModel(
+                latency=Config.FAKE_LLM_LATENCY_SECONDS,
+                tokens_per_second=Config.FAKE_LLM_TOKENS_PER_SECOND,
+            )
+        else:
+            # Switching to OpenRouter (OpenAI-compatible)
+            self.llm = ChatOpenAI(
+                model="liquid/lfm-2.5-1.2b-instruct:free",
+                temperature=0.1,
+                max_tokens=512,
+                openai_api_key=Config.OPENROUTER_API_KEY,
+                openai_api_base="https://openrouter.ai/api/v1",
+                default_headers={
+                    "HTTP-Referer": "https://mcda.smu.ca",  # Optional referer
+                    "X-Title": "MCDA RAG Assignment",
+                },
+            )
 
         # Also update evaluator's LLM to use OpenRouter
         self.evaluator.llm = self.llm
@@ -77,136 +171,472 @@ class RAGQueryEngine:
             )
         )
 
-    def run_query(self, query_text: str, skip_faithfulness: bool = False):
+    @staticmethod
+    def _new_request():
+        """Returns (query id, monotonic start time) for a new request."""
+        return uuid.uuid4().hex, time.perf_counter()
+
+    @staticmethod
+    def _audit(query_id, stage, code, started, **fields):
+        """Emits the per-request audit event (structured JSON line in the security log)."""
+        latency_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        audit_event(query_id, stage, code, latency_ms, **fields)
+
+    def _blocked_result(
+        self,
+        query_text,
+        error_code,
+        triggered=None,
+        docs=(),
+        relevance=None,
+        answer=None,
+        query_id=None,
+        stage=None,
+        started=None,
+    ):
+        """
+        Builds (and logs) the result for a query stopped by a guardrail or an
+        LLM failure. `relevance` (of the query's retrieval) is recorded with it.
+        """
+        self.evaluator.log_event(error_code)
+        if relevance is not None:
+            self.evaluator.record_relevance(relevance)
+        query_id = query_id or uuid.uuid4().hex
+        self._audit(query_id, stage, error_code, started, triggered=triggered or [error_code])
+        return {
+            "query": query_text,
+            "query_id": query_id,
+            "answer": answer or self.security.get_refusal(error_code),
+            "guardrails_triggered": triggered or [error_code],
+            "error_code": error_code,
+            "chunks": [doc.page_content for doc in docs],
+            "eval": {"faithfulness": "N/A", "relevance": relevance or 0.0},
+        }
+
+    def _bound_llm(self, deadline=None):
+        # The HTTP client gets the time left on the request deadline, so a
+        # timed-out call is abandoned by the client too, not just by the caller
+        return self.llm.bind(timeout=deadline.remaining()) if deadline else self.llm
+
+    def _build_chain(self, context_text: str, deadline=None):
+        return (
+            {"context": lambda x: context_text, "question": RunnablePassthrough()}
+            | self.prompt
+            | self._bound_llm(deadline)
+            | StrOutputParser()
+        )
+
+    @staticmethod
+    def _citations(answer: str, docs) -> list:
+        citations = []
+        if "i don't know" not in answer.lower():
+            for doc in docs:
+                source = doc.metadata.get("source", "Unknown")
+                if source != "Unknown":
+                    source = Path(source).name
+                page = doc.metadata.get("page", -1)
+                citation_text = f"{source} (Page {page + 1})" if page >= 0 else source
+                citations.append(citation_text)
+        return list(set(citations))
+
+    def _queue_faithfulness(self, query_text: str, answer: str, context_text: str, query_id: str):
+        """Hands the answer to the background judge. Returns the faithfulness placeholder."""
+        sampled = self.eval_queue.submit(query_text, answer, context_text, query_id=query_id)
+        return "Pending" if sampled else "Not Sampled"
+
+    def _answer_result(
+        self, query_text, answer, docs, faithfulness, relevance, query_id, started=None
+    ):
+        self.evaluator.log_event(None)  # Successful full run
+        self.evaluator.record_relevance(relevance)
+        self._audit(query_id, "complete", "OK", started)
+        return {
+            "query": query_text,
+            # Also joins the background faithfulness score later
+            "query_id": query_id,
+            "answer": answer,
+            "guardrails_triggered": [],
+            "error_code": "None",
+            "chunks": [doc.page_content for doc in docs],
+            "citations": self._citations(answer, docs),
+            "eval": {
+                "faithfulness": faithfulness,
+                "relevance": relevance,
+            },
+        }
+
+    def _stream_answer(
+        self, context_text: str, query_text: str, on_token, deadline
+    ) -> StreamingOutputGuard:
+        """
+        Streams the LLM answer through the incremental output guardrails,
+        passing each accepted token to `on_token`. Stops as soon as the guard
+        trips, and raises LLMTimeoutError once the deadline passes, so a
+        truncated answer is never returned as complete. Closing the stream
+        ends the HTTP request.
+        """
+        guard = StreamingOutputGuard()
+        messages = self.prompt.invoke({"context": context_text, "question": query_text})
+        # Streamed from the model itself: closing a whole-chain stream drains it
+        stream = self._bound_llm(deadline).stream(messages)
+        try:
+            for chunk in stream:
+                token = chunk.content
+                if not token:
+                    continue
+                deadline.check()
+                if not guard.feed(token):
+                    break
+                on_token(token)
+        finally:
+            stream.close()
+        return guard
+
+    def run_query(
+        self,
+        query_text: str,
+        skip_faithfulness: bool = False,
+        timeout: float = None,
+        on_token=None,
+    ):
+        """
+        Answers one question. `timeout` is this request's deadline in seconds
+        (default Config.LLM_TIMEOUT_SECONDS). Safe to call from any thread.
+
+        Streaming mode: with `on_token`, the answer is streamed and each token
+        is passed to `on_token(token)` once it passes the output guardrails.
+        A violation stops the stream and the result is a POLICY_BLOCK refusal.
+
+        With Config.METRICS_ENABLED, the result carries a per-stage `trace`
+        (milliseconds) and the timings go into the process-wide histograms.
+        """
+        with start_trace() as trace:
+            return trace.attach(
+                self._run_query(query_text, skip_faithfulness, timeout, on_token, trace)
+            )
+
+    def _run_query(self, query_text, skip_faithfulness, timeout, on_token, trace):
+        deadline = self.security.limits.deadline(timeout)
+        query_id, started = self._new_request()
+
         # STEP 1: Run Input Guardrails (Length, PII, Off-Topic, Injection Sanitization)
+        trace.enter("input")
         sec_results = self.security.process_input(query_text)
         if sec_results["errors"]:
-            self.evaluator.log_event(sec_results["errors"][0])
-            return {
-                "query": query_text,
-                "answer": self.security.get_refusal(sec_results["errors"][0]),
-                "guardrails_triggered": sec_results["errors"],
-                "error_code": sec_results["errors"][0],
-                "chunks": [],
-                "eval": {"faithfulness": "N/A", "relevance": 0.0},
-            }
+            return self._blocked_result(
+                query_text,
+                sec_results["errors"][0],
+                triggered=sec_results["errors"],
+                query_id=query_id,
+                stage="input",
+                started=started,
+            )
+
+        # Repeated and paraphrased questions are answered from the cache
+        if self.answer_cache is not None:
+            trace.enter("cache")
+            embed = self._cache_embedder()
+            cached, tier = self.answer_cache.get(query_text, embed)
+            if cached is not None:
+                return self._serve_cached(query_text, cached, tier, query_id, started)
 
         # STEP 2: Retrieve chunks from ChromaDB and apply Instruction-Data Separation delimiters
+        trace.enter("retrieval")
         docs = self.retriever.invoke(query_text)
         context_text = self.security.output.wrap_context(docs)
 
         # STEP 3: Check Retrieval Confidence
-        rel_metrics = self.evaluator.calculate_retrieval_relevance(docs)
+        trace.enter("confidence")
+        # Recorded with the result: a rate-limited attempt is retried and not counted
+        rel_metrics = self.evaluator.calculate_retrieval_relevance(docs, record=False)
+        relevance = rel_metrics["avg_relevance"]
         if not self.security.output.validate_retrieval_confidence(docs):
-            self.evaluator.log_event("RETRIEVAL_EMPTY")
-            return {
-                "query": query_text,
-                "answer": self.security.get_refusal("RETRIEVAL_EMPTY"),
-                "guardrails_triggered": ["RETRIEVAL_EMPTY"],
-                "error_code": "RETRIEVAL_EMPTY",
-                "chunks": [doc.page_content for doc in docs],
-                "eval": {
-                    "faithfulness": "N/A",
-                    "relevance": rel_metrics["avg_relevance"],
-                },
-            }
-
-        # STEP 4: Query the LLM with the hardened System Prompt (wrapped in 30s timeout)
-        try:
-            # Re-creating the chain to ensure it's fresh
-            chain = (
-                {"context": lambda x: context_text, "question": RunnablePassthrough()}
-                | self.prompt
-                | self.llm
-                | StrOutputParser()
+            return self._blocked_result(
+                query_text,
+                "RETRIEVAL_EMPTY",
+                docs=docs,
+                relevance=relevance,
+                query_id=query_id,
+                stage="retrieval",
+                started=started,
             )
 
-            # Application of 30s timeout via ExecutionLimits
-            answer = self.security.limits.run_with_timeout(
-                chain.invoke, Config.LLM_TIMEOUT_SECONDS, query_text
-            )
+        # STEP 4: Query the LLM with the hardened System Prompt (within the request deadline)
+        trace.enter("generation")
+        stream_guard = None
+        try:
+            # Deadline enforced via ExecutionLimits (thread-safe, no signals)
+            if on_token is None:
+                chain = self._build_chain(context_text, deadline)
+                answer = self.security.limits.run_with_timeout(chain.invoke, deadline, query_text)
+            else:
+                stream_guard = self.security.limits.run_with_timeout(
+                    self._stream_answer, deadline, context_text, query_text, on_token, deadline
+                )
+                answer = stream_guard.text
         except LLMTimeoutError:
-            self.evaluator.log_event("LLM_TIMEOUT")
-            return {
-                "query": query_text,
-                "answer": self.security.get_refusal("LLM_TIMEOUT"),
-                "guardrails_triggered": ["LLM_TIMEOUT"],
-                "error_code": "LLM_TIMEOUT",
-                "chunks": [doc.page_content for doc in docs],
-                "eval": {
-                    "faithfulness": "N/A",
-                    "relevance": rel_metrics["avg_relevance"],
-                },
-            }
+            return self._blocked_result(
+                query_text,
+                "LLM_TIMEOUT",
+                docs=docs,
+                relevance=relevance,
+                query_id=query_id,
+                stage="generation",
+                started=started,
+            )
         except Exception as e:
             if "429" in str(e):
                 raise  # Let main.py handle retry
-            self.evaluator.log_event("LLM_ERROR")
-            return {
-                "query": query_text,
-                "answer": f"Technical Error: {e}",
-                "guardrails_triggered": ["LLM_ERROR"],
-                "error_code": "LLM_ERROR",
-                "chunks": [doc.page_content for doc in docs],
-                "eval": {
-                    "faithfulness": "N/A",
-                    "relevance": rel_metrics["avg_relevance"],
-                },
-            }
+            return self._blocked_result(
+                query_text,
+                "LLM_ERROR",
+                docs=docs,
+                relevance=relevance,
+                answer=f"Technical Error: {e}",
+                query_id=query_id,
+                stage="generation",
+                started=started,
+            )
 
         # STEP 5: Run Output Guardrails (Length, Output Validation for leaked instructions)
+        trace.enter("output")
         out_sec = self.security.process_output(answer)
+        if stream_guard is not None and stream_guard.violated and not out_sec["errors"]:
+            out_sec["errors"].append(POLICY_BLOCK)  # Stream was cut off by the guard
         if out_sec["errors"]:
-            self.evaluator.log_event(POLICY_BLOCK)
-            return {
-                "query": query_text,
-                "answer": self.security.get_refusal(POLICY_BLOCK),
-                "guardrails_triggered": out_sec["errors"],
-                "error_code": POLICY_BLOCK,
-                "chunks": [doc.page_content for doc in docs],
-                "eval": {
-                    "faithfulness": "N/A",
-                    "relevance": rel_metrics["avg_relevance"],
-                },
-            }
+            return self._blocked_result(
+                query_text,
+                POLICY_BLOCK,
+                triggered=out_sec["errors"],
+                docs=docs,
+                relevance=relevance,
+                query_id=query_id,
+                stage="output",
+                started=started,
+            )
 
         # STEP 6: Run the Faithfulness/Evaluation signals on the final output
+        trace.enter("faithfulness")
         faithfulness = "Skipped"
         if not skip_faithfulness:
-            faithfulness = self.evaluator.check_faithfulness(
-                query_text, answer, context_text
+            if self.eval_queue is not None:
+                faithfulness = self._queue_faithfulness(query_text, answer, context_text, query_id)
+            else:
+                faithfulness = self.evaluator.check_faithfulness(
+                    query_text, answer, context_text
+                )
+
+        trace.enter("finalize")
+        result = self._answer_result(
+            query_text, answer, docs, faithfulness, relevance, query_id, started
+        )
+        if self.answer_cache is not None:
+            self.answer_cache.put(query_text, result, embed)
+        return result
+
+    async def arun_query(
+        self, query_text: str, skip_faithfulness: bool = False, timeout: float = None
+    ):
+        """
+        Async version of run_query with the same steps and result format. The
+        LLM and evaluator calls are awaited, and the timeout uses asyncio.wait_for
+        instead of signals, so one event loop can serve many queries at once.
+        """
+        with start_trace() as trace:
+            result = await self._arun_query(query_text, skip_faithfulness, timeout, trace)
+            return trace.attach(result)
+
+    async def _arun_query(self, query_text, skip_faithfulness, timeout, trace):
+        deadline = self.security.limits.deadline(timeout)
+        query_id, started = self._new_request()
+
+        # STEP 1: Input Guardrails (CPU-only, run inline)
+        trace.enter("input")
+        sec_results = self.security.process_input(query_text)
+        if sec_results["errors"]:
+            return self._blocked_result(
+                query_text,
+                sec_results["errors"][0],
+                triggered=sec_results["errors"],
+                query_id=query_id,
+                stage="input",
+                started=started,
             )
 
-        self.evaluator.log_event(None)  # Successful full run
+        # The cache may embed the query, which can block, so it runs in a worker thread
+        if self.answer_cache is not None:
+            trace.enter("cache")
+            embed = self._cache_embedder()
+            cached, tier = await asyncio.to_thread(self.answer_cache.get, query_text, embed)
+            if cached is not None:
+                return self._serve_cached(query_text, cached, tier, query_id, started)
 
-        # Citations
-        citations = []
-        if "i don't know" not in answer.lower():
-            for doc in docs:
-                source = doc.metadata.get("source", "Unknown")
-                if source != "Unknown":
-                    source = Path(source).name
-                page = doc.metadata.get("page", -1)
-                citation_text = f"{source} (Page {page + 1})" if page >= 0 else source
-                citations.append(citation_text)
+        # STEP 2: Retrieval
+        trace.enter("retrieval")
+        docs = await self.retriever.ainvoke(query_text)
+        context_text = self.security.output.wrap_context(docs)
 
-        return {
-            "query": query_text,
-            "answer": answer,
-            "guardrails_triggered": [],
-            "error_code": "None",
-            "chunks": [doc.page_content for doc in docs],
-            "citations": list(set(citations)),
-            "eval": {
-                "faithfulness": faithfulness,
-                "relevance": rel_metrics["avg_relevance"],
-            },
-        }
+        # STEP 3: Retrieval Confidence
+        trace.enter("confidence")
+        # Recorded with the result: a rate-limited attempt is retried and not counted
+        rel_metrics = self.evaluator.calculate_retrieval_relevance(docs, record=False)
+        relevance = rel_metrics["avg_relevance"]
+        if not self.security.output.validate_retrieval_confidence(docs):
+            return self._blocked_result(
+                query_text,
+                "RETRIEVAL_EMPTY",
+                docs=docs,
+                relevance=relevance,
+                query_id=query_id,
+                stage="retrieval",
+                started=started,
+            )
+
+        # STEP 4: LLM call, cancelled if it exceeds the timeout
+        trace.enter("generation")
+        try:
+            chain = self._build_chain(context_text, deadline)
+            try:
+                answer = await asyncio.wait_for(
+                    chain.ainvoke(query_text), timeout=deadline.remaining()
+                )
+            except Exception as e:
+                # The HTTP client may hit the same deadline first and raise its own error
+                if isinstance(e, asyncio.TimeoutError) or deadline.expired:
+                    raise LLMTimeoutError(
+                        f"LLM processing exceeded timeout of {deadline.seconds} seconds"
+                    ) from e
+                raise
+        except LLMTimeoutError as e:
+            logging.error(
+                f"Guardrail Triggered: {LLM_TIMEOUT} - {str(e)}",
+                extra={"fields": {"code": LLM_TIMEOUT, "guardrail": "llm_timeout"}},
+            )
+            return self._blocked_result(
+                query_text,
+                "LLM_TIMEOUT",
+                docs=docs,
+                relevance=relevance,
+                query_id=query_id,
+                stage="generation",
+                started=started,
+            )
+        except Exception as e:
+            if "429" in str(e):
+                raise  # Let the caller handle retry
+            return self._blocked_result(
+                query_text,
+                "LLM_ERROR",
+                docs=docs,
+                relevance=relevance,
+                answer=f"Technical Error: {e}",
+                query_id=query_id,
+                stage="generation",
+                started=started,
+            )
+
+        # STEP 5: Output Guardrails
+        trace.enter("output")
+        out_sec = self.security.process_output(answer)
+        if out_sec["errors"]:
+            return self._blocked_result(
+                query_text,
+                POLICY_BLOCK,
+                triggered=out_sec["errors"],
+                docs=docs,
+                relevance=relevance,
+                query_id=query_id,
+                stage="output",
+                started=started,
+            )
+
+        # STEP 6: Faithfulness
+        trace.enter("faithfulness")
+        faithfulness = "Skipped"
+        if not skip_faithfulness:
+            if self.eval_queue is not None:
+                faithfulness = self._queue_faithfulness(query_text, answer, context_text, query_id)
+            else:
+                faithfulness = await self.evaluator.acheck_faithfulness(
+                    query_text, answer, context_text
+                )
+
+        trace.enter("finalize")
+        result = self._answer_result(
+            query_text, answer, docs, faithfulness, relevance, query_id, started
+        )
+        if self.answer_cache is not None:
+            await asyncio.to_thread(self.answer_cache.put, query_text, result, embed)
+        return result
+
+    def run_batch(
+        self, queries: list, concurrency: int = None, skip_faithfulness=False, on_result=None
+    ) -> list:
+        """
+        Runs many queries concurrently and returns their results in input order.
+        Calls share the LLM provider's token bucket, concurrency shrinks on 429s,
+        and rate-limited queries are retried after Retry-After. `skip_faithfulness`
+        is one bool for every query or a list aligned with `queries`.
+        """
+        if isinstance(skip_faithfulness, bool):
+            skip_faithfulness = [skip_faithfulness] * len(queries)
+        scheduler = BatchScheduler(concurrency=concurrency)
+        items = list(zip(queries, skip_faithfulness))
+        # An inline faithfulness judge is a second call to the same provider
+        # (background evaluations take their own tokens when they run)
+        costs = [1.0 if skip or self.eval_queue is not None else 2.0 for skip in skip_faithfulness]
+
+        def on_error(item, e):
+            print(f"Error querying LLM: {e}")
+            return self._blocked_result(
+                item[0], "LLM_ERROR", answer=f"Generation Error: {e}", stage="generation"
+            )
+
+        return scheduler.run(
+            lambda item: self.run_query(item[0], skip_faithfulness=item[1]),
+            items,
+            costs=costs,
+            on_error=on_error,
+            on_result=on_result,
+        )
+
+    def _serve_cached(
+        self, query_text: str, cached: dict, tier: str, query_id: str, started: float
+    ):
+        """Returns a cached result, re-checked against the output guardrails first."""
+        out_sec = self.security.process_output(cached["answer"])
+        if out_sec["errors"]:
+            # Guardrails changed since the answer was cached; never serve it again
+            self.answer_cache.invalidate(cached["query"])
+            result = self._blocked_result(
+                query_text,
+                POLICY_BLOCK,
+                triggered=out_sec["errors"],
+                query_id=query_id,
+                stage="cache",
+                started=started,
+            )
+            result["chunks"] = cached["chunks"]
+            result["eval"]["relevance"] = cached["eval"]["relevance"]
+            return result
+
+        self.evaluator.log_event(None)
+        self._audit(query_id, "cache", "OK", started, cache=tier)
+        # A background score is recorded under the id of the query that was judged
+        cached["cached_from"] = cached["query_id"]
+        cached["query"] = query_text
+        cached["query_id"] = query_id
+        cached["cache"] = tier
+        if self.eval_queue is not None:
+            self.eval_queue.join_results([cached])
+        return cached
 
     @staticmethod
-    def format_result(result):
-        output = f"Question: {result['query']}\n"
-        output += f"Answer: {result['answer']}\n"
+    def format_result(result, show_answer: bool = True):
+        output = ""
+        if show_answer:
+            output += f"Question: {result['query']}\n"
+            output += f"Answer: {result['answer']}\n"
         if result.get("eval"):
             output += f"Faithfulness/Eval Score: {result['eval']['faithfulness']} (Relevance: {result['eval']['relevance']:.2f})\n"
         if result.get("citations"):
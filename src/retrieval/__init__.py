@@ -0,0 +1,16 @@
+from src.retrieval.numpy_index import NumpyVectorIndex, NumpyIndexWriter
+from src.retrieval.ivf_index import IVFIndex
+from src.retrieval.bm25_index import BM25Index, tokenize
+from src.retrieval.retrievers import HybridRetriever, VectorIndexRetriever, reciprocal_rank_fusion
+
+# Expose key components at package level
+__all__ = [
+    "NumpyVectorIndex",
+    "NumpyIndexWriter",
+    "IVFIndex",
+    "BM25Index",
+    "tokenize",
+    "VectorIndexRetriever",
+    "HybridRetriever",
+    "reciprocal_rank_fusion",
+]
@@ -0,0 +1,135 @@
+import re
+from pathlib import Path
+import numpy as np
+from src.config import Config
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+# Function words that carry no lexical signal for handbook questions
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it of on or "
+    "should the to what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word/number tokens without stopwords ("50", "2.5" and "demerit" survive)."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the same rows as a NumpyVectorIndex, so lexical and dense
+    hits share row numbers and the record side table.
+
+    Postings are stored CSR-style: the rows containing term t are
+    rows[offsets[t]:offsets[t + 1]] with matching term frequencies in tfs.
+    Persisted as one .npz file next to the vector store.
+    """
+
+    def __init__(
+        self,
+        base_index,
+        terms,
+        offsets,
+        rows,
+        tfs,
+        doc_lengths,
+        k1: float = None,
+        b: float = None,
+    ):
+        self.base = base_index
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.terms = terms
+        self.offsets = offsets
+        self.rows = rows
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1 if k1 is not None else Config.BM25_K1
+        self.b = b if b is not None else Config.BM25_B
+        self.avgdl = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+        doc_freq = np.diff(offsets)
+        count = len(doc_lengths)
+        # BM25+ style idf, never negative for very common terms
+        self.idf = np.log(1.0 + (count - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def record(self, row: int) -> dict:
+        return self.base.record(row)
+
+    @classmethod
+    def build(cls, base_index) -> "BM25Index":
+        """Tokenizes every record of the base index into an inverted index."""
+        postings = {}
+        doc_lengths = np.zeros(len(base_index), dtype=np.float32)
+        for row in range(len(base_index)):
+            tokens = tokenize(base_index.record(row)["text"])
+            doc_lengths[row] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((row, tf))
+
+        terms = sorted(postings)
+        sizes = [len(postings[t]) for t in terms]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        rows = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            entries = postings[term]
+            rows[offsets[i] : offsets[i + 1]] = [r for r, _ in entries]
+            tfs[offsets[i] : offsets[i + 1]] = [tf for _, tf in entries]
+        return cls(base_index, terms, offsets, rows, tfs, doc_lengths)
+
+    def save(self, path: Path):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            terms=np.asarray(self.terms, dtype=str),
+            offsets=self.offsets,
+            rows=self.rows,
+            tfs=self.tfs,
+            doc_lengths=self.doc_lengths,
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, base_index, path: Path) -> "BM25Index":
+        data = np.load(path)
+        if len(data["doc_lengths"]) != len(base_index):
+            raise ValueError(
+                f"BM25 index at {path} was built for {len(data['doc_lengths'])} rows, "
+                f"vector index has {len(base_index)}. Re-run ingestion."
+            )
+        return cls(
+            base_index,
+            data["terms"].tolist(),
+            data["offsets"],
+            data["rows"],
+            data["tfs"],
+            data["doc_lengths"],
+        )
+
+    def search(self, query_text: str, k: int = 4) -> list[tuple[int, float]]:
+        """Returns [(row, bm25_score)] for the k best-matching rows, best first."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in set(tokenize(query_text)):
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            rows = self.rows[self.offsets[t] : self.offsets[t + 1]]
+            tf = self.tfs[self.offsets[t] : self.offsets[t + 1]]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[rows] / self.avgdl)
+            scores[rows] += self.idf[t] * tf * (self.k1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if len(matched) == 0:
+            return []
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
@@ -0,0 +1,152 @@
+import math
+from pathlib import Path
+import numpy as np
+from src.config import Config
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour search over a NumpyVectorIndex using an
+    inverted file (IVF): rows are clustered with spherical k-means and a query
+    only scores the rows in its `nprobe` closest clusters.
+
+    Raising `nprobe` trades latency for recall; nprobe == nlist is exact search.
+    Persisted as one .npz file holding the centroids and the row lists (CSR layout).
+    """
+
+    BLOCK_ROWS = 65_536
+
+    def __init__(
+        self,
+        base_index,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        list_rows: np.ndarray,
+        nprobe: int = None,
+    ):
+        self.base = base_index
+        self.centroids = centroids.astype(np.float32)
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.nprobe = nprobe or Config.IVF_NPROBE
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def record(self, row: int) -> dict:
+        return self.base.record(row)
+
+    @staticmethod
+    def default_nlist(count: int) -> int:
+        """Rule of thumb: about 4 * sqrt(N) lists, at least 1."""
+        return max(1, min(count, int(4 * math.sqrt(count))))
+
+    @classmethod
+    def _assign(cls, vectors, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid (max cosine) of every row, computed in blocks."""
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), cls.BLOCK_ROWS):
+            block = np.asarray(vectors[start : start + cls.BLOCK_ROWS], dtype=np.float32)
+            labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    @classmethod
+    def build(
+        cls,
+        base_index,
+        nlist: int = None,
+        iterations: int = None,
+        sample_size: int = None,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Trains centroids with spherical k-means on a sample and assigns every row."""
+        count = len(base_index)
+        if count == 0:
+            raise ValueError("Cannot build an IVF index over an empty vector index")
+        nlist = min(nlist or Config.IVF_NLIST or cls.default_nlist(count), count)
+        iterations = iterations or Config.IVF_TRAIN_ITERATIONS
+        sample_size = sample_size or max(nlist * 64, 10_000)
+
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(count, size=min(sample_size, count), replace=False))
+        sample = np.asarray(base_index.vectors[sample_rows], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            sizes = np.bincount(labels, minlength=nlist)
+            empty = sizes == 0
+            if empty.any():
+                # Re-seed empty clusters with random sample rows
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms > 0, norms, 1.0)
+
+        labels = cls._assign(base_index.vectors, centroids)
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        sizes = np.bincount(labels, minlength=nlist)
+        list_offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        return cls(base_index, centroids, list_offsets, order)
+
+    def save(self, path: Path):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_rows=self.list_rows,
+            count=np.int64(len(self.base)),
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, base_index, path: Path, nprobe: int = None) -> "IVFIndex":
+        data = np.load(path)
+        if int(data["count"]) != len(base_index):
+            raise ValueError(
+                f"IVF index at {path} was built for {int(data['count'])} rows, "
+                f"vector index has {len(base_index)}. Re-run ingestion."
+            )
+        return cls(
+            base_index,
+            data["centroids"],
+            data["list_offsets"],
+            data["list_rows"],
+            nprobe=nprobe,
+        )
+
+    def search(self, query_vector, k: int = 4, nprobe: int = None) -> list[tuple[int, float]]:
+        """Returns [(row, score)] for the approximate top-k rows, best first."""
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(self.nlist)
+        candidates = np.concatenate(
+            [self.list_rows[self.list_offsets[c] : self.list_offsets[c + 1]] for c in probes]
+        )
+        if len(candidates) == 0:
+            return []
+
+        candidates.sort()  # sequential reads from the memory map
+        scores = np.asarray(self.base.vectors[candidates], dtype=np.float32) @ query
+        k = min(k, len(candidates))
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
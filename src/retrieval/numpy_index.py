@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+from src.config import Config
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine-similarity index over an L2-normalised embedding matrix kept in
+    a memory-mapped file.
+
+    On disk (one directory):
+      - vectors.bin    raw row-major float32/float16 matrix
+      - records.jsonl  one {"id", "text", "metadata"} record per row
+      - offsets.npy    byte offset of each record, so only top-k rows are read
+      - meta.json      {"count", "dim", "dtype"}
+    """
+
+    # Rows scored per block when the matrix is float16, bounding the float32 copy
+    BLOCK_ROWS = 65_536
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        meta_path = self.index_dir / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No vector index found at {self.index_dir}")
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        self.count = meta["count"]
+        self.dim = meta["dim"]
+        self.dtype = np.dtype(meta["dtype"])
+        self.vectors = (
+            np.memmap(
+                self.index_dir / "vectors.bin",
+                dtype=self.dtype,
+                mode="r",
+                shape=(self.count, self.dim),
+            )
+            if self.count
+            else np.zeros((0, self.dim), dtype=self.dtype)
+        )
+        records_path = self.index_dir / "records.jsonl"
+        # Row i spans offsets[i]..offsets[i + 1]; the sentinel is the file size
+        self.offsets = np.append(
+            np.load(self.index_dir / "offsets.npy"), records_path.stat().st_size
+        )
+        self._records_fd = os.open(records_path, os.O_RDONLY)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def record(self, row: int) -> dict:
+        """Reads the id/text/metadata of one row from the side table (thread-safe)."""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(os.pread(self._records_fd, end - start, start))
+
+    def scores(self, query_vector) -> np.ndarray:
+        """Cosine similarity of the query against every row."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        if self.dtype == np.float32:
+            return self.vectors @ query
+
+        out = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, self.BLOCK_ROWS):
+            block = self.vectors[start : start + self.BLOCK_ROWS].astype(np.float32)
+            out[start : start + len(block)] = block @ query
+        return out
+
+    def search(self, query_vector, k: int = 4) -> list[tuple[int, float]]:
+        """Returns [(row, score)] for the k most similar rows, best first."""
+        if self.count == 0:
+            return []
+        scores = self.scores(query_vector)
+        k = min(k, self.count)
+        if k < self.count:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(self.count)
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def close(self):
+        os.close(self._records_fd)
+
+
+class NumpyIndexWriter:
+    """
+    Streams rows into a new index directory. Rows are normalised on write and
+    the directory only replaces the live index when `finalize()` succeeds.
+    """
+
+    def __init__(self, index_dir: Path, dtype: str = None):
+        self.index_dir = Path(index_dir)
+        self.dtype = np.dtype(dtype or Config.NUMPY_INDEX_DTYPE)
+        self.tmp_dir = self.index_dir.with_name(self.index_dir.name + ".tmp")
+        if self.tmp_dir.exists():
+            shutil.rmtree(self.tmp_dir)
+        self.tmp_dir.mkdir(parents=True)
+
+        self._vectors = open(self.tmp_dir / "vectors.bin", "wb")
+        self._records = open(self.tmp_dir / "records.jsonl", "wb")
+        self._offsets = []
+        self.count = 0
+        self.dim = None
+
+    def add(self, ids: list[str], texts: list[str], metadatas: list[dict], vectors):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError("vectors must be a 2-D array with one row per id")
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dim vectors, got {matrix.shape[1]}")
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms > 0, norms, 1.0)
+        self._vectors.write(matrix.astype(self.dtype).tobytes())
+
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            self._offsets.append(self._records.tell())
+            line = json.dumps({"id": chunk_id, "text": text, "metadata": metadata or {}})
+            self._records.write(line.encode("utf-8") + b"\n")
+        self.count += len(ids)
+
+    def finalize(self):
+        self._vectors.close()
+        self._records.close()
+        np.save(self.tmp_dir / "offsets.npy", np.asarray(self._offsets, dtype=np.int64))
+        (self.tmp_dir / "meta.json").write_text(
+            json.dumps(
+                {"count": self.count, "dim": self.dim or 0, "dtype": self.dtype.name}
+            ),
+            encoding="utf-8",
+        )
+        if self.index_dir.exists():
+            shutil.rmtree(self.index_dir)
+        self.tmp_dir.rename(self.index_dir)
+
+    @classmethod
+    def build_from_chroma(cls, vectorstore, index_dir: Path, page_size: int = 1000):
+        """
+        Exports every stored vector from a Chroma collection into a fresh index,
+        page by page, without re-embedding anything.
+        """
+        writer = cls(index_dir)
+        offset = 0
+        while True:
+            page = vectorstore.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=page_size,
+                offset=offset,
+            )
+            if not page["ids"]:
+                break
+            writer.add(page["ids"], page["documents"], page["metadatas"], page["embeddings"])
+            offset += len(page["ids"])
+        writer.finalize()
+        return writer.count
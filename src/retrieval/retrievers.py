@@ -0,0 +1,87 @@
+from typing import Any
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+class VectorIndexRetriever(BaseRetriever):
+    """
+    LangChain retriever over a local vector index (e.g. NumpyVectorIndex).
+    Each returned Document carries its cosine similarity in metadata["score"],
+    which the retrieval-confidence guardrail and evaluator read.
+    """
+
+    index: Any
+    embeddings: Any
+    k: int = 4
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        query_vector = self.embeddings.embed_query(query)
+        docs = []
+        for row, score in self.index.search(query_vector, k=self.k):
+            record = self.index.record(row)
+            metadata = dict(record["metadata"])
+            metadata["score"] = score
+            docs.append(
+                Document(id=record["id"], page_content=record["text"], metadata=metadata)
+            )
+        return docs
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], rrf_k: int = 60) -> list[tuple[int, float]]:
+    """Fuses ranked row lists: score(row) = sum over rankings of 1 / (rrf_k + rank)."""
+    fused = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Fuses BM25 and dense rankings with reciprocal rank fusion, so exact terms
+    ("demerit", "50 km/h") and paraphrases both reach the top-k.
+
+    metadata["score"] is the chunk's cosine similarity to the query (used by the
+    retrieval-confidence guardrail); metadata["rrf_score"] is the fused score.
+    """
+
+    dense_index: Any
+    lexical_index: Any
+    embeddings: Any
+    k: int = 4
+    candidates: int = 20
+    rrf_k: int = 60
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm > 0:
+            query_vector = query_vector / norm
+
+        dense = self.dense_index.search(query_vector, k=self.candidates)
+        lexical = self.lexical_index.search(query, k=self.candidates)
+        fused = reciprocal_rank_fusion(
+            [[row for row, _ in dense], [row for row, _ in lexical]], self.rrf_k
+        )[: self.k]
+
+        cosine = dict(dense)
+        vectors = self.lexical_index.base.vectors
+        docs = []
+        for row, rrf_score in fused:
+            record = self.lexical_index.record(row)
+            metadata = dict(record["metadata"])
+            if row not in cosine:
+                # Lexical-only hit: score it against the query directly
+                cosine[row] = float(np.asarray(vectors[row], dtype=np.float32) @ query_vector)
+            metadata["score"] = cosine[row]
+            metadata["rrf_score"] = rrf_score
+            docs.append(
+                Document(id=record["id"], page_content=record["text"], metadata=metadata)
+            )
+        return docs
@@ -0,0 +1,195 @@
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.config import Config
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to
+    `capacity`. `pause(seconds)` empties the bucket and blocks all callers for
+    that long (used to honour a provider's Retry-After).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self.paused_until:
+            start = max(self.updated, self.paused_until)
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Blocks until `tokens` are available, then takes them."""
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = max(self.paused_until - now, (tokens - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """Returns the process-wide bucket for a provider (Config.PROVIDER_RATE_LIMITS)."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            # Unlisted providers are effectively unlimited
+            rate, burst = Config.PROVIDER_RATE_LIMITS.get(provider, (1e6, 1e6))
+            _limiters[provider] = TokenBucket(rate, burst)
+        return _limiters[provider]
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit that adapts AIMD-style: halved on every rate-limit
+    response, raised by one after `limit` consecutive successes.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = max(maximum, initial)
+        self.limit = max(minimum, initial)
+        self.in_flight = 0
+        self.successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, rate_limited: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(self.minimum, self.limit // 2)
+                self.successes = 0
+            else:
+                self.successes += 1
+                if self.successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self.successes = 0
+            self._cond.notify_all()
+
+
+def is_rate_limited(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    return status == 429 or "429" in str(error)
+
+
+def retry_after(error: Exception):
+    """Seconds to wait from a Retry-After header or a "try again in Ns" message, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+    match = re.search(r"(?:retry after|try again in)\s*([\d.]+)\s*s", str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+class BatchScheduler:
+    """
+    Runs `fn(item)` over a list of items on a thread pool and returns the
+    results in input order. Every call takes a token from the provider's
+    bucket first. Concurrency shrinks on 429s, and a rate-limited call is
+    retried after the Retry-After delay (or an exponential backoff). The
+    whole provider bucket pauses meanwhile, so other workers back off too.
+    """
+
+    def __init__(
+        self,
+        provider: str = None,
+        concurrency: int = None,
+        max_concurrency: int = None,
+        max_retries: int = None,
+        backoff_seconds: float = None,
+    ):
+        self.limiter = get_rate_limiter(provider or Config.LLM_PROVIDER)
+        initial = concurrency or Config.QUERY_CONCURRENCY
+        self.concurrency = AdaptiveConcurrency(
+            initial, max_concurrency or max(initial, Config.QUERY_MAX_CONCURRENCY)
+        )
+        self.max_retries = max_retries if max_retries is not None else Config.QUERY_MAX_RETRIES
+        self.backoff_seconds = (
+            backoff_seconds if backoff_seconds is not None else Config.QUERY_BACKOFF_SECONDS
+        )
+        self.stats = {"calls": 0, "rate_limited": 0, "retries": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _run_one(self, fn, item, cost, on_error):
+        for attempt in range(self.max_retries + 1):
+            self.concurrency.acquire()
+            rate_limited = False
+            try:
+                self.limiter.acquire(cost)
+                self._count("calls")
+                return fn(item)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    if on_error is None:
+                        raise
+                    return on_error(item, e)
+                rate_limited = True
+                self._count("rate_limited")
+                if attempt == self.max_retries:
+                    if on_error is None:
+                        raise
+                    return on_error(item, e)
+                delay = retry_after(e)
+                if delay is None:
+                    delay = self.backoff_seconds * 2**attempt * random.uniform(0.5, 1.5)
+                self.limiter.pause(delay)
+                self._count("retries")
+            finally:
+                self.concurrency.release(rate_limited)
+
+    def run(self, fn, items: list, costs: list = None, on_error=None, on_result=None) -> list:
+        """
+        Returns [fn(item) for item in items], computed concurrently. `costs` gives
+        the bucket tokens each item consumes (default 1). `on_error(item, exc)`
+        turns a failure into a result instead of raising. `on_result(index, result)`
+        is called as each item finishes (from a worker thread).
+        """
+        costs = costs or [1.0] * len(items)
+        results = [None] * len(items)
+
+        def work(index):
+            results[index] = self._run_one(fn, items[index], costs[index], on_error)
+            if on_result is not None:
+                on_result(index, results[index])
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency.maximum)) as pool:
+            for future in [pool.submit(work, i) for i in range(len(items))]:
+                future.result()
+        return results
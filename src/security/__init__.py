@@ -1,4 +1,3 @@
-import logging
 from src.config import Config
 from src.security.errors import (
     QUERY_TOO_LONG,
@@ -10,7 +9,10 @@ from src.security.errors import (
     LLMTimeoutError,
 )
 from src.security.input_guardrails import InputGuardrails
-from src.security.output_guardrails import OutputGuardrails
+from src.security.guardrail_matcher import GuardrailMatcher
+from src.security.pii_redactor import PIIRedactor, StreamingRedactor
+from src.security.audit_log import AuditLogger, audit_event, get_audit_logger
+from src.security.output_guardrails import OutputGuardrails, StreamingOutputGuard
 from src.security.execution_limits import ExecutionLimits
 
 
@@ -26,15 +28,14 @@ class SecurityLayer:
         self.limits = ExecutionLimits()
 
     def _setup_logging(self):
-        """Initializes logging configuration."""
+        """
+        Initializes logging: records go through a bounded queue to a background
+        writer that appends JSON lines to Config.SECURITY_LOG_FILE (see audit_log).
+        """
         if not Config.SECURITY_LOG_DIR.exists():
             Config.SECURITY_LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-        logging.basicConfig(
-            filename=Config.SECURITY_LOG_FILE,
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-        )
+        self.audit_log = get_audit_logger()
 
     @staticmethod
     def get_refusal(error_code: str) -> str:
@@ -72,21 +73,15 @@ class SecurityLayer:
         if results["pii_detected"]:
             results["errors"].append(PII_DETECTED)
 
-        results["off_topic"] = self.input.is_off_topic(results["clean_query"])
-        if results["off_topic"]:
-            results["errors"].append(OFF_TOPIC)
-
-        results["injection_attempt"] = self.input.is_injection_attempt(
-            results["clean_query"]
-        )
+        # Off-topic, injection and jailbreak verdicts come from one compiled scan.
+        # Policy blocks are listed first so an attack is reported as one even when off-topic.
+        results.update(self.input.scan(results["clean_query"]))
         if results["injection_attempt"]:
             results["errors"].append(POLICY_BLOCK)
-
-        results["jailbreak_attempt"] = self.input.is_jailbreak_attempt(
-            results["clean_query"]
-        )
         if results["jailbreak_attempt"]:
             results["errors"].append(POLICY_BLOCK)
+        if results["off_topic"]:
+            results["errors"].append(OFF_TOPIC)
 
         return results
 
@@ -111,7 +106,13 @@ class SecurityLayer:
 __all__ = [
     "SecurityLayer",
     "InputGuardrails",
+    "GuardrailMatcher",
+    "PIIRedactor",
+    "StreamingRedactor",
+    "AuditLogger",
+    "audit_event",
     "OutputGuardrails",
+    "StreamingOutputGuard",
     "ExecutionLimits",
     "QUERY_TOO_LONG",
     "OFF_TOPIC",
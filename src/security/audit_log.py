@@ -0,0 +1,279 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+from src.config import Config
+
+AUDIT_LOGGER_NAME = "rag.audit"
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    One JSON object per record: timestamp, level, logger, message, plus any
+    structured fields passed as `extra={"fields": {...}}`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, default=str)
+
+
+class _BatchedWrites:
+    """
+    Buffers written records and flushes the file every `batch_size` records
+    (or when the listener goes idle) instead of after every record.
+    """
+
+    batch_size = 1
+    _pending = 0
+    _in_emit = False
+
+    def emit(self, record):
+        self._in_emit = True  # StreamHandler.emit flushes after each write; defer it
+        try:
+            super().emit(record)
+        finally:
+            self._in_emit = False
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._in_emit:
+            return
+        self._pending = 0
+        super().flush()
+
+
+class BatchedRotatingFileHandler(_BatchedWrites, RotatingFileHandler):
+    """
+    Size-based rotation (AUDIT_LOG_MAX_BYTES, AUDIT_LOG_BACKUPS) with batched
+    writes. The file size is tracked here rather than read with seek/tell,
+    which would flush the write buffer on every record. The text formatted to
+    measure a record is reused when the record is written.
+    """
+
+    _size = None
+    _formatted = (None, None)  # (record, text) measured by shouldRollover
+
+    def format(self, record):
+        measured, text = self._formatted
+        if measured is record:
+            return text
+        return super().format(record)
+
+    def shouldRollover(self, record):
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        if self._size is None:
+            if not os.path.isfile(self.baseFilename):
+                self.maxBytes = 0  # Never rotate anything other than a regular file
+                return False
+            self._size = os.path.getsize(self.baseFilename)
+        text = super().format(record)
+        self._formatted = (record, text)
+        size = len((text + self.terminator).encode(self.encoding or "utf-8"))
+        if self._size and self._size + size >= self.maxBytes:
+            self._size = size  # The record goes to the fresh file
+            return True
+        self._size += size
+        return False
+
+
+class BatchedTimedRotatingFileHandler(_BatchedWrites, TimedRotatingFileHandler):
+    """Time-based rotation (AUDIT_LOG_ROTATE_WHEN, AUDIT_LOG_BACKUPS) with batched writes."""
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue for the background listener.
+
+    Overflow policy when the queue is full:
+      - "drop"  (default): the new record is discarded at once, so logging never
+        blocks a request;
+      - "block": wait up to AUDIT_LOG_BLOCK_SECONDS for space, then discard.
+    Discarded records are counted in `dropped`. The count is written to the
+    log as an "audit_records_dropped" event once the queue has room again.
+    """
+
+    def __init__(self, log_queue, overflow: str = None, block_seconds: float = None):
+        super().__init__(log_queue)
+        self.overflow = overflow or Config.AUDIT_LOG_OVERFLOW
+        if self.overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown AUDIT_LOG_OVERFLOW policy: {self.overflow}")
+        self.block_seconds = (
+            block_seconds if block_seconds is not None else Config.AUDIT_LOG_BLOCK_SECONDS
+        )
+        self.dropped = 0
+        self._reported = 0
+        self._lock_dropped = threading.Lock()
+
+    def _put(self, record) -> bool:
+        try:
+            if self.overflow == "block":
+                self.queue.put(record, timeout=self.block_seconds)
+            else:
+                self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def enqueue(self, record):
+        if not self._put(record):
+            with self._lock_dropped:
+                self.dropped += 1
+            return
+        with self._lock_dropped:
+            unreported = self.dropped - self._reported
+            self._reported = self.dropped
+        if unreported:
+            notice = logging.LogRecord(
+                AUDIT_LOGGER_NAME,
+                logging.WARNING,
+                __file__,
+                0,
+                "Audit queue full: records dropped",
+                None,
+                None,
+            )
+            notice.fields = {"event": "audit_records_dropped", "count": unreported}
+            if not self._put(notice):
+                with self._lock_dropped:
+                    self._reported -= unreported  # Try again with the next record
+
+
+class BatchingQueueListener(QueueListener):
+    """Listener that flushes its handlers whenever the queue has been idle for `flush_seconds`."""
+
+    def __init__(self, log_queue, *handlers, flush_seconds: float = None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None else Config.AUDIT_LOG_FLUSH_SECONDS
+        )
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_seconds)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # Waits for room instead of failing on a full queue
+
+
+class AuditLogger:
+    """
+    Non-blocking audit log: the request thread only puts the record on a
+    bounded queue (BoundedQueueHandler); a background QueueListener formats
+    it as a JSON line and writes it, in batches, to a rotating file.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        queue_size: int = None,
+        overflow: str = None,
+        batch_size: int = None,
+        flush_seconds: float = None,
+        rotation: str = None,
+    ):
+        self.path = path or Config.SECURITY_LOG_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        rotation = rotation or Config.AUDIT_LOG_ROTATION
+        if rotation == "size":
+            self.file_handler = BatchedRotatingFileHandler(
+                self.path,
+                maxBytes=Config.AUDIT_LOG_MAX_BYTES,
+                backupCount=Config.AUDIT_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+        elif rotation == "time":
+            self.file_handler = BatchedTimedRotatingFileHandler(
+                self.path,
+                when=Config.AUDIT_LOG_ROTATE_WHEN,
+                backupCount=Config.AUDIT_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+        else:
+            raise ValueError(f"Unknown AUDIT_LOG_ROTATION: {rotation}")
+        self.file_handler.batch_size = batch_size or Config.AUDIT_LOG_BATCH_SIZE
+        self.file_handler.setFormatter(JsonLineFormatter())
+
+        self.queue = queue.Queue(maxsize=queue_size or Config.AUDIT_LOG_QUEUE_SIZE)
+        self.handler = BoundedQueueHandler(self.queue, overflow)
+        self.listener = BatchingQueueListener(
+            self.queue, self.file_handler, flush_seconds=flush_seconds
+        )
+        self.listener.start()
+        self._stopped = False
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    def install(self, logger: logging.Logger = None, level: int = logging.INFO):
+        """Routes `logger` (default: the root logger) through the queue."""
+        logger = logger or logging.getLogger()
+        logger.addHandler(self.handler)
+        logger.setLevel(level)
+
+    def stop(self):
+        """Writes out everything still queued and closes the file."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
+        self.file_handler.close()
+
+
+_audit_logger = None
+_audit_logger_lock = threading.Lock()
+
+
+def get_audit_logger() -> AuditLogger:
+    """Returns the process-wide audit logger, installed on the root logger on first use."""
+    global _audit_logger
+    with _audit_logger_lock:
+        if _audit_logger is None:
+            _audit_logger = AuditLogger()
+            _audit_logger.install()
+            atexit.register(_audit_logger.stop)
+        return _audit_logger
+
+
+def audit_event(query_id: str, stage: str, code: str, latency_ms: float, **fields):
+    """Logs one per-request event with structured fields (query id, stage, code, latency)."""
+    logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(
+        f"Request {code} at {stage}",
+        extra={
+            "fields": {
+                "event": "request",
+                "query_id": query_id,
+                "stage": stage,
+                "code": code,
+                "latency_ms": round(latency_ms, 2),
+                **fields,
+            }
+        },
+    )
@@ -1,19 +1,70 @@
+import contextvars
 import logging
-import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from functools import wraps
 from src.config import Config
 from src.security.errors import LLM_TIMEOUT, LLMTimeoutError
 
 
+class Deadline:
+    """
+    A point in (monotonic) time by which a request must finish. Pass
+    `remaining()` down to HTTP clients so the network call itself gives up
+    at the deadline instead of lingering after the caller has moved on.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self):
+        """Raises LLMTimeoutError if the deadline has passed."""
+        if self.expired:
+            raise LLMTimeoutError(
+                f"LLM processing exceeded timeout of {self.seconds} seconds"
+            )
+
+
 class ExecutionLimits:
     """
     Handles timeouts and other execution-related constraints.
+
+    Calls run on a shared worker pool and the caller waits on the future for
+    at most the timeout, so limits work per call from any thread (unlike
+    SIGALRM, which is main-thread only and allows one alarm per process).
+    A call that times out is cancelled if it has not started yet. One that is
+    already running is abandoned, and it stops at its own deadline when the
+    deadline is also passed to its HTTP client.
     """
 
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=Config.EXECUTION_POOL_WORKERS,
+                    thread_name_prefix="execution-limits",
+                )
+            return cls._executor
+
     @staticmethod
-    def _handle_timeout(signum, frame):
-        raise LLMTimeoutError(
-            f"LLM processing exceeded timeout of {Config.LLM_TIMEOUT_SECONDS} seconds"
+    def deadline(timeout_seconds: float = None) -> Deadline:
+        """Starts a per-request deadline (defaults to Config.LLM_TIMEOUT_SECONDS)."""
+        return Deadline(
+            timeout_seconds if timeout_seconds is not None else Config.LLM_TIMEOUT_SECONDS
         )
 
     @classmethod
@@ -22,26 +73,49 @@ class ExecutionLimits:
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Register signal handler
-            signal.signal(signal.SIGALRM, cls._handle_timeout)
-            signal.alarm(Config.LLM_TIMEOUT_SECONDS)
-            try:
-                result = func(*args, **kwargs)
-                return result
-            except LLMTimeoutError as e:
-                logging.error(f"Guardrail Triggered: {LLM_TIMEOUT} - {str(e)}")
-                raise
-            finally:
-                signal.alarm(0)  # Disable alarm
+            # Read at call time so changes to Config apply to decorated functions
+            return cls.run_with_timeout(func, Config.LLM_TIMEOUT_SECONDS, *args, **kwargs)
 
         return wrapper
 
     @classmethod
     def run_with_timeout(cls, func, timeout_seconds, *args, **kwargs):
-        """Runs a function and enforces a timeout."""
-        signal.signal(signal.SIGALRM, cls._handle_timeout)
-        signal.alarm(timeout_seconds)
+        """
+        Runs a function and enforces a timeout. `timeout_seconds` may also be a
+        Deadline, in which case only the time remaining on it is allowed.
+        """
+        if isinstance(timeout_seconds, Deadline):
+            deadline = timeout_seconds
+        else:
+            deadline = Deadline(timeout_seconds)
+
+        error = LLMTimeoutError(
+            f"LLM processing exceeded timeout of {deadline.seconds} seconds"
+        )
+        if deadline.expired:
+            logging.error(
+                f"Guardrail Triggered: {LLM_TIMEOUT} - {str(error)}",
+                extra={"fields": {"code": LLM_TIMEOUT, "guardrail": "llm_timeout"}},
+            )
+            raise error
+
+        # Context variables (e.g. LangChain callbacks) follow the call into the worker
+        context = contextvars.copy_context()
+        future = cls._get_executor().submit(context.run, func, *args, **kwargs)
         try:
-            return func(*args, **kwargs)
-        finally:
-            signal.alarm(0)
+            return future.result(timeout=deadline.remaining())
+        except Exception as e:
+            if isinstance(e, FutureTimeoutError) and not future.done():
+                # Still queued or running: stop waiting (and never start it if queued)
+                future.cancel()
+                cause = None
+            elif deadline.expired:
+                # A client that was given the deadline failed with its own timeout error
+                cause = e
+            else:
+                raise
+        logging.error(
+            f"Guardrail Triggered: {LLM_TIMEOUT} - {str(error)}",
+            extra={"fields": {"code": LLM_TIMEOUT, "guardrail": "llm_timeout"}},
+        )
+        raise error from cause
@@ -0,0 +1,96 @@
+import re
+from functools import lru_cache
+from src.config import Config
+
+
+class GuardrailMatcher:
+    """
+    All input-guardrail patterns and keywords compiled into one regex, so a
+    single pass over the lowercased query yields every verdict.
+
+    Keywords must start a word, so "ns" no longer matches inside "lanes".
+    Longer keywords may take any ending, like the substring checks they
+    replace ("jailbreak" catches "jailbreaking", "test" catches "testing").
+    Keywords of up to SHORT_KEYWORD_LENGTH characters only take a plural
+    ending and need a boundary after it, so "dan" no longer matches inside
+    "danger". Injection patterns are regexes matched as prefixes ("you are a"
+    also catches "you are an"), so they only get a leading boundary. The pass
+    is a lookahead at each position, so overlapping matches of different
+    rules are all seen.
+
+    The alternatives are grouped into four capture groups only (keyword,
+    short keyword, word-led injection, symbol-led injection); a group per
+    rule would stop the regex engine from skipping quickly over positions
+    that cannot match. The rule behind a hit is looked up afterwards.
+    """
+
+    CATEGORIES = ("injection", "jailbreak", "topic")
+    SHORT_KEYWORD_LENGTH = 3
+
+    def __init__(self, injection_patterns, jailbreak_keywords, topic_keywords):
+        self._keyword_categories = {}
+        for category, keywords in (("jailbreak", jailbreak_keywords), ("topic", topic_keywords)):
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword.lower(), []).append(category)
+        self._injection_patterns = [(p, re.compile(p)) for p in injection_patterns]
+
+        # Longest first, so "driver's manual" is preferred over "driver"
+        keywords = sorted(self._keyword_categories, key=len, reverse=True)
+        short = [k for k in keywords if len(k) <= self.SHORT_KEYWORD_LENGTH]
+        keywords = [k for k in keywords if len(k) > self.SHORT_KEYWORD_LENGTH]
+        word_led = [p for p in injection_patterns if re.match(r"\w", p)]
+        symbol_led = [p for p in injection_patterns if not re.match(r"\w", p)]
+        word_alternatives = []
+        if keywords:
+            word_alternatives.append("(?P<keyword>" + "|".join(map(re.escape, keywords)) + ")")
+        if short:
+            word_alternatives.append(
+                "(?P<short>" + "|".join(map(re.escape, short)) + r")(?:s|es)?\b"
+            )
+        if word_led:
+            word_alternatives.append(
+                "(?P<injection>" + "|".join(f"(?:{p})" for p in word_led) + ")"
+            )
+        alternatives = []
+        if word_alternatives:
+            alternatives.append(r"\b(?:" + "|".join(word_alternatives) + ")")
+        if symbol_led:
+            alternatives.append("(?P<symbol>" + "|".join(f"(?:{p})" for p in symbol_led) + ")")
+        self._regex = re.compile("(?=" + "|".join(alternatives) + ")") if alternatives else None
+
+    def _injection_source(self, text: str, pos: int) -> str:
+        for source, pattern in self._injection_patterns:
+            if pattern.match(text, pos):
+                return source
+
+    def scan(self, text: str) -> dict:
+        """Returns {category: [patterns/keywords found, in order of first match]}."""
+        found = {category: [] for category in self.CATEGORIES}
+        if self._regex is None:
+            return found
+        text = text.lower()
+        for match in self._regex.finditer(text):
+            if match.lastgroup in ("keyword", "short"):
+                source = match.group(match.lastgroup)
+                categories = self._keyword_categories[source]
+            else:
+                source = self._injection_source(text, match.start())
+                categories = ("injection",)
+            for category in categories:
+                if source not in found[category]:
+                    found[category].append(source)
+        return found
+
+
+@lru_cache(maxsize=4)
+def _compile(injection_patterns: tuple, jailbreak_keywords: tuple, topic_keywords: tuple):
+    return GuardrailMatcher(injection_patterns, jailbreak_keywords, topic_keywords)
+
+
+def get_guardrail_matcher() -> GuardrailMatcher:
+    """Returns the matcher for the current Config lists (compiled once per distinct set)."""
+    return _compile(
+        tuple(Config.INJECTION_PATTERNS),
+        tuple(Config.JAILBREAK_KEYWORDS),
+        tuple(Config.OFF_TOPIC_KEYWORDS),
+    )
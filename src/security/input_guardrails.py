@@ -1,7 +1,29 @@
-import re
 import logging
 from src.config import Config
-from src.security.errors import QUERY_TOO_LONG, PII_DETECTED, OFF_TOPIC
+from src.security.errors import QUERY_TOO_LONG, PII_DETECTED, OFF_TOPIC, POLICY_BLOCK
+from src.security.guardrail_matcher import get_guardrail_matcher
+from src.security.pii_redactor import get_pii_redactor
+
+
+def _log_off_topic(query: str):
+    logging.warning(
+        f"Guardrail Triggered: {OFF_TOPIC} - Query: {query[:50]}...",
+        extra={"fields": {"code": OFF_TOPIC, "guardrail": "off_topic"}},
+    )
+
+
+def _log_injection(pattern: str):
+    logging.warning(
+        f"Guardrail Triggered: POLICY_BLOCK (Injection Attempt) - Pattern: {pattern}",
+        extra={"fields": {"code": POLICY_BLOCK, "guardrail": "injection", "pattern": pattern}},
+    )
+
+
+def _log_jailbreak(keyword: str):
+    logging.warning(
+        f"Guardrail Triggered: POLICY_BLOCK (Jailbreak Attempt) - Keyword: {keyword}",
+        extra={"fields": {"code": POLICY_BLOCK, "guardrail": "jailbreak", "keyword": keyword}},
+    )
 
 
 class InputGuardrails:
@@ -15,7 +37,14 @@ class InputGuardrails:
         """Returns False if the query exceeds max length, else True."""
         if len(query) > Config.MAX_QUERY_LENGTH:
             logging.warning(
-                f"Guardrail Triggered: {QUERY_TOO_LONG} - Length: {len(query)}"
+                f"Guardrail Triggered: {QUERY_TOO_LONG} - Length: {len(query)}",
+                extra={
+                    "fields": {
+                        "code": QUERY_TOO_LONG,
+                        "guardrail": "query_length",
+                        "length": len(query),
+                    }
+                },
             )
             return False
         return True
@@ -26,29 +55,52 @@ class InputGuardrails:
         Identifies and redacts PII patterns (email, phone, license plates).
         Returns (clean_query, pii_stripped_flag).
         """
-        clean_query = query
-        pii_stripped = False
+        clean_query, counts = get_pii_redactor().redact(query)
 
-        for pii_type, pattern in Config.PII_PATTERNS.items():
-            if re.search(pattern, clean_query):
-                clean_query = re.sub(pattern, "[REDACTED]", clean_query)
-                pii_stripped = True
-                logging.warning(
-                    f"Guardrail Triggered: {PII_DETECTED} - Type: {pii_type}"
-                )
+        for pii_type in counts:
+            logging.warning(
+                f"Guardrail Triggered: {PII_DETECTED} - Type: {pii_type}",
+                extra={
+                    "fields": {
+                        "code": PII_DETECTED,
+                        "guardrail": "pii",
+                        "pii_type": pii_type,
+                        "count": counts[pii_type],
+                    }
+                },
+            )
+
+        return clean_query, bool(counts)
 
-        return clean_query, pii_stripped
+    @staticmethod
+    def scan(query: str) -> dict:
+        """
+        Runs the off-topic, injection and jailbreak checks in one pass.
+        Returns {"off_topic", "injection_attempt", "jailbreak_attempt"} flags
+        and logs each triggered guardrail.
+        """
+        found = get_guardrail_matcher().scan(query)
+        if not found["topic"]:
+            _log_off_topic(query)
+        if found["injection"]:
+            _log_injection(found["injection"][0])
+        if found["jailbreak"]:
+            _log_jailbreak(found["jailbreak"][0])
+        return {
+            "off_topic": not found["topic"],
+            "injection_attempt": bool(found["injection"]),
+            "jailbreak_attempt": bool(found["jailbreak"]),
+        }
 
     @staticmethod
     def is_off_topic(query: str) -> bool:
         """
         Determines if the query is unrelated to Nova Scotia driving rules.
         """
-        query_lower = query.lower()
-        if any(keyword in query_lower for keyword in Config.OFF_TOPIC_KEYWORDS):
+        if get_guardrail_matcher().scan(query)["topic"]:
             return False  # Not off topic
 
-        logging.warning(f"Guardrail Triggered: {OFF_TOPIC} - Query: {query[:50]}...")
+        _log_off_topic(query)
         return True  # Off topic
 
     @staticmethod
@@ -56,13 +108,10 @@ class InputGuardrails:
         """
         Scans queries for known prompt injection patterns.
         """
-        query_lower = query.lower()
-        for pattern in Config.INJECTION_PATTERNS:
-            if re.search(pattern, query_lower):
-                logging.warning(
-                    f"Guardrail Triggered: POLICY_BLOCK (Injection Attempt) - Pattern: {pattern}"
-                )
-                return True
+        patterns = get_guardrail_matcher().scan(query)["injection"]
+        if patterns:
+            _log_injection(patterns[0])
+            return True
         return False
 
     @staticmethod
@@ -70,11 +119,8 @@ class InputGuardrails:
         """
         Detects potential jailbreak attempts using keyword matching.
         """
-        query_lower = query.lower()
-        for keyword in Config.JAILBREAK_KEYWORDS:
-            if keyword in query_lower:
-                logging.warning(
-                    f"Guardrail Triggered: POLICY_BLOCK (Jailbreak Attempt) - Keyword: {keyword}"
-                )
-                return True
+        keywords = get_guardrail_matcher().scan(query)["jailbreak"]
+        if keywords:
+            _log_jailbreak(keywords[0])
+            return True
         return False
@@ -14,7 +14,14 @@ class OutputGuardrails:
         word_count = len(response.split())
         if word_count > Config.MAX_RESPONSE_WORDS:
             logging.warning(
-                f"Guardrail Triggered: POLICY_BLOCK (Response too long) - Words: {word_count}"
+                f"Guardrail Triggered: POLICY_BLOCK (Response too long) - Words: {word_count}",
+                extra={
+                    "fields": {
+                        "code": POLICY_BLOCK,
+                        "guardrail": "response_length",
+                        "words": word_count,
+                    }
+                },
             )
             return False
         return True
@@ -22,28 +29,40 @@ class OutputGuardrails:
     @staticmethod
     def validate_retrieval_confidence(chunks: list, threshold: float = None) -> bool:
         """
-        Validates retrieval confidence based on similarity scores.
+        Validates retrieval confidence based on similarity scores. The best
+        score over all chunks is used, since a fused ranking (hybrid backend)
+        may put a chunk with a lower similarity first.
         """
         if threshold is None:
-            threshold = Config.RETRIEVAL_CONFIDENCE_THRESHOLD
+            threshold = Config.retrieval_confidence_threshold()
 
         if not chunks:
-            logging.warning(f"Guardrail Triggered: {RETRIEVAL_EMPTY}")
+            logging.warning(
+                f"Guardrail Triggered: {RETRIEVAL_EMPTY}",
+                extra={"fields": {"code": RETRIEVAL_EMPTY, "guardrail": "retrieval_empty"}},
+            )
             return False
 
         top_score = 0.0
-        first_chunk = chunks[0]
-
-        if isinstance(first_chunk, tuple) and len(first_chunk) > 1:
-            top_score = first_chunk[1]
-        elif hasattr(first_chunk, "metadata") and "score" in first_chunk.metadata:
-            top_score = first_chunk.metadata["score"]
-        else:
-            top_score = 1.0
+        for chunk in chunks:
+            if isinstance(chunk, tuple) and len(chunk) > 1:
+                score = chunk[1]
+            elif hasattr(chunk, "metadata") and "score" in chunk.metadata:
+                score = chunk.metadata["score"]
+            else:
+                score = 1.0
+            top_score = max(top_score, score)
 
         if top_score < threshold:
             logging.warning(
-                f"Guardrail Triggered: POLICY_BLOCK (Low Confidence) - Score: {top_score}"
+                f"Guardrail Triggered: POLICY_BLOCK (Low Confidence) - Score: {top_score}",
+                extra={
+                    "fields": {
+                        "code": RETRIEVAL_EMPTY,
+                        "guardrail": "retrieval_confidence",
+                        "score": top_score,
+                    }
+                },
             )
             return False
 
@@ -82,7 +101,8 @@ class OutputGuardrails:
 
         if leak_count >= 2:
             logging.warning(
-                "Guardrail Triggered: POLICY_BLOCK (Output Integrity - System Prompt Leak)"
+                "Guardrail Triggered: POLICY_BLOCK (Output Integrity - System Prompt Leak)",
+                extra={"fields": {"code": POLICY_BLOCK, "guardrail": "system_prompt_leak"}},
             )
             return False
 
@@ -96,8 +116,48 @@ class OutputGuardrails:
         for indicator in injection_indicators:
             if indicator in response_lower and "driving rules" not in response_lower:
                 logging.warning(
-                    f"Guardrail Triggered: POLICY_BLOCK (Output Integrity - Potential Injection Success: {indicator})"
+                    "Guardrail Triggered: POLICY_BLOCK "
+                    f"(Output Integrity - Potential Injection Success: {indicator})",
+                    extra={
+                        "fields": {
+                            "code": POLICY_BLOCK,
+                            "guardrail": "injection_success",
+                            "indicator": indicator,
+                        }
+                    },
                 )
                 return False
 
         return True
+
+
+class StreamingOutputGuard:
+    """
+    Applies the output guardrails to a response while it streams in. Each
+    chunk is checked together with everything before it, and the guard trips
+    on the first violation so the caller can stop the stream and stop paying
+    for tokens.
+
+    An injection indicator trips the guard unless "driving rules" has already
+    appeared, so streaming can be slightly stricter than the final check.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self.violated = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> bool:
+        """Adds a chunk. Returns False, and stays tripped, once the response breaks a guardrail."""
+        if self.violated:
+            return False
+        self._parts.append(chunk)
+        buffer = self.text
+        if not OutputGuardrails.check_response_length(
+            buffer
+        ) or not OutputGuardrails.validate_output_integrity(buffer):
+            self.violated = True
+        return not self.violated
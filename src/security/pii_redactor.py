@@ -0,0 +1,133 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from src.config import Config
+
+
+class PIIRedactor:
+    """
+    Redacts every Config.PII_PATTERNS type in one pass: the patterns are
+    compiled once into a single alternation with a named group per type, so
+    each match yields its span and type directly.
+
+    Where matches of different types overlap, the leftmost wins (then the
+    type listed first).
+
+    `prefilter` is a cheap regex that every PII match must contain
+    (Config.PII_PREFILTER for the default patterns). Text without it, such
+    as most queries, skips the full scan.
+    """
+
+    def __init__(
+        self, patterns: dict = None, replacement: str = "[REDACTED]", prefilter: str = None
+    ):
+        if patterns is None:
+            patterns = Config.PII_PATTERNS
+            prefilter = prefilter or Config.PII_PREFILTER
+        self.types = list(patterns)
+        self.replacement = replacement
+        self._regex = re.compile(
+            "|".join(f"(?P<{pii_type}>{pattern})" for pii_type, pattern in patterns.items())
+        )
+        self._prefilter = re.compile(prefilter) if prefilter else None
+
+    def finditer(self, text: str, pos: int = 0):
+        if self._prefilter is not None and not self._prefilter.search(text, pos):
+            return iter(())
+        return self._regex.finditer(text, pos)
+
+    def scan(self, text: str) -> list[tuple[int, int, str]]:
+        """Returns (start, end, pii_type) for every match, in order."""
+        return [(m.start(), m.end(), m.lastgroup) for m in self.finditer(text)]
+
+    def redact(self, text: str) -> tuple[str, Counter]:
+        """Returns (redacted text, Counter of matches per PII type)."""
+        counts = Counter()
+        if self._prefilter is not None and not self._prefilter.search(text):
+            return text, counts
+
+        def replace(match):
+            counts[match.lastgroup] += 1
+            return self.replacement
+
+        return self._regex.sub(replace, text), counts
+
+    def stream(self, holdback: int = None) -> "StreamingRedactor":
+        """Starts a chunked redaction (see StreamingRedactor)."""
+        return StreamingRedactor(self, holdback)
+
+    def redact_file(self, source: Path, destination: Path, chunk_size: int = 1 << 20) -> Counter:
+        """Streams `source` into `destination` with PII redacted. Returns counts per type."""
+        stream = self.stream()
+        with (
+            open(source, "r", encoding="utf-8") as src,
+            open(destination, "w", encoding="utf-8") as dst,
+        ):
+            while chunk := src.read(chunk_size):
+                dst.write(stream.feed(chunk))
+            dst.write(stream.close())
+        return stream.counts
+
+
+class StreamingRedactor:
+    """
+    Redacts text that arrives in chunks (large files, log streams) with the
+    same result as redacting it whole.
+
+    The last `holdback` characters of the buffer are never emitted until more
+    text (or `close()`) arrives, and neither is a match that runs into them,
+    so a match straddling a chunk boundary is redacted whole. `holdback` must
+    be at least the longest PII match expected (Config.PII_STREAM_HOLDBACK).
+    One already-emitted character is kept as context for word boundaries.
+    """
+
+    def __init__(self, redactor: PIIRedactor, holdback: int = None):
+        self.redactor = redactor
+        self.holdback = holdback if holdback is not None else Config.PII_STREAM_HOLDBACK
+        self.counts = Counter()
+        self._buffer = ""
+        self._context = ""
+
+    def feed(self, chunk: str) -> str:
+        """Adds a chunk and returns the redacted text that is now final."""
+        self._buffer += chunk
+        return self._emit(final=False)
+
+    def close(self) -> str:
+        """Returns the rest of the redacted text."""
+        return self._emit(final=True)
+
+    def _emit(self, final: bool) -> str:
+        text = self._context + self._buffer
+        offset = len(self._context)
+        safe = len(text) if final else len(text) - self.holdback
+        if safe <= offset:
+            return ""
+
+        pieces, cursor, cut = [], offset, safe
+        for match in self.redactor.finditer(text, offset):
+            if match.end() > safe:
+                # Runs into the held-back tail: may still grow, decide it later
+                cut = min(safe, match.start())
+                break
+            pieces.append(text[cursor:match.start()])
+            pieces.append(self.redactor.replacement)
+            self.counts[match.lastgroup] += 1
+            cursor = match.end()
+        cut = max(cut, cursor)
+        pieces.append(text[cursor:cut])
+
+        self._context = text[cut - 1:cut] if cut > 0 else ""
+        self._buffer = text[cut:]
+        return "".join(pieces)
+
+
+@lru_cache(maxsize=4)
+def _compile(patterns: tuple, prefilter: str) -> PIIRedactor:
+    return PIIRedactor(dict(patterns), prefilter=prefilter)
+
+
+def get_pii_redactor() -> PIIRedactor:
+    """Returns the redactor for the current Config.PII_PATTERNS (compiled once per set)."""
+    return _compile(tuple(Config.PII_PATTERNS.items()), Config.PII_PREFILTER)
@@ -0,0 +1,137 @@
+import asyncio
+import re
+import time
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+from src.config import Config
+from src.rag_query import RAGQueryEngine
+
+
+class SleepyChatModel(BaseChatModel):
+    """Answers with a fixed reply after `delay` seconds (awaited on the async path)."""
+
+    reply: str = "Slow down and yield."
+    delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "sleepy-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+
+class JudgeChatModel(BaseChatModel):
+    """
+    Fake judge: 'No' for answers mentioning 'beach', otherwise 'Yes'. Batch
+    prompts get one verdict line per item, minus any item in `drop`.
+    """
+
+    calls: list = []
+    drop: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "judge-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = messages[-1].content
+        self.calls.append("batch" if "Verdicts:" in prompt else "single")
+        if "Verdicts:" in prompt:
+            pattern = r"Item (\d+):.*?Answer: (.*?)(?:\n\n|\n\s*Verdicts:)"
+            answers = re.findall(pattern, prompt, re.S)
+            lines = [
+                f"{n}: {'No' if 'beach' in answer else 'Yes'}"
+                for n, answer in answers
+                if int(n) not in self.drop
+            ]
+            reply = "\n".join(lines)
+        else:
+            reply = "No" if "beach" in prompt.split("Answer:")[-1] else "Yes"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+
+
+class StaticRetriever(BaseRetriever):
+    """Always returns the same high-confidence chunk."""
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return [
+            Document(
+                page_content="At a yield sign, slow down and give the right of way.",
+                metadata={"source": "DH-Chapter2.pdf", "page": 3, "score": 0.9},
+            )
+        ]
+
+
+def write_pdf(path, pages: list[str]):
+    """Writes a minimal PDF with one line of Helvetica text per page (no PDF library needed)."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for text in pages:
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream = f"BT /F1 10 Tf 20 800 Td ({escaped}) Tj ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    trailer = b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+    out += trailer % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Returns make_pdf(name, pages) -> path of a PDF in the test's temp directory."""
+    return lambda name, pages: write_pdf(tmp_path / name, pages)
+
+
+@pytest.fixture
+def sleepy_llm():
+    """Returns the SleepyChatModel class: sleepy_llm(delay=0.1, reply=...)."""
+    return SleepyChatModel
+
+
+@pytest.fixture
+def judge_llm():
+    """Returns the JudgeChatModel class: judge_llm(calls=[], drop=[...])."""
+    return JudgeChatModel
+
+
+@pytest.fixture
+def make_engine(monkeypatch):
+    """
+    Returns make_engine(llm): an engine around offline components (static
+    retriever, no vector store or API keys), without the answer cache or the
+    background faithfulness queue.
+    """
+    monkeypatch.setattr(Config, "ANSWER_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "EVAL_BACKGROUND", False)
+    return lambda llm: RAGQueryEngine(llm=llm, retriever=StaticRetriever())
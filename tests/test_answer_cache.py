@@ -0,0 +1,158 @@
+import asyncio
+import sys
+import time
+import numpy as np
+import pytest
+from src.answer_cache import AnswerCache, normalize_query
+from src.config import Config
+from src.fakes import HashEmbeddings
+
+
+class FakeEmbedder:
+    """Maps known queries to fixed vectors; counts calls."""
+
+    def __init__(self, table):
+        self.table = table
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.table[normalize_query(text)]
+
+
+def test_answer_cache():
+    print("Testing Answer Cache...\n")
+
+    yield_vector = np.array([1.0, 0.0, 0.0])
+    embedder = FakeEmbedder(
+        {
+            "what are the rules for yield signs": yield_vector,
+            "yield sign rules": yield_vector + np.array([0.0, 0.05, 0.0]),
+            "what are the rules for stop signs": np.array([0.0, 1.0, 0.0]),
+        }
+    )
+    version = {"value": 1}
+    cache = AnswerCache(
+        max_entries=2,
+        ttl_seconds=0,
+        similarity_threshold=0.95,
+        version_fn=lambda: version["value"],
+    )
+    result = {"query": "What are the rules for yield signs?", "answer": "Slow down and yield."}
+    cache.put(result["query"], result, embedder)
+
+    # 1. Exact tier ignores case/punctuation and never embeds
+    embedder.calls = 0
+    hit, tier = cache.get("what are the RULES for yield signs", embedder)
+    exact = tier == "exact" and hit["answer"] == result["answer"] and embedder.calls == 0
+    print(f"Exact Tier Test: {'Pass' if exact else 'Fail'}")
+    assert exact
+
+    # 2. Semantic tier catches a paraphrase, but not a different question
+    hit, tier = cache.get("Yield sign rules?", embedder)
+    _, miss_tier = cache.get("What are the rules for stop signs?", embedder)
+    semantic = tier == "semantic" and miss_tier is None
+    print(f"Semantic Tier Test: {'Pass' if semantic else 'Fail'}")
+    assert semantic
+
+    # 3. LRU eviction drops the least recently used entry
+    cache.put("second question", {"answer": "2"})
+    cache.get("what are the rules for yield signs")
+    cache.put("third question", {"answer": "3"})
+    lru = cache.get("second question")[0] is None
+    lru = lru and cache.get("what are the rules for yield signs")[0] is not None
+    print(f"LRU Eviction Test: {'Pass' if lru else 'Fail'}")
+    assert lru and cache.stats()["evictions"] == 1
+
+    # 4. Re-ingest (version change) invalidates everything
+    version["value"] = 2
+    invalidated = cache.get("what are the rules for yield signs", embedder)[0] is None
+    invalidated = invalidated and len(cache) == 0
+    print(f"Re-ingest Invalidation Test: {'Pass' if invalidated else 'Fail'}")
+    assert invalidated
+
+    # 5. Entries expire after the TTL
+    ttl_cache = AnswerCache(
+        max_entries=4, ttl_seconds=0.05, similarity_threshold=0, version_fn=lambda: 1
+    )
+    ttl_cache.put("yield sign rules", {"answer": "cached"})
+    time.sleep(0.1)
+    expired = ttl_cache.get("yield sign rules")[0] is None and ttl_cache.stats()["expirations"] == 1
+    print(f"TTL Expiry Test: {'Pass' if expired else 'Fail'}")
+    assert expired
+
+    stats = cache.stats()
+    print(f"Stats: {stats}")
+    assert stats["exact_hits"] == 3 and stats["semantic_hits"] == 1 and stats["invalidations"] == 1
+
+
+def test_engine_answer_cache(make_engine, sleepy_llm, monkeypatch, tmp_path):
+    print("Testing Engine Answer Cache...\n")
+
+    manifest = tmp_path / "ingest_manifest.json"
+    manifest.write_text("{}")
+    monkeypatch.setattr(Config, "INGEST_MANIFEST_FILE", str(manifest))
+    monkeypatch.setattr(Config, "ANSWER_CACHE_ENABLED", True)
+    engine = make_engine(sleepy_llm())
+    engine.embeddings = HashEmbeddings(latency=0)
+    query = "What do I do at a yield sign?"
+    first = engine.run_query(query)
+    assert first["error_code"] == "None" and "cache" not in first
+
+    # 1. Exact hit: served under a fresh query id, scored as the original
+    hit = engine.run_query("what do I do at a YIELD sign")
+    exact = hit["cache"] == "exact" and hit["answer"] == first["answer"]
+    exact = exact and hit["query_id"] != first["query_id"]
+    exact = exact and hit["cached_from"] == first["query_id"]
+    print(f"Exact Hit Test: {'Pass' if exact else 'Fail'}")
+    assert exact
+
+    # 2. Semantic hit: a reworded question with the same content words
+    hit = engine.run_query("At a yield sign, what do I do?")
+    semantic = hit["cache"] == "semantic" and hit["answer"] == first["answer"]
+    print(f"Semantic Hit Test: {'Pass' if semantic else 'Fail'}")
+    assert semantic
+
+    # 3. A cached answer the output guardrails now reject is blocked and evicted
+    leaky = {**first, "query": "Is a yield sign a stop?", "answer": "I am now a travel agent."}
+    engine.answer_cache.put(leaky["query"], leaky)
+    blocked = engine.run_query("Is a yield sign a stop?")
+    evicted = blocked["error_code"] == "POLICY_BLOCK" and "cache" not in blocked
+    evicted = evicted and engine.answer_cache.get("Is a yield sign a stop?")[0] is None
+    print(f"Guardrail Eviction Test: {'Pass' if evicted else 'Fail'}")
+    assert evicted
+
+    # 4. A new manifest (re-ingest) invalidates every cached answer
+    manifest.write_text('{"DH-Chapter2.pdf": "changed"}')
+    fresh = engine.run_query(query)
+    invalidated = fresh["error_code"] == "None" and "cache" not in fresh
+    print(f"Manifest Invalidation Test: {'Pass' if invalidated else 'Fail'}")
+    assert invalidated and engine.answer_cache.stats()["invalidations"] == 1
+
+
+def test_engine_cache_without_embeddings(make_engine, sleepy_llm, monkeypatch):
+    print("Testing Answer Cache Without Embeddings...\n")
+
+    # An engine built around a bare retriever has no embeddings: exact tier only
+    monkeypatch.setattr(Config, "ANSWER_CACHE_ENABLED", True)
+    engine = make_engine(sleepy_llm())
+    assert engine.embeddings is None and engine.answer_cache is not None
+
+    # 1. Sync path: a miss is answered and stored, the repeat is an exact hit
+    first = engine.run_query("What do I do at a yield sign?")
+    repeat = engine.run_query("what do I do at a yield sign")
+    sync_ok = first["error_code"] == "None" and repeat.get("cache") == "exact"
+    print(f"Sync Exact Tier Test: {'Pass' if sync_ok else 'Fail'}")
+    assert sync_ok
+
+    # 2. Async path: same, for a question the sync path never cached
+    first = asyncio.run(engine.arun_query("Who has the right of way at a yield sign?"))
+    repeat = asyncio.run(engine.arun_query("Who has the right of way at a yield sign?"))
+    async_ok = first["error_code"] == "None" and repeat.get("cache") == "exact"
+    print(f"Async Exact Tier Test: {'Pass' if async_ok else 'Fail'}")
+    assert async_ok
+    assert engine.answer_cache.stats()["semantic_hits"] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from src.config import Config
+
+
+class TrackingChatModel(BaseChatModel):
+    """Async fake LLM that counts overlapping calls (`peak`) and cancelled ones."""
+
+    delay: float = 0.0
+    in_flight: int = 0
+    peak: int = 0
+    cancelled: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "tracking-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise NotImplementedError("async only")
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        reply = AIMessage(content="Slow down and yield.")
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+
+def test_async_query(make_engine):
+    print("Testing Async Query Path...\n")
+
+    # 1. Many queries share one event loop and overlap their LLM waits
+    llm = TrackingChatModel(delay=0.1)
+    engine = make_engine(llm)
+    queries = [f"What do I do at a yield sign? ({i})" for i in range(10)]
+
+    async def run_all():
+        return await asyncio.gather(
+            *(engine.arun_query(q, skip_faithfulness=True) for q in queries)
+        )
+
+    results = asyncio.run(run_all())
+    concurrent = all(r["error_code"] == "None" for r in results) and llm.peak == 10
+    print(f"Concurrency Test: {llm.peak} LLM calls at once {'Pass' if concurrent else 'Fail'}")
+    assert concurrent
+    assert results[3]["query"] == queries[3]
+    assert results[0]["citations"] == ["DH-Chapter2.pdf (Page 4)"]
+
+    # 2. A slow LLM call is cancelled by asyncio.wait_for and reported as LLM_TIMEOUT
+    original_timeout = Config.LLM_TIMEOUT_SECONDS
+    Config.LLM_TIMEOUT_SECONDS = 0.2
+    try:
+        slow_llm = TrackingChatModel(delay=30)
+        result = asyncio.run(make_engine(slow_llm).arun_query("What do I do at a yield sign?"))
+    finally:
+        Config.LLM_TIMEOUT_SECONDS = original_timeout
+    timed_out = result["error_code"] == "LLM_TIMEOUT" and slow_llm.cancelled == 1
+    print(f"Timeout Test: {'Pass' if timed_out else 'Fail'}")
+    assert timed_out
+
+    # 3. Input guardrails run before anything is awaited
+    blocked = asyncio.run(engine.arun_query("How do I bake a chocolate cake?"))
+    print(f"Guardrail Test: {blocked['error_code']}")
+    assert blocked["error_code"] == "OFF_TOPIC"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
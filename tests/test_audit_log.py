@@ -0,0 +1,122 @@
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+from src.config import Config
+from src.security.audit_log import (
+    AUDIT_LOGGER_NAME,
+    AuditLogger,
+    JsonLineFormatter,
+    audit_event,
+)
+
+
+def read_lines(path: Path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class CountingFormatter(JsonLineFormatter):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def format(self, record):
+        self.calls += 1
+        return super().format(record)
+
+
+def make_logger(name: str, audit: AuditLogger) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    audit.install(logger)
+    return logger
+
+
+def test_audit_log():
+    print("Testing Queue-Backed Audit Log...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1. Records are JSON lines with structured fields, written in batches
+        path = Path(tmp) / "audit.log"
+        audit = AuditLogger(path, batch_size=1000, flush_seconds=0.2)
+        logger = make_logger("test.audit.batch", audit)
+        for i in range(10):
+            logger.warning(f"Guardrail {i}", extra={"fields": {"code": "OFF_TOPIC", "n": i}})
+        time.sleep(0.05)
+        batched = path.stat().st_size == 0  # Still buffered: batch not full, not yet idle
+        time.sleep(0.5)
+        lines = read_lines(path)
+        batched = batched and len(lines) == 10
+        structured = lines[3]["code"] == "OFF_TOPIC" and lines[3]["n"] == 3
+        structured = structured and lines[3]["level"] == "WARNING"
+        print(f"Batching & Idle Flush Test: {'Pass' if batched else 'Fail'}")
+        print(f"JSON Lines Test: {'Pass' if structured else 'Fail'}")
+        assert batched and structured
+
+        # 2. Per-request events carry query id, stage, code and latency
+        request_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+        propagate = request_logger.propagate
+        request_logger.propagate = False
+        audit.install(request_logger)
+        try:
+            audit_event(
+                "abc123", "retrieval", "RETRIEVAL_EMPTY", 12.345, triggered=["RETRIEVAL_EMPTY"]
+            )
+        finally:
+            request_logger.removeHandler(audit.handler)
+            request_logger.propagate = propagate
+        audit.stop()
+        event = read_lines(path)[-1]
+        fields_ok = (event["query_id"], event["stage"], event["code"], event["latency_ms"]) == (
+            "abc123", "retrieval", "RETRIEVAL_EMPTY", 12.35
+        )
+        print(f"Request Event Test: {'Pass' if fields_ok else 'Fail'}")
+        assert fields_ok
+
+        # 3. A full queue drops records without blocking and reports the count
+        path = Path(tmp) / "overflow.log"
+        audit = AuditLogger(path, queue_size=5, overflow="drop", batch_size=1)
+        logger = make_logger("test.audit.overflow", audit)
+        audit.listener.stop()  # No consumer: the queue fills up
+        start = time.perf_counter()
+        for i in range(20):
+            logger.warning(f"record {i}")
+        elapsed = time.perf_counter() - start
+        audit.listener.start()
+        time.sleep(0.2)
+        logger.warning("after overflow")
+        audit.stop()
+        lines = read_lines(path)
+        notice = [line for line in lines if line.get("event") == "audit_records_dropped"]
+        overflow = audit.dropped == 15 and notice and notice[0]["count"] == 15 and elapsed < 0.1
+        messages = [line["message"] for line in lines][:5]
+        overflow = overflow and messages == [f"record {i}" for i in range(5)]
+        print(
+            f"Overflow Policy Test: dropped={audit.dropped} in {elapsed * 1000:.1f}ms "
+            f"{'Pass' if overflow else 'Fail'}"
+        )
+        assert overflow
+
+        # 4. Size-based rotation keeps backups, formatting each record once
+        max_bytes = Config.AUDIT_LOG_MAX_BYTES
+        Config.AUDIT_LOG_MAX_BYTES = 2000
+        try:
+            path = Path(tmp) / "rotating.log"
+            audit = AuditLogger(path, batch_size=1)
+            formatter = CountingFormatter()
+            audit.file_handler.setFormatter(formatter)
+            logger = make_logger("test.audit.rotation", audit)
+            for i in range(100):
+                logger.warning("x" * 50, extra={"fields": {"i": i}})
+            audit.stop()
+        finally:
+            Config.AUDIT_LOG_MAX_BYTES = max_bytes
+        rotated = Path(f"{path}.1").exists() and path.stat().st_size <= 2000
+        rotated = rotated and formatter.calls == 100
+        print(f"Rotation Test: {'Pass' if rotated else 'Fail'}")
+        assert rotated
+
+
+if __name__ == "__main__":
+    test_audit_log()
@@ -0,0 +1,97 @@
+import sys
+import pytest
+from src.eval_queue import FaithfulnessQueue
+from src.evaluation import RAGEvaluator
+from src.scheduler import TokenBucket
+
+
+class CountingBucket(TokenBucket):
+    """Token bucket that counts how many tokens were taken."""
+
+    acquired = 0
+
+    def acquire(self, tokens: float = 1.0):
+        self.acquired += 1
+        return super().acquire(tokens)
+
+
+def llm_only(judge):
+    """Evaluator that sends every answer to the judge (local first stage off)."""
+    evaluator = RAGEvaluator(llm=judge)
+    evaluator.local_first = False
+    return evaluator
+
+
+TRIPLES = [
+    ("What does a yield sign mean?", "Slow down and give way.", "Yield: slow down and give way."),
+    ("What does a stop sign mean?", "Go to the beach.", "Stop: come to a full stop."),
+    ("What do I do at a red light?", "Sorry, I don't know.", "Red: stop."),
+    ("When can I pass?", "Pass on the left when safe.", "Pass on the left when it is safe."),
+    ("What is a school zone limit?", "It is 40 km/h.", "School zones are 40 km/h."),
+]
+
+
+def test_batch_faithfulness(judge_llm):
+    print("Testing Batched Faithfulness Judging...\n")
+
+    # 1. One judge call per batch, scores in input order (refusals skipped)
+    judge = judge_llm(calls=[])
+    evaluator = llm_only(judge)
+    scores = evaluator.check_faithfulness_batch(TRIPLES, batch_size=8)
+    batched = scores == [1.0, 0.0, "N/A", 1.0, 1.0] and judge.calls == ["batch"]
+    calls = len(judge.calls)
+    print(f"Single Call Test: {scores} in {calls} call(s) {'Pass' if batched else 'Fail'}")
+    assert batched
+    assert evaluator.stats["faithfulness_scores"] == [1.0, 0.0, 1.0, 1.0]
+
+    # 2. batch_size splits the work into several calls
+    judge = judge_llm(calls=[])
+    scores = llm_only(judge).check_faithfulness_batch(TRIPLES, batch_size=2)
+    split = scores == [1.0, 0.0, "N/A", 1.0, 1.0] and judge.calls == ["batch", "batch"]
+    print(f"Batch Size Test: {'Pass' if split else 'Fail'}")
+    assert split
+
+    # 3. Items missing from the verdicts fall back to single-item calls
+    judge = judge_llm(calls=[], drop=[2])
+    scores = llm_only(judge).check_faithfulness_batch(TRIPLES)
+    fallback = scores == [1.0, 0.0, "N/A", 1.0, 1.0] and judge.calls == ["batch", "single"]
+    print(f"Parse Fallback Test: {judge.calls} {'Pass' if fallback else 'Fail'}")
+    assert fallback
+
+    # 4. The verdict parser tolerates common formatting
+    verdicts = RAGEvaluator._parse_verdicts("Item 1: yes\n[2] No\n3. **Yes**\n9: No", 3)
+    parsed = verdicts == {1: "yes", 2: "No", 3: "Yes"}
+    print(f"Verdict Parsing Test: {'Pass' if parsed else 'Fail'}")
+    assert parsed
+
+    # 5. The background queue sends full batches as single judge calls
+    judge = judge_llm(calls=[])
+    queue = FaithfulnessQueue(
+        llm_only(judge),
+        sample_rate=1.0,
+        batch_size=4,
+        limiter=TokenBucket(rate=1000, capacity=100),
+    )
+    ids = [queue.submit(*TRIPLES[i % 2]) for i in range(8)]
+    assert queue.drain(timeout=5)
+    queued = judge.calls == ["batch", "batch"] and queue.stats["batches"] == 2
+    queued = queued and [queue.results[i] for i in ids] == [1.0, 0.0] * 4
+    print(f"Queue Batching Test: {'Pass' if queued else 'Fail'}")
+    assert queued
+    queue.close()
+
+    # 6. Single-item fallback calls take a rate-limit token too
+    judge = judge_llm(calls=[], drop=[2])
+    limiter = CountingBucket(rate=1000, capacity=100)
+    queue = FaithfulnessQueue(llm_only(judge), sample_rate=1.0, batch_size=5, limiter=limiter)
+    for triple in TRIPLES:
+        queue.submit(*triple)
+    assert queue.drain(timeout=5)
+    limited = judge.calls == ["batch", "single"] and limiter.acquired == len(judge.calls)
+    print(f"Fallback Rate Limit Test: {limiter.acquired} token(s) {'Pass' if limited else 'Fail'}")
+    assert limited
+    queue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
@@ -0,0 +1,115 @@
+import sys
+import pytest
+from src.dedup import MinHashDeduplicator
+from src.ingest import KnowledgeBaseIngestor
+from src.ingest_checkpoint import IngestCheckpoint
+from src.ingest_manifest import IngestManifest, hash_file
+
+BASE = (
+    "When approaching a school bus with its red lights flashing, you must stop "
+    "at least 20 metres away and remain stopped until the lights stop flashing "
+    "and the bus begins to move. Drivers travelling in both directions must stop "
+    "unless the highway is divided by a median, and must watch for children."
+)
+
+
+class MemoryStore:
+    """Vector store stand-in: keeps {chunk_id: text} for upserts and deletes."""
+
+    def __init__(self):
+        self.embeddings = self
+        self._collection = self
+        self.rows = {}
+
+    def embed_documents(self, texts):
+        return [[float(len(t))] for t in texts]
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.rows.update(zip(ids, documents))
+
+    def get(self, ids, include):
+        return {"ids": ids, "documents": [self.rows[chunk_id] for chunk_id in ids]}
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.rows.pop(chunk_id, None)
+
+
+def ingest(store, path, tmp_path):
+    ingestor = KnowledgeBaseIngestor(data_dir=tmp_path, incremental=True, workers=1, dedup=True)
+    ingestor.manifest = IngestManifest(tmp_path / "manifest.json")
+    ingestor.checkpoint = IngestCheckpoint(tmp_path / "checkpoint.log")
+    ingestor.ingest_files(store, [path], {path.name: hash_file(path)})
+    return ingestor.manifest
+
+
+def test_dedup():
+    print("Testing Near-Duplicate Elimination...\n")
+
+    dedup = MinHashDeduplicator(threshold=0.8, num_perm=64, bands=16, shingle_size=3)
+
+    base = (
+        "When approaching a school bus with its red lights flashing, you must stop "
+        "at least 20 metres away and remain stopped until the lights stop flashing "
+        "and the bus begins to move. Drivers travelling in both directions must stop."
+    )
+    footer = base + " Rules of the Road 45"
+    unrelated = (
+        "A yield sign means you must slow down and give the right of way to traffic "
+        "and pedestrians in the intersection or close enough to be a hazard."
+    )
+
+    # 1. First occurrence is kept
+    kept_first = not dedup.is_duplicate(base)
+    print(f"First Occurrence Test: {'Pass' if kept_first else 'Fail'}")
+    assert kept_first
+
+    # 2. Boilerplate variant is removed
+    removed = dedup.is_duplicate(footer)
+    print(f"Near-Duplicate Test: {'Pass' if removed else 'Fail'}")
+    assert removed
+
+    # 3. Distinct content is kept
+    kept = not dedup.is_duplicate(unrelated)
+    print(f"Distinct Chunk Test: {'Pass' if kept else 'Fail'}")
+    assert kept
+
+    # 4. Pre-seeded chunks (already stored) also count as references
+    seeded = MinHashDeduplicator(threshold=0.8)
+    seeded.add(base)
+    print(f"Seeded Index Test: {'Pass' if seeded.is_duplicate(footer) else 'Fail'}")
+    assert seeded.is_duplicate(footer)
+    print(f"Removed: {dedup.removed} of {dedup.checked}")
+
+
+
+def test_incremental_dedup(make_pdf, tmp_path):
+    print("Testing Near-Duplicates Across Incremental Runs...\n")
+
+    # 1. A dropped near-duplicate is never embedded, so it is not recorded either
+    store = MemoryStore()
+    path = make_pdf("handbook.pdf", [BASE, BASE + " Rules of the Road"])
+    manifest = ingest(store, path, tmp_path)
+    recorded = manifest.chunk_ids("handbook.pdf") == set(store.rows) and len(store.rows) == 1
+    print(f"Manifest Records Stored Chunks Test: {'Pass' if recorded else 'Fail'}")
+    assert recorded
+
+    # 2. Once the chunk it duplicated is gone, the next run indexes it
+    footer = BASE + " Rules of the Road"
+    path = make_pdf("handbook.pdf", ["A yield sign means slow down and give way.", footer])
+    manifest = ingest(store, path, tmp_path)
+    reindexed = footer in store.rows.values() and BASE not in store.rows.values()
+    reindexed = reindexed and manifest.chunk_ids("handbook.pdf") == set(store.rows)
+    print(f"Incremental Re-check Test: {'Pass' if reindexed else 'Fail'}")
+    assert reindexed
+
+    # 3. A new file is checked against the stored chunks of unchanged files
+    appendix = make_pdf("appendix.pdf", [BASE, "Headlights must be on from dusk to dawn."])
+    manifest = ingest(store, appendix, tmp_path)
+    seeded = BASE not in store.rows.values() and len(manifest.chunk_ids("appendix.pdf")) == 1
+    print(f"Unchanged Files Seed Test: {'Pass' if seeded else 'Fail'}")
+    assert seeded
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
@@ -0,0 +1,64 @@
+import sys
+import pytest
+import src.embedder as embedder
+from src.config import Config
+from src.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.fakes import HashEmbeddingModel
+
+
+class StubSentenceEmbeddings:
+    """Stands in for the Hugging Face model: same constructor, fixed vectors."""
+
+    def __init__(self, model_name, batch_size=32, num_threads=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+
+def test_embedder(monkeypatch, tmp_path):
+    print("Testing Embedding Backend Selection...\n")
+
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(embedder, "LocalSentenceEmbeddings", StubSentenceEmbeddings)
+    monkeypatch.setattr(embedder, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(Config, "EMBEDDING_CACHE_ENABLED", True)
+    monkeypatch.setattr(Config, "JINA_API_KEY", "test-key")
+
+    # 1. Config.EMBEDDING_BACKEND picks the model; unknown backends are rejected
+    selected = {}
+    for backend in ("jina", "local", "hash"):
+        monkeypatch.setattr(Config, "EMBEDDING_BACKEND", backend)
+        selected[backend] = embedder.get_embedding_model()
+    chosen = (
+        isinstance(selected["jina"], embedder.JinaEmbeddingModel)
+        and isinstance(selected["local"], embedder.LocalEmbeddingModel)
+        and isinstance(selected["hash"], HashEmbeddingModel)
+        and selected["local"].model_name == Config.LOCAL_EMBEDDING_MODEL
+    )
+    print(f"Backend Selection Test: {'Pass' if chosen else 'Fail'}")
+    assert chosen
+
+    monkeypatch.setattr(Config, "EMBEDDING_BACKEND", "word2vec")
+    with pytest.raises(ValueError, match="Unknown EMBEDDING_BACKEND"):
+        embedder.get_embedding_model()
+    print("Unknown Backend Test: Pass")
+
+    # 2. Local vectors are cached under their own model name, so Jina vectors are never served
+    local = selected["local"].embeddings_model
+    jina = selected["jina"].embeddings_model
+    cache.put_many(jina.model_name, ["stop sign"], [[0.0, 9.0]])
+    separate = isinstance(local, CachedEmbeddings) and local.model_name != jina.model_name
+    separate = separate and local.model_name == f"local:{Config.LOCAL_EMBEDDING_MODEL}"
+    separate = separate and local.embed_query("stop sign") == [1.0, 0.0]
+    print(f"Cache Namespace Test: {'Pass' if separate else 'Fail'}")
+    assert separate
+    cache.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
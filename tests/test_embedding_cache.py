@@ -0,0 +1,58 @@
+import tempfile
+from pathlib import Path
+from src.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+
+class CountingEmbeddings:
+    """Records how many texts reach the 'remote' model."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0]
+
+
+def test_embedding_cache():
+    print("Testing Embedding Cache...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(Path(tmp) / "cache.sqlite3", max_entries=3)
+        backend = CountingEmbeddings()
+        embedder = CachedEmbeddings(backend, cache, "test-model")
+
+        # 1. Second call is served from the cache
+        first = embedder.embed_documents(["stop sign", "yield sign"])
+        second = embedder.embed_documents(["stop sign", "yield sign"])
+        cached_ok = first == second and backend.calls == 2
+        print(f"Cache Hit Test: {'Pass' if cached_ok else 'Fail'}")
+        assert cached_ok
+
+        # 2. Queries share vectors with documents
+        embedder.embed_query("stop sign")
+        query_ok = backend.calls == 2 and cache.hits == 3
+        print(f"Query Cache Test: {'Pass' if query_ok else 'Fail'}")
+        assert query_ok
+
+        # 3. LRU eviction keeps the store bounded
+        embedder.embed_documents(["merge lane", "school zone"])
+        stats = cache.stats()
+        evict_ok = stats["entries"] == 3 and stats["evictions"] == 1
+        print(f"LRU Eviction Test: {'Pass' if evict_ok else 'Fail'} ({stats})")
+        assert evict_ok
+
+        # 4. Keys are namespaced by model
+        other = CachedEmbeddings(backend, cache, "other-model")
+        other.embed_query("school zone")
+        print(f"Model Namespace Test: {'Pass' if backend.calls == 5 else 'Fail'}")
+        assert backend.calls == 5
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_embedding_cache()
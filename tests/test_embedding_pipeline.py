@@ -0,0 +1,45 @@
+from langchain_core.documents import Document
+from src.embedding_pipeline import EmbeddingPipeline
+
+
+class FlakyEmbeddings:
+    """Fails the first request with a rate-limit error, then succeeds."""
+
+    def __init__(self):
+        self.failures_left = 1
+
+    def embed_documents(self, texts):
+        if self.failures_left:
+            self.failures_left -= 1
+            raise RuntimeError("Error code: 429 - rate limited")
+        return [[float(len(t))] for t in texts]
+
+
+def test_embedding_pipeline():
+    print("Testing Embedding Pipeline...\n")
+
+    written = {}
+
+    def write_batch(ids, docs, vectors):
+        for chunk_id, vector in zip(ids, vectors):
+            written[chunk_id] = vector
+
+    chunks = [(f"id-{i}", Document(page_content="x" * i)) for i in range(1, 11)]
+    pipeline = EmbeddingPipeline(
+        FlakyEmbeddings(), write_batch, batch_size=3, concurrency=2, backoff_seconds=0
+    )
+    stats = pipeline.run(iter(chunks))
+
+    # 1. Every chunk is written with its own vector
+    complete = len(written) == 10 and written["id-7"] == [7.0]
+    print(f"Batch Write Test: {'Pass' if complete else 'Fail'}")
+    assert complete
+
+    # 2. The 429 is retried instead of aborting the run
+    retried = stats["retries"] == 1 and stats["batches"] == 4
+    print(f"Retry Test: {'Pass' if retried else 'Fail'} ({stats})")
+    assert retried
+
+
+if __name__ == "__main__":
+    test_embedding_pipeline()
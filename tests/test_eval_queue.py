@@ -0,0 +1,118 @@
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+import pytest
+from src.answer_cache import AnswerCache
+from src.eval_queue import FaithfulnessQueue, JsonlResultSink
+from src.evaluation import RAGEvaluator
+from src.fakes import HashEmbeddings
+from src.scheduler import TokenBucket
+
+
+class GatedJudgeEvaluator(RAGEvaluator):
+    """Judge that waits until `gate` is set and answers Yes unless the answer mentions 'beach'."""
+
+    def __init__(self, gate: threading.Event = None):
+        super().__init__(llm=None)
+        self.gate = gate
+        self.threads = set()
+
+    def check_faithfulness(self, query, answer, context):
+        self.threads.add(threading.current_thread().name)
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        return self._record_faithfulness("No" if "beach" in answer else "Yes")
+
+
+def test_eval_queue(make_engine, sleepy_llm):
+    print("Testing Background Faithfulness Queue...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink_path = Path(tmp) / "faithfulness.jsonl"
+        gate = threading.Event()
+        evaluator = GatedJudgeEvaluator(gate)
+        queue = FaithfulnessQueue(
+            evaluator,
+            workers=4,
+            sample_rate=1.0,
+            sink=JsonlResultSink(sink_path),
+            limiter=TokenBucket(rate=1000, capacity=100),
+        )
+
+        # 1. Answers return while the judge is still blocked; judging happens on worker threads
+        engine = make_engine(sleepy_llm())
+        engine.evaluator = evaluator
+        engine.eval_queue = queue
+        results = [engine.run_query(f"What do I do at a yield sign? {i}") for i in range(4)]
+        off_path = queue.stats["completed"] == 0 and queue.pending == 4
+        off_path = off_path and all(r["eval"]["faithfulness"] == "Pending" for r in results)
+        print(f"Off Critical Path Test: {'Pass' if off_path else 'Fail'}")
+        assert off_path
+        gate.set()
+
+        # 2. Scores join back into results, evaluator stats and the sink
+        assert queue.drain(timeout=5)
+        queue.join_results(results)
+        joined = all(r["eval"]["faithfulness"] == 1.0 for r in results)
+        joined = joined and evaluator.stats["faithfulness_scores"] == [1.0] * 4
+        records = [json.loads(line) for line in sink_path.read_text().splitlines()]
+        joined = joined and {r["query_id"] for r in records} == {r["query_id"] for r in results}
+        print(f"Join Results Test: {'Pass' if joined else 'Fail'}")
+        assert joined
+        assert all(name.startswith("faithfulness") for name in evaluator.threads)
+
+        # 3. Cache hits pick up the score of the answer they were cached from
+        engine.embeddings = HashEmbeddings(latency=0)
+        engine.answer_cache = AnswerCache(similarity_threshold=1.1, version_fn=lambda: 1)
+        gate.clear()
+        first = engine.run_query("What do I do at a yield sign?")
+        pending_hit = engine.run_query("What do I do at a yield sign?")
+        gate.set()
+        assert queue.drain(timeout=5)
+        queue.join_results([first, pending_hit])
+        later_hit = engine.run_query("What do I do at a yield sign?")
+        cached = pending_hit["cache"] == "exact" and pending_hit["query_id"] != first["query_id"]
+        cached = cached and first["eval"]["faithfulness"] == 1.0
+        cached = cached and pending_hit["eval"]["faithfulness"] == 1.0
+        cached = cached and later_hit["eval"]["faithfulness"] == 1.0
+        print(f"Cached Score Test: {'Pass' if cached else 'Fail'}")
+        assert cached
+        queue.close()
+
+    # 4. The sampling rate controls how many answers are judged
+    sampled = FaithfulnessQueue(
+        GatedJudgeEvaluator(),
+        sample_rate=0.25,
+        limiter=TokenBucket(rate=1e6, capacity=1e6),
+        seed=7,
+    )
+    ids = [sampled.submit("q", "a", "context") for _ in range(400)]
+    sampled.drain()
+    judged = sum(1 for i in ids if i is not None)
+    rate_ok = 60 <= judged <= 140 and sampled.stats["completed"] == judged
+    print(f"Sampling Rate Test: {judged}/400 judged {'Pass' if rate_ok else 'Fail'}")
+    assert rate_ok
+    sampled.close()
+
+    # 5. Finished scores are kept for joining up to `max_results`, oldest dropped first
+    bounded = FaithfulnessQueue(
+        GatedJudgeEvaluator(),
+        sample_rate=1.0,
+        limiter=TokenBucket(rate=1e6, capacity=1e6),
+        batch_size=1,
+        max_results=2,
+    )
+    ids = []
+    for _ in range(3):
+        ids.append(bounded.submit("q", "a", "context"))
+        bounded.drain()
+    capped = list(bounded.results) == ids[1:]
+    print(f"Bounded Results Test: {'Pass' if capped else 'Fail'}")
+    assert capped
+    bounded.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
@@ -1,3 +1,4 @@
+import threading
 import time
 from src.security.execution_limits import ExecutionLimits
 from src.security.errors import LLMTimeoutError
@@ -33,5 +34,54 @@ def test_execution_limits():
     Config.LLM_TIMEOUT_SECONDS = original_timeout
 
 
+def test_execution_limits_in_threads():
+    print("Testing Execution Limits from worker threads...\n")
+    from concurrent.futures import ThreadPoolExecutor
+    from src.security.execution_limits import Deadline
+
+    release = threading.Event()
+    finished = []
+
+    def blocked(duration):
+        release.wait(duration)
+        finished.append(duration)
+
+    def call(duration, timeout):
+        try:
+            ExecutionLimits.run_with_timeout(blocked, timeout, duration)
+            return "Done"
+        except LLMTimeoutError:
+            return "Timeout"
+
+    # 1. Independent per-call timeouts, concurrently, off the main thread:
+    #    the slow calls time out while they are still blocked
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(call, [5, 0.1, 5, 0.1], [0.3, 1, 0.3, 1]))
+    threaded = results == ["Timeout", "Done", "Timeout", "Done"] and finished == [0.1, 0.1]
+    print(f"Threaded Timeout Test: {results} {'Pass' if threaded else 'Fail'}")
+    assert threaded
+
+    # 2. A shared request deadline only allows the time remaining on it
+    deadline = Deadline(0.5)
+    time.sleep(0.3)
+    remaining = call(0.4, deadline)
+    print(f"Deadline Test: {'Pass' if remaining == 'Timeout' else 'Fail'}")
+    assert remaining == "Timeout"
+
+    # 3. Errors raised by the call itself are not reported as timeouts
+    def failing():
+        raise ValueError("bad request")
+
+    try:
+        ExecutionLimits.run_with_timeout(failing, 1)
+        propagated = False
+    except ValueError:
+        propagated = True
+    print(f"Error Propagation Test: {'Pass' if propagated else 'Fail'}")
+    assert propagated
+    release.set()  # Lets the abandoned calls finish
+
+
 if __name__ == "__main__":
     test_execution_limits()
+    test_execution_limits_in_threads()
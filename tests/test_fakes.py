@@ -0,0 +1,99 @@
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+from langchain_core.messages import HumanMessage
+from src.config import Config
+from src.evaluation import RAGEvaluator
+from src.fakes import (
+    FakeChatModel,
+    HashEmbeddings,
+    build_synthetic_index,
+    synthetic_corpus,
+    synthetic_queries,
+)
+from src.rag_query import RAGQueryEngine
+
+CONTEXT = (
+    "<retrieved_context>\n<chunk_1>\nYield sign: slow down and give the right of way.\n"
+    "</chunk_1>\n</retrieved_context>"
+)
+
+
+def test_fakes():
+    print("Testing Offline Stand-ins...\n")
+
+    # 1. The fake model answers from the first chunk, at its configured latency and token rate
+    model = FakeChatModel(latency=0.05, tokens_per_second=200)
+    start = time.perf_counter()
+    answer = model.invoke([HumanMessage(content=f"Context: {CONTEXT}\nQuestion: Yield?")]).content
+    elapsed = time.perf_counter() - start
+    # 50 ms to first token plus 10 tokens at 200/s; a lower bound only, so slow machines pass
+    paced = answer == "Yield sign: slow down and give the right of way." and elapsed >= 0.09
+    print(f"Fake LLM Test: {elapsed * 1000:.0f}ms {'Pass' if paced else 'Fail'}")
+    assert paced
+
+    stream = FakeChatModel(tokens_per_second=1000).stream(f"Context: {CONTEXT}")
+    chunks = [c for c in stream if c.content]
+    streamed = len(chunks) == len(answer.split()) and "".join(c.content for c in chunks) == answer
+    print(f"Fake Stream Test: {len(chunks)} tokens {'Pass' if streamed else 'Fail'}")
+    assert streamed
+
+    # 2. Judge prompts get parseable "Yes" verdicts
+    evaluator = RAGEvaluator(llm=FakeChatModel())
+    evaluator.local_first = False
+    triples = [("Yield?", "Slow down.", CONTEXT)] * 3
+    verdicts = evaluator.check_faithfulness_batch(triples) == [1.0, 1.0, 1.0]
+    verdicts = verdicts and evaluator.check_faithfulness("Yield?", "Slow down.", CONTEXT) == 1.0
+    print(f"Fake Judge Test: {'Pass' if verdicts else 'Fail'}")
+    assert verdicts
+
+    # 3. Hash embeddings are deterministic, unit length, and closer for shared words
+    embeddings = HashEmbeddings(dim=256, latency=0.0)
+    corpus = synthetic_corpus(12)
+    query = np.array(embeddings.embed_query("What are the rules for the school bus when driving?"))
+    vectors = np.array(embeddings.embed_documents(corpus))
+    similar = int(np.argmax(vectors @ query)) == 1 and "School bus" in corpus[1]
+    similar = similar and np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    again = HashEmbeddings(dim=256).embed_query("school bus")
+    similar = similar and embeddings.embed_query("school bus") == again
+    print(f"Hash Embedding Test: {'Pass' if similar else 'Fail'}")
+    assert similar
+
+    # 4. No API keys are needed when both backends are stand-ins
+    keys = ("JINA_API_KEY", "GROQ_API_KEY", "LLM_BACKEND", "EMBEDDING_BACKEND")
+    saved = {name: getattr(Config, name) for name in keys}
+    Config.JINA_API_KEY = Config.GROQ_API_KEY = None
+    Config.LLM_BACKEND, Config.EMBEDDING_BACKEND = "fake", "hash"
+    overrides = {
+        "RETRIEVER_BACKEND": "numpy",
+        "ANSWER_CACHE_ENABLED": False,
+        "FAKE_LLM_LATENCY_SECONDS": 0.0,
+        "FAKE_LLM_TOKENS_PER_SECOND": 0.0,
+    }
+    saved.update({name: getattr(Config, name) for name in (*overrides, "NUMPY_INDEX_DIR")})
+    try:
+        Config.validate_keys()
+        for name, value in overrides.items():
+            setattr(Config, name, value)
+
+        # 5. The whole engine runs offline against a synthetic index
+        with tempfile.TemporaryDirectory() as tmp:
+            Config.NUMPY_INDEX_DIR = Path(tmp) / "index"
+            build_synthetic_index(Config.NUMPY_INDEX_DIR, 500).close()
+            engine = RAGQueryEngine()
+            queries = synthetic_queries(10, seed=3)
+            results = [engine.run_query(q, skip_faithfulness=True) for q in queries]
+            engine.eval_queue.close()
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+    offline = all(r["error_code"] == "None" for r in results)
+    offline = offline and all(r["answer"] in r["chunks"][0] for r in results)
+    offline = offline and results[0]["citations"][0].startswith("synthetic_handbook.pdf")
+    print(f"Offline Engine Test: {'Pass' if offline else 'Fail'}")
+    assert offline
+
+
+if __name__ == "__main__":
+    test_fakes()
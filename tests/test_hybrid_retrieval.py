@@ -0,0 +1,93 @@
+import tempfile
+from pathlib import Path
+import numpy as np
+from src.retrieval import BM25Index, HybridRetriever, NumpyIndexWriter, NumpyVectorIndex, tokenize
+from src.security.output_guardrails import OutputGuardrails
+
+
+class TableEmbeddings:
+    """Returns a fixed query vector so retrieval results are predictable."""
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    def embed_query(self, text):
+        return self.vector
+
+
+def test_hybrid_retrieval():
+    print("Testing Hybrid BM25 + Dense Retrieval...\n")
+
+    texts = [
+        "Come to a complete stop at a stop sign before the white line.",
+        "A yield sign means slow down and give the right of way to other traffic.",
+        "Demerit points are added to your record for traffic offences.",
+        "The speed limit in school zones is 30 km/h when children are present.",
+        "Signal your intention before changing lanes on the highway.",
+        "Headlights must be on from sunset to sunrise.",
+    ]
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(len(texts), 16)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(len(texts))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = NumpyIndexWriter(Path(tmp) / "index")
+        writer.add(ids, texts, [{"page": i} for i in range(len(texts))], vectors)
+        writer.finalize()
+        index = NumpyVectorIndex(Path(tmp) / "index")
+
+        bm25 = BM25Index.build(index)
+        bm25.save(Path(tmp) / "bm25_index.npz")
+        bm25 = BM25Index.load(index, Path(tmp) / "bm25_index.npz")
+
+        # 1. Tokenizer keeps numbers and drops function words
+        tokens = tokenize("What is the speed limit of 30 km/h?")
+        print(f"Tokenizer Test: {tokens}")
+        assert tokens == ["speed", "limit", "30", "km", "h"]
+
+        # 2. Exact-term queries hit the right chunk lexically
+        lexical = bm25.search("how many demerit points", k=2)[0][0] == 2
+        print(f"BM25 Exact Term Test: {'Pass' if lexical else 'Fail'}")
+        assert lexical
+        assert bm25.search("chocolate cake", k=2) == []
+
+        # 3. Fusion surfaces the lexical match even when the dense ranking misses it
+        dense_favourite = vectors[5] + 0.01
+        retriever = HybridRetriever(
+            dense_index=index,
+            lexical_index=bm25,
+            embeddings=TableEmbeddings(dense_favourite),
+            k=2,
+            candidates=3,
+        )
+        docs = retriever.invoke("what does a yield sign mean")
+        pages = [doc.metadata["page"] for doc in docs]
+        fused = 1 in pages and 5 in pages
+        print(f"Fusion Test: pages {pages} {'Pass' if fused else 'Fail'}")
+        assert fused
+
+        # 4. Every document carries a real cosine score for the confidence guardrail
+        normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        query = dense_favourite / np.linalg.norm(dense_favourite)
+        scored = all(
+            abs(doc.metadata["score"] - float(normed[doc.metadata["page"]] @ query)) < 1e-5
+            and doc.metadata["rrf_score"] > 0
+            for doc in docs
+        )
+        print(f"Cosine Score Test: {'Pass' if scored else 'Fail'}")
+        assert scored
+
+        # 5. The confidence guardrail reads the best cosine, even when a weaker hit is fused first
+        weakest_first = sorted(docs, key=lambda doc: doc.metadata["score"])
+        best = weakest_first[-1].metadata["score"]
+        confident = OutputGuardrails.validate_retrieval_confidence(weakest_first, threshold=best)
+        confident = confident and not OutputGuardrails.validate_retrieval_confidence(
+            weakest_first, threshold=best + 0.01
+        )
+        print(f"Fused Confidence Test: {'Pass' if confident else 'Fail'}")
+        assert confident
+        index.close()
+
+
+if __name__ == "__main__":
+    test_hybrid_retrieval()
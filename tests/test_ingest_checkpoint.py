@@ -0,0 +1,46 @@
+import tempfile
+from pathlib import Path
+from src.ingest_checkpoint import IngestCheckpoint
+
+
+def test_ingest_checkpoint():
+    print("Testing Ingest Checkpoint...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "checkpoint.log"
+
+        # 1. Committed batches survive an interrupted run
+        checkpoint = IngestCheckpoint(path)
+        checkpoint.start()
+        checkpoint.commit(["a", "b"])
+        checkpoint.commit(["c"])
+        checkpoint.close()
+        with open(path, "a") as f:
+            f.write("torn-line-without-newline")
+
+        resumed = IngestCheckpoint(path).load()
+        print(f"Checkpoint Reload Test: {'Pass' if resumed == {'a', 'b', 'c'} else 'Fail'}")
+        assert resumed == {"a", "b", "c"}
+
+        # 2. Resuming appends, a fresh start truncates
+        checkpoint = IngestCheckpoint(path)
+        checkpoint.load()
+        checkpoint.start(resume=True)
+        checkpoint.commit(["d"])
+        checkpoint.close()
+        appended = IngestCheckpoint(path).load() >= {"a", "d"}
+
+        checkpoint.start(resume=False)
+        checkpoint.close()
+        truncated = IngestCheckpoint(path).load() == set()
+        print(f"Resume/Restart Test: {'Pass' if appended and truncated else 'Fail'}")
+        assert appended and truncated
+
+        # 3. A completed run removes the checkpoint
+        checkpoint.clear()
+        print(f"Checkpoint Clear Test: {'Pass' if not path.exists() else 'Fail'}")
+        assert not path.exists()
+
+
+if __name__ == "__main__":
+    test_ingest_checkpoint()
@@ -0,0 +1,42 @@
+import tempfile
+from pathlib import Path
+from src.ingest_manifest import IngestManifest, hash_chunk, hash_file
+
+
+def test_ingest_manifest():
+    print("Testing Ingest Manifest...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest_path = Path(tmp) / "manifest.json"
+        pdf_path = Path(tmp) / "chapter.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 handbook")
+
+        # 1. Stable hashing
+        same = hash_chunk("chapter.pdf", 0, "Yield to pedestrians.") == hash_chunk(
+            "chapter.pdf", 0, "Yield to pedestrians."
+        )
+        moved = hash_chunk("chapter.pdf", 0, "Yield to pedestrians.") != hash_chunk(
+            "chapter.pdf", 1, "Yield to pedestrians."
+        )
+        print(f"Chunk Hash Stability Test: {'Pass' if same and moved else 'Fail'}")
+        assert same and moved
+
+        # 2. Diff against a saved manifest
+        manifest = IngestManifest(manifest_path)
+        manifest.update_file("chapter.pdf", hash_file(pdf_path), {"a": 0, "b": 1})
+        manifest.save()
+
+        reloaded = IngestManifest(manifest_path)
+        to_add, to_delete = reloaded.diff("chapter.pdf", ["b", "c"])
+        diff_ok = to_add == {"c"} and to_delete == {"a"}
+        print(f"Manifest Diff Test: {'Pass' if diff_ok else 'Fail'}")
+        assert diff_ok
+
+        # 3. Unchanged file is detected by hash
+        unchanged = reloaded.file_hash("chapter.pdf") == hash_file(pdf_path)
+        print(f"Unchanged File Test: {'Pass' if unchanged else 'Fail'}")
+        assert unchanged
+
+
+if __name__ == "__main__":
+    test_ingest_manifest()
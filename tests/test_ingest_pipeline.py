@@ -0,0 +1,87 @@
+from langchain_core.documents import Document
+from src.ingest_pipeline import StreamingIngestPipeline
+from src.pdf_loader import PageSplitter
+from src.config import Config
+
+
+class FakeLoader:
+    """Generates synthetic handbook pages instead of parsing PDFs."""
+
+    def __init__(self, pages: int):
+        self.pages = pages
+
+    def iter_pages(self, paths):
+        for page in range(self.pages):
+            yield Document(
+                page_content=" ".join(
+                    f"Rule {page}.{i}: always yield to pedestrians." for i in range(40)
+                ),
+                metadata={"source": "synthetic.pdf", "page": page},
+            )
+
+
+class LengthEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(t))] for t in texts]
+
+
+class BrokenEmbeddings:
+    def embed_documents(self, texts):
+        raise ValueError("embedding backend unavailable")
+
+
+def test_ingest_pipeline():
+    print("Testing Streaming Ingest Pipeline...\n")
+
+    written = []
+
+    def write_batch(ids, docs, vectors):
+        written.extend(ids)
+
+    # 1. Every chunk flows through all four stages with tiny queues
+    pipeline = StreamingIngestPipeline(
+        FakeLoader(50),
+        PageSplitter(chunk_size=500, chunk_overlap=50),
+        LengthEmbeddings(),
+        write_batch,
+        batch_size=8,
+        concurrency=2,
+        queue_size=4,
+    )
+    result = pipeline.run(["synthetic.pdf"])
+    stages = result["stages"]
+    flowed = (
+        stages["parse"].items == 50
+        and stages["split"].items == len(written)
+        and stages["write"].items == len(written)
+        and len(set(written)) == len(written)
+    )
+    print(f"Stage Flow Test: {'Pass' if flowed else 'Fail'} ({len(written)} chunks)")
+    assert flowed
+
+    # 2. A failing stage aborts the pipeline instead of hanging it
+    original_retries = Config.EMBED_MAX_RETRIES
+    Config.EMBED_MAX_RETRIES = 0
+    try:
+        pipeline = StreamingIngestPipeline(
+            FakeLoader(50),
+            PageSplitter(chunk_size=500, chunk_overlap=50),
+            BrokenEmbeddings(),
+            write_batch,
+            batch_size=8,
+            concurrency=2,
+            queue_size=4,
+        )
+        pipeline_failed = False
+        try:
+            pipeline.run(["synthetic.pdf"])
+        except ValueError:
+            pipeline_failed = True
+    finally:
+        Config.EMBED_MAX_RETRIES = original_retries
+    print(f"Stage Failure Test: {'Pass' if pipeline_failed else 'Fail'}")
+    assert pipeline_failed
+
+
+if __name__ == "__main__":
+    test_ingest_pipeline()
@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+import numpy as np
+from benchmarks.ann_recall import benchmark_recall
+from src.retrieval import IVFIndex, NumpyIndexWriter, NumpyVectorIndex
+
+
+def test_ivf_index():
+    print("Testing IVF Index...\n")
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 32)).astype(np.float32)
+    vectors = centers[rng.integers(20, size=2000)]
+    vectors = vectors + 0.3 * rng.normal(size=(2000, 32)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(2000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = NumpyIndexWriter(Path(tmp) / "index")
+        writer.add(ids, ids, [{} for _ in ids], vectors)
+        writer.finalize()
+        index = NumpyVectorIndex(Path(tmp) / "index")
+
+        ivf = IVFIndex.build(index, nlist=16)
+        ivf_path = Path(tmp) / "ivf_index.npz"
+        ivf.save(ivf_path)
+        loaded = IVFIndex.load(index, ivf_path, nprobe=4)
+
+        # 1. Every row lands in exactly one inverted list
+        covered = sorted(loaded.list_rows.tolist()) == list(range(2000))
+        print(f"List Coverage Test: {'Pass' if covered else 'Fail'}")
+        assert covered
+
+        # 2. Probing every list is exact search
+        query = vectors[42] + 0.01
+        expected = [row for row, _ in index.search(query, k=5)]
+        exact = [row for row, _ in loaded.search(query, k=5, nprobe=loaded.nlist)] == expected
+        print(f"Full Probe Test: {'Pass' if exact else 'Fail'}")
+        assert exact
+
+        # 3. Recall rises with nprobe and stays high at the default
+        queries = vectors[:100] + 0.05
+        results = benchmark_recall(index, loaded, queries, k=4, nprobe_values=(1, 4, 16))
+        recalls = [row["recall"] for row in results[1:]]
+        monotonic = recalls == sorted(recalls) and recalls[1] >= 0.9 and recalls[-1] == 1.0
+        print(f"Recall Curve Test: {recalls} {'Pass' if monotonic else 'Fail'}")
+        assert monotonic
+
+        # 4. An index built for a different row count is rejected
+        writer = NumpyIndexWriter(Path(tmp) / "smaller")
+        writer.add(ids[:10], ids[:10], [{} for _ in range(10)], vectors[:10])
+        writer.finalize()
+        smaller = NumpyVectorIndex(Path(tmp) / "smaller")
+        try:
+            IVFIndex.load(smaller, ivf_path)
+            stale = False
+        except ValueError:
+            stale = True
+        print(f"Stale Index Test: {'Pass' if stale else 'Fail'}")
+        assert stale
+        smaller.close()
+        index.close()
+
+
+if __name__ == "__main__":
+    test_ivf_index()
@@ -0,0 +1,114 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from src.config import Config
+from src.loadtest import LoadTest, format_report, load_queries
+from src.metrics import get_metrics
+
+
+class StubEngine:
+    """
+    run_query stand-in: sleeps `delay`, answers "yield" queries (every other
+    one from the cache), blocks the rest.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def run_query(self, query):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.calls += 1
+            cached = self.calls % 2 == 0
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if "cake" in query:
+            return {"error_code": "OFF_TOPIC", "guardrails_triggered": ["OFF_TOPIC"]}
+        if "boom" in query:
+            raise RuntimeError("429 Too Many Requests")
+        result = {"error_code": "None", "guardrails_triggered": []}
+        if cached:
+            result["cache"] = "exact"
+        return result
+
+
+def test_loadtest():
+    print("Testing Load Test Mode...\n")
+
+    # 1. Query corpora: plain lines (comments skipped) or JSON lines
+    with tempfile.TemporaryDirectory() as tmp:
+        text, jsonl = Path(tmp) / "queries.txt", Path(tmp) / "queries.jsonl"
+        text.write_text("# corpus\nWhat is a yield sign?\n\nHow do I bake a cake?\n")
+        jsonl.write_text('{"query": "What is a yield sign?"}\n{"query": "boom"}\n')
+        corpus_ok = load_queries(text) == ["What is a yield sign?", "How do I bake a cake?"]
+        corpus_ok = corpus_ok and load_queries(jsonl) == ["What is a yield sign?", "boom"]
+    print(f"Query Corpus Test: {'Pass' if corpus_ok else 'Fail'}")
+    assert corpus_ok
+
+    # 2. Open loop: arrivals keep their rate even when each request takes longer than the gap
+    engine = StubEngine(delay=0.2)
+    snapshots = []
+    report = LoadTest(
+        engine.run_query,
+        ["What is a yield sign?"],
+        qps=50,
+        duration=1.5,
+        warmup=0.5,
+        progress_seconds=0.25,
+        on_progress=snapshots.append,
+        seed=1,
+    ).start()
+    open_loop = 35 <= report["throughput_qps"] <= 65 and engine.peak >= 5
+    open_loop = open_loop and abs(report["latency_ms"]["p50"] - 200) < 50
+    open_loop = open_loop and report["measured"] < report["sent"]  # Warmup arrivals excluded
+    open_loop = open_loop and snapshots[0]["warming_up"] and not snapshots[-1]["warming_up"]
+    print(
+        f"Open Loop Test: {report['throughput_qps']} q/s, peak {engine.peak} in flight "
+        f"{'Pass' if open_loop else 'Fail'}"
+    )
+    assert open_loop
+
+    # 3. Closed loop: fixed concurrency; breakdown of codes, guardrails, exceptions and cache hits
+    engine = StubEngine(delay=0.02)
+    queries = ["What is a yield sign?", "How do I bake a cake?", "boom"]
+    report = LoadTest(engine.run_query, queries, concurrency=3, duration=0.6, warmup=0.1).start()
+    codes = report["codes"]
+    closed = engine.peak == 3 and set(codes) == {"None", "OFF_TOPIC", "EXCEPTION:RuntimeError"}
+    closed = closed and report["guardrails"]["OFF_TOPIC"] == codes["OFF_TOPIC"]
+    closed = closed and report["cache"]["exact"] + report["cache"]["miss"] == codes["None"]
+    closed = closed and 0 < report["cache"]["hit_rate"] < 1
+    print(f"Closed Loop Test: {codes} {'Pass' if closed else 'Fail'}")
+    assert closed
+    print(format_report(report))
+
+    # 4. Stage histograms are reset when warmup ends, not on the next progress tick
+    get_metrics().record({"llm": 0.1}, 0.1, "None")
+    LoadTest(
+        engine.run_query, queries, concurrency=1, duration=0.2, warmup=0.1, progress_seconds=60
+    ).start()
+    reset = "total" not in get_metrics().percentiles()
+    print(f"Warmup Reset Test: {'Pass' if reset else 'Fail'}")
+    assert reset
+
+    # 5. Open-loop threads never outnumber the execution pool
+    capped = LoadTest(engine.run_query, queries, qps=1, max_in_flight=1000).max_in_flight
+    print(f"In-Flight Cap Test: {'Pass' if capped == Config.EXECUTION_POOL_WORKERS else 'Fail'}")
+    assert capped == Config.EXECUTION_POOL_WORKERS
+
+    # 6. Exactly one arrival mode
+    try:
+        LoadTest(engine.run_query, queries, qps=1, concurrency=1)
+        raise AssertionError("Expected ValueError")
+    except ValueError:
+        print("Arrival Mode Test: Pass")
+
+
+if __name__ == "__main__":
+    test_loadtest()
@@ -0,0 +1,125 @@
+import asyncio
+import sys
+import pytest
+from src.config import Config
+from src.evaluation import RAGEvaluator
+from src.faithfulness_scorer import LocalFaithfulnessScorer
+
+CONTEXT = (
+    "At a yield sign, you must slow down and give the right of way to traffic and pedestrians. "
+    "School zones have a speed limit of 30 km/h when children are present."
+)
+SUPPORTED = "At a yield sign, slow down and give the right of way to traffic."
+UNSUPPORTED = "Go to the beach and enjoy a cold drink on a sunny afternoon."
+BORDERLINE = (
+    "At a yield sign, slow down and give the right of way. Fines for failing to yield are steep."
+)
+
+
+class FixedEmbeddings:
+    """Embeds every text to the same vector, so semantic support is always 1.0."""
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+def test_local_faithfulness(judge_llm):
+    print("Testing Local Faithfulness Scorer...\n")
+
+    # 1. Continuous lexical support: supported > borderline > unsupported
+    scorer = LocalFaithfulnessScorer()
+    supported, borderline, unsupported = (
+        scorer.score(SUPPORTED, CONTEXT),
+        scorer.score(BORDERLINE, CONTEXT),
+        scorer.score(UNSUPPORTED, CONTEXT),
+    )
+    ordered = supported >= Config.FAITHFULNESS_ACCEPT_THRESHOLD
+    ordered = ordered and unsupported <= Config.FAITHFULNESS_REJECT_THRESHOLD
+    ordered = ordered and unsupported < borderline < supported
+    print(
+        f"Support Score Test: {supported:.2f} / {borderline:.2f} / {unsupported:.2f} "
+        f"{'Pass' if ordered else 'Fail'}"
+    )
+    assert ordered
+
+    # 2. Optional embedding similarity is blended in
+    semantic_scorer = LocalFaithfulnessScorer(FixedEmbeddings(), semantic_weight=0.5)
+    blended = semantic_scorer.score(UNSUPPORTED, CONTEXT)
+    semantic = abs(blended - (0.5 * unsupported + 0.5)) < 1e-6
+    print(f"Semantic Blend Test: {'Pass' if semantic else 'Fail'}")
+    assert semantic
+
+    # 3. Only borderline answers reach the LLM judge
+    audit_rate = Config.FAITHFULNESS_AUDIT_RATE
+    Config.FAITHFULNESS_AUDIT_RATE = 0.0
+    try:
+        judge = judge_llm(calls=[])
+        evaluator = RAGEvaluator(llm=judge)
+        clear = [
+            evaluator.check_faithfulness("q", SUPPORTED, CONTEXT),
+            evaluator.check_faithfulness("q", UNSUPPORTED, CONTEXT),
+        ]
+        cascade = judge.calls == [] and clear == [supported, unsupported]
+        cascade = cascade and evaluator.check_faithfulness("q", BORDERLINE, CONTEXT) == 1.0
+        cascade = cascade and judge.calls == ["single"]
+        print(f"Escalation Test: {judge.calls} {'Pass' if cascade else 'Fail'}")
+        assert cascade
+
+        # 4. Batches only carry the escalated answers
+        judge = judge_llm(calls=[])
+        evaluator = RAGEvaluator(llm=judge)
+        scores = evaluator.check_faithfulness_batch(
+            [("q", SUPPORTED, CONTEXT), ("q", BORDERLINE, CONTEXT), ("q", UNSUPPORTED, CONTEXT)]
+        )
+        batched = scores == [supported, 1.0, unsupported] and judge.calls == ["batch"]
+        print(f"Batch Escalation Test: {'Pass' if batched else 'Fail'}")
+        assert batched
+    finally:
+        Config.FAITHFULNESS_AUDIT_RATE = audit_rate
+
+    # 5. Audited answers measure agreement; both stages report latency
+    Config.FAITHFULNESS_AUDIT_RATE = 1.0
+    try:
+        judge = judge_llm(calls=[])
+        evaluator = RAGEvaluator(llm=judge)
+        evaluator.check_faithfulness("q", SUPPORTED, CONTEXT)
+        evaluator.check_faithfulness("q", UNSUPPORTED.replace("beach", "lake"), CONTEXT)
+        report = evaluator.faithfulness_stage_report()
+    finally:
+        Config.FAITHFULNESS_AUDIT_RATE = audit_rate
+    reported = report["local_calls"] == 2 and report["llm_calls"] == 2 and report["audited"] == 2
+    # The fake judge says Yes to the unsupported lake answer, so only one verdict agrees
+    reported = reported and report["agreement"] == 0.5 and report["local_avg_ms"] > 0
+    print(f"Stage Report Test: {report} {'Pass' if reported else 'Fail'}")
+    assert reported
+    assert "Stage Agreement" in evaluator.generate_eval_summary()
+
+    # 6. The async judge records the same scores and stage counts as the sync one
+    answers = [SUPPORTED, BORDERLINE, UNSUPPORTED.replace("beach", "lake")]
+    Config.FAITHFULNESS_AUDIT_RATE = 1.0
+    try:
+        sync_eval = RAGEvaluator(llm=judge_llm(calls=[]))
+        async_eval = RAGEvaluator(llm=judge_llm(calls=[]))
+        sync_scores = [sync_eval.check_faithfulness("q", answer, CONTEXT) for answer in answers]
+        async_scores = [
+            asyncio.run(async_eval.acheck_faithfulness("q", answer, CONTEXT)) for answer in answers
+        ]
+    finally:
+        Config.FAITHFULNESS_AUDIT_RATE = audit_rate
+    counts = ("local_calls", "llm_calls", "audited", "escalated", "compared", "agreement")
+    sync_report = sync_eval.faithfulness_stage_report()
+    async_report = async_eval.faithfulness_stage_report()
+    parity = sync_scores == async_scores and sync_report["llm_calls"] == len(answers)
+    parity = parity and all(sync_report[key] == async_report[key] for key in counts)
+    print(f"Async Parity Test: {'Pass' if parity else 'Fail'}")
+    assert parity
+
+    # 7. Without an LLM, the local score replaces the old length heuristic
+    fallback = RAGEvaluator(llm=None).check_faithfulness("q", UNSUPPORTED, CONTEXT)
+    no_llm = fallback == unsupported and fallback < 1.0
+    print(f"No-LLM Fallback Test: {'Pass' if no_llm else 'Fail'}")
+    assert no_llm
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
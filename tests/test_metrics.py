@@ -0,0 +1,116 @@
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+import pytest
+from src.config import Config
+from src.metrics import LatencyHistogram, MetricsRegistry, TimedEmbeddings, get_metrics
+from src.retrieval import NumpyVectorIndex, NumpyIndexWriter, VectorIndexRetriever
+
+
+class SleepyEmbeddings:
+    """Returns a fixed vector after `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        return [1.0, 0.0]
+
+
+def test_metrics(make_engine, sleepy_llm):
+    print("Testing Per-Stage Latency Metrics...\n")
+
+    # 1. Histogram percentiles land within one bucket of the exact values
+    rng = random.Random(7)
+    samples = [rng.uniform(0.01, 0.5) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for s in samples:
+        histogram.observe(s)
+    samples.sort()
+    exact = {q: samples[int(q * len(samples)) - 1] for q in (0.5, 0.95, 0.99)}
+    close = all(abs(histogram.quantile(q) - value) / value < 0.25 for q, value in exact.items())
+    print(f"Percentile Test: {histogram.summary()} {'Pass' if close else 'Fail'}")
+    assert close
+
+    # 2. Every answered query carries a per-stage trace that adds up to its total
+    get_metrics().reset()
+    engine = make_engine(sleepy_llm(delay=0.1))
+    result = engine.run_query("What do I do at a yield sign?", skip_faithfulness=True)
+    trace = result["trace"]
+    stages = trace["stages_ms"]
+    traced = list(stages) == [
+        "input", "retrieval", "confidence", "generation", "output", "faithfulness", "finalize"
+    ]
+    traced = traced and stages["generation"] >= 100
+    traced = traced and abs(sum(stages.values()) - trace["total_ms"]) < 1
+    print(f"Request Trace Test: {trace} {'Pass' if traced else 'Fail'}")
+    assert traced
+
+    # 3. Blocked queries are traced up to the stage that stopped them; async queries too
+    blocked = engine.run_query("How do I bake a chocolate cake?")
+    async_result = asyncio.run(
+        engine.arun_query("What do I do at a yield sign?", skip_faithfulness=True)
+    )
+    partial = list(blocked["trace"]["stages_ms"]) == ["input"]
+    partial = partial and async_result["trace"]["stages_ms"]["generation"] >= 100
+    print(f"Blocked & Async Trace Test: {'Pass' if partial else 'Fail'}")
+    assert partial
+
+    # 4. The query embedding is reported apart from the index search
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = NumpyIndexWriter(Path(tmp) / "index")
+        metadata = {"source": "DH.pdf", "page": 0}
+        writer.add(["a"], ["At a yield sign, slow down."], [metadata], [[1.0, 0.0]])
+        writer.finalize()
+        engine.retriever = VectorIndexRetriever(
+            index=NumpyVectorIndex(Path(tmp) / "index"),
+            embeddings=TimedEmbeddings(SleepyEmbeddings(0.05)),
+            k=1,
+        )
+        result = engine.run_query("What do I do at a yield sign?", skip_faithfulness=True)
+        stages = result["trace"]["stages_ms"]
+    # The 50 ms embedding sleep is booked to "embedding", which comes before "retrieval"
+    split = stages["embedding"] >= 50 and list(stages)[1:3] == ["embedding", "retrieval"]
+    print(
+        f"Embedding Span Test: embedding={stages['embedding']:.1f}ms "
+        f"retrieval={stages['retrieval']:.1f}ms {'Pass' if split else 'Fail'}"
+    )
+    assert split
+
+    # 5. Process-wide histograms export to a Prometheus text file
+    registry = get_metrics()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "metrics.prom"
+        registry.write_prometheus(path)
+        text = path.read_text()
+    exported = registry.percentiles()["total"]["count"] == 4
+    exported = exported and 'rag_stage_latency_seconds_count{stage="generation"} 3' in text
+    exported = exported and 'rag_requests_total{code="OFF_TOPIC"} 1' in text
+    exported = exported and 'rag_stage_latency_seconds_bucket{stage="total",le="+Inf"} 4' in text
+    print(f"Prometheus Export Test: {'Pass' if exported else 'Fail'}")
+    assert exported
+    print(registry.format_report())
+
+    # 6. Disabled: no trace, nothing recorded
+    Config.METRICS_ENABLED = False
+    try:
+        result = engine.run_query("How do I bake a chocolate cake?")
+    finally:
+        Config.METRICS_ENABLED = True
+    disabled = "trace" not in result and registry.percentiles()["total"]["count"] == 4
+    print(f"Disabled Test: {'Pass' if disabled else 'Fail'}")
+    assert disabled
+
+    # 7. Custom buckets
+    small = MetricsRegistry(buckets=(0.001, 0.01))
+    small.record({"input": 0.005}, 0.5, "None")
+    # Above the largest bound: reports the bound
+    assert small.percentiles()["total"]["p50_ms"] == 10.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
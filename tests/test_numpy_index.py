@@ -0,0 +1,78 @@
+import tempfile
+from pathlib import Path
+import numpy as np
+from src.config import Config
+from src.retrieval import NumpyIndexWriter, NumpyVectorIndex, VectorIndexRetriever
+
+
+class TableEmbeddings:
+    """Returns a fixed query vector so retrieval results are predictable."""
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    def embed_query(self, text):
+        return self.vector
+
+
+def test_numpy_index():
+    print("Testing NumPy Vector Index...\n")
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(500)]
+    texts = [f"Handbook passage {i}" for i in range(500)]
+    metadatas = [{"source": "DH-Chapter2.pdf", "page": i % 40} for i in range(500)]
+    query = vectors[123] + 0.01
+
+    for dtype in ("float32", "float16"):
+        with tempfile.TemporaryDirectory() as tmp:
+            index_dir = Path(tmp) / "index"
+            writer = NumpyIndexWriter(index_dir, dtype=dtype)
+            # Written in several batches, as the ingest pipeline does
+            for start in range(0, 500, 128):
+                batch = slice(start, start + 128)
+                writer.add(ids[batch], texts[batch], metadatas[batch], vectors[batch])
+            writer.finalize()
+
+            index = NumpyVectorIndex(index_dir)
+
+            # 1. Top-k matches brute-force cosine similarity
+            normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:5]
+            got = [row for row, _ in index.search(query, k=5)]
+            exact = got == list(expected)
+            print(f"Exact Top-k Test ({dtype}): {'Pass' if exact else 'Fail'}")
+            assert exact
+
+            # 2. Retriever returns documents with real similarity scores
+            retriever = VectorIndexRetriever(index=index, embeddings=TableEmbeddings(query), k=3)
+            docs = retriever.invoke("yield signs")
+            scored = (
+                docs[0].page_content == "Handbook passage 123"
+                and docs[0].metadata["score"] > 0.99
+                and docs[0].metadata["score"] >= docs[1].metadata["score"]
+            )
+            print(f"Retriever Score Test ({dtype}): {'Pass' if scored else 'Fail'}")
+            assert scored
+            index.close()
+
+    # 3. Cosine-scored backends get the confidence cut-off of their embedding backend
+    saved = Config.RETRIEVER_BACKEND, Config.EMBEDDING_BACKEND
+    try:
+        Config.RETRIEVER_BACKEND, Config.EMBEDDING_BACKEND = "chroma", "jina"
+        chroma = Config.retrieval_confidence_threshold()
+        Config.RETRIEVER_BACKEND = "numpy"
+        cosine = Config.retrieval_confidence_threshold()
+        Config.EMBEDDING_BACKEND = "hash"
+        stand_in = Config.retrieval_confidence_threshold()
+    finally:
+        Config.RETRIEVER_BACKEND, Config.EMBEDDING_BACKEND = saved
+    aware = chroma == Config.RETRIEVAL_CONFIDENCE_THRESHOLD
+    aware = aware and cosine == Config.RETRIEVAL_COSINE_THRESHOLDS["jina"] and stand_in == 0.0
+    print(f"Backend Threshold Test: {'Pass' if aware else 'Fail'}")
+    assert aware
+
+
+if __name__ == "__main__":
+    test_numpy_index()
@@ -0,0 +1,45 @@
+import sys
+import pytest
+from main import build_parser
+from src.config import Config
+from src.ingest import KnowledgeBaseIngestor
+from src.pdf_loader import ParallelPDFLoader
+
+
+def test_pdf_loader(make_pdf, tmp_path):
+    print("Testing Parallel PDF Loader...\n")
+
+    chapters = {
+        "chapter1.pdf": [f"Chapter one page {n}: yield to pedestrians." for n in range(7)],
+        "chapter2.pdf": [f"Chapter two page {n}: signal before turning." for n in range(3)],
+    }
+    paths = [make_pdf(name, pages) for name, pages in chapters.items()]
+
+    # 1. Page ranges are spread over several processes; every page comes back once, numbered
+    loader = ParallelPDFLoader(workers=2, pages_per_task=2)
+    pages = list(loader.iter_pages(paths))
+    by_file = {}
+    for page in pages:
+        by_file.setdefault(page.metadata["source"], []).append(page)
+    ordered = len(pages) == 10
+    for path in paths:
+        got = sorted(by_file[str(path)], key=lambda page: page.metadata["page"])
+        expected = chapters[path.name]
+        ordered = ordered and [page.metadata["page"] for page in got] == list(range(len(expected)))
+        ordered = ordered and [page.page_content.strip() for page in got] == expected
+        ordered = ordered and all(page.metadata["total_pages"] == len(expected) for page in got)
+    print(f"Parallel Parse Test: {len(pages)} pages {'Pass' if ordered else 'Fail'}")
+    assert ordered
+
+    # 2. --data-dir (bare: Config.DATA_DIR) and --workers reach the ingestor
+    args = build_parser().parse_args(["--mode", "ingest", "--data-dir", "--workers", "2"])
+    flags = args.data_dir == str(Config.DATA_DIR) and args.workers == 2
+    ingestor = KnowledgeBaseIngestor(data_dir=tmp_path, workers=args.workers)
+    flags = flags and ingestor.resolve_data_paths() == sorted(paths)
+    flags = flags and ParallelPDFLoader(workers=ingestor.workers).workers == 2
+    print(f"Data Directory Flags Test: {'Pass' if flags else 'Fail'}")
+    assert flags
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
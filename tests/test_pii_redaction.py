@@ -0,0 +1,74 @@
+import re
+import tempfile
+from pathlib import Path
+from src.config import Config
+from src.security import PIIRedactor
+from src.security.input_guardrails import InputGuardrails
+
+SAMPLE = (
+    "Reach me at jane.doe@example.com or (902) 555-0123. "
+    "My plate is ABC 1234 and my friend's is 123-XYZ. "
+    "Another: support+ticket@mail.novascotia.ca, 902.555.9876."
+)
+
+
+def sequential_redact(text: str) -> str:
+    """The previous per-pattern search/sub redaction."""
+    for pattern in Config.PII_PATTERNS.values():
+        if re.search(pattern, text):
+            text = re.sub(pattern, "[REDACTED]", text)
+    return text
+
+
+def test_pii_redaction():
+    print("Testing Single-Pass PII Redaction...\n")
+
+    redactor = PIIRedactor()
+
+    # 1. One pass yields spans and per-type counts
+    spans = redactor.scan(SAMPLE)
+    clean, counts = redactor.redact(SAMPLE)
+    counted = dict(counts) == {"email": 2, "phone": 2, "license_plate": 2}
+    found = [SAMPLE[s:e] for s, e, _ in spans][:2]
+    counted = counted and found == ["jane.doe@example.com", "(902) 555-0123"]
+    print(f"Spans & Counts Test: {dict(counts)} {'Pass' if counted else 'Fail'}")
+    assert counted
+
+    # 2. Same output as the previous sequential redaction
+    same = clean == sequential_redact(SAMPLE)
+    print(f"Equivalence Test: {'Pass' if same else 'Fail'}")
+    assert same
+
+    # 3. Streaming gives the same result for every chunk size, including
+    #    boundaries that split an email, a phone number or a plate
+    text = SAMPLE * 20
+    expected, expected_counts = redactor.redact(text)
+    streamed_ok = True
+    for size in (1, 2, 3, 7, 16, 50, 333):
+        stream = redactor.stream(holdback=64)
+        out = "".join(stream.feed(text[i:i + size]) for i in range(0, len(text), size))
+        out += stream.close()
+        streamed_ok = streamed_ok and out == expected and stream.counts == expected_counts
+    print(f"Chunk Boundary Test: {'Pass' if streamed_ok else 'Fail'}")
+    assert streamed_ok
+
+    # 4. Files are redacted in chunks
+    with tempfile.TemporaryDirectory() as tmp:
+        source, destination = Path(tmp) / "queries.log", Path(tmp) / "queries.redacted.log"
+        source.write_text(text, encoding="utf-8")
+        file_counts = redactor.redact_file(source, destination, chunk_size=97)
+        file_ok = destination.read_text(encoding="utf-8") == expected
+        file_ok = file_ok and file_counts == expected_counts
+    print(f"File Redaction Test: {'Pass' if file_ok else 'Fail'}")
+    assert file_ok
+
+    # 5. sanitize_pii keeps its interface
+    clean_query, stripped = InputGuardrails.sanitize_pii("Call 902-123-4567 about my licence")
+    guard_ok = stripped and clean_query == "Call [REDACTED] about my licence"
+    guard_ok = guard_ok and InputGuardrails.sanitize_pii("No PII here") == ("No PII here", False)
+    print(f"Guardrail Test: {'Pass' if guard_ok else 'Fail'}")
+    assert guard_ok
+
+
+if __name__ == "__main__":
+    test_pii_redaction()
@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+import src.scheduler as scheduler_module
+from src.config import Config
+from src.scheduler import AdaptiveConcurrency, BatchScheduler, TokenBucket, retry_after
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.status_code = 429
+        self.headers = headers
+
+
+class RateLimitError(Exception):
+    """Shaped like an HTTP client 429 error with a Retry-After header."""
+
+    def __init__(self, seconds):
+        super().__init__("Error code: 429 - rate limited")
+        self.response = FakeResponse({"retry-after": str(seconds)})
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic() instead of waiting."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitedChatModel(BaseChatModel):
+    """Raises a 429 on its first `failures` calls, then answers."""
+
+    failures: int = 1
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "rate-limited-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimitError(0)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="Yield."))])
+
+
+def test_scheduler(monkeypatch):
+    print("Testing Batch Scheduler...\n")
+
+    # 1. Token bucket allows a burst, then paces to the configured rate (on a simulated clock)
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", clock)
+    bucket = TokenBucket(rate=16, capacity=4)  # Powers of two keep the simulated clock exact
+    for _ in range(12):
+        bucket.acquire()
+    monkeypatch.undo()
+    paced = clock.sleeps == [1 / 16] * 8 and clock.now == 0.5
+    print(f"Token Bucket Test: 12 tokens in {clock.now:.2f}s {'Pass' if paced else 'Fail'}")
+    assert paced
+
+    # 2. Retry-After is read from headers or the error message
+    parsed = retry_after(RateLimitError(2)) == 2.0
+    parsed = parsed and retry_after(Exception("429: try again in 1.5s")) == 1.5
+    print(f"Retry-After Parsing Test: {'Pass' if parsed else 'Fail'}")
+    assert parsed
+
+    # 3. Concurrency halves on a 429 and grows back after successes
+    limit = AdaptiveConcurrency(initial=4, maximum=8)
+    limit.acquire()
+    limit.release(rate_limited=True)
+    shrunk = limit.limit == 2
+    for _ in range(2):
+        limit.acquire()
+        limit.release()
+    adaptive = shrunk and limit.limit == 3
+    print(f"Adaptive Concurrency Test: {'Pass' if adaptive else 'Fail'}")
+    assert adaptive
+
+    # 4. Results keep input order, 429s are retried, concurrency is bounded
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0, "failed_once": set()}
+
+    def work(item):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            time.sleep(0.05 * (item % 3))
+            if item in (2, 5) and item not in state["failed_once"]:
+                state["failed_once"].add(item)
+                raise RateLimitError(0.1)
+            return item * 10
+        finally:
+            with lock:
+                state["in_flight"] -= 1
+
+    scheduler = BatchScheduler(provider="test", concurrency=3, max_concurrency=3, max_retries=2)
+    results = scheduler.run(work, list(range(10)))
+    ordered = results == [i * 10 for i in range(10)]
+    print(f"Ordered Results Test: {'Pass' if ordered else 'Fail'}")
+    assert ordered
+    assert scheduler.stats["rate_limited"] == 2 and scheduler.stats["retries"] == 2
+    assert state["peak"] <= 3
+
+    # 5. Exhausted retries become error results via on_error
+    def always_limited(item):
+        raise RateLimitError(0)
+
+    scheduler = BatchScheduler(provider="test", concurrency=2, max_retries=1, backoff_seconds=0)
+    results = scheduler.run(always_limited, ["a", "b"], on_error=lambda item, e: f"{item}: failed")
+    handled = results == ["a: failed", "b: failed"]
+    print(f"Error Handling Test: {'Pass' if handled else 'Fail'}")
+    assert handled
+
+
+def test_run_batch_retry(make_engine, monkeypatch):
+    print("Testing Rate-Limited Query Retry...\n")
+
+    # A retried query counts once in the evaluator's stats, like any other query
+    monkeypatch.setattr(Config, "LLM_PROVIDER", "test")  # Unlimited bucket
+    llm = RateLimitedChatModel()
+    engine = make_engine(llm)
+    results = engine.run_batch(["What do I do at a yield sign?"], concurrency=1)
+    stats = engine.evaluator.stats
+    counted = results[0]["error_code"] == "None" and llm.calls == 2
+    counted = counted and len(stats["relevance_scores"]) == 1 and stats["total_queries"] == 1
+    print(f"Retry Counted Once Test: {'Pass' if counted else 'Fail'}")
+    assert counted
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
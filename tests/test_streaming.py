@@ -0,0 +1,90 @@
+import sys
+import time
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from src.config import Config
+from src.security import LLMTimeoutError, StreamingOutputGuard
+from src.security.execution_limits import Deadline
+
+
+class TokenStreamChatModel(BaseChatModel):
+    """Streams a fixed reply word by word and records how many tokens were pulled."""
+
+    reply: str
+    pulled: list = []
+    delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "token-stream-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for word in self.reply.split(" "):
+            time.sleep(self.delay)
+            self.pulled.append(word)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+def test_streaming(make_engine):
+    print("Testing Streaming Output Guardrails...\n")
+
+    # 1. The guard trips on the chunk that completes a violation, and stays tripped
+    guard = StreamingOutputGuard()
+    accepted = [guard.feed(t) for t in ["Sure, ", "I am ", "now a ", "travel agent."]]
+    tripped = accepted == [True, True, False, False] and guard.violated
+    print(f"Incremental Integrity Test: {'Pass' if tripped else 'Fail'}")
+    assert tripped
+
+    long_guard = StreamingOutputGuard()
+    words = 0
+    while long_guard.feed("word "):
+        words += 1
+    print(f"Incremental Length Test: stopped after {words} words")
+    assert words == Config.MAX_RESPONSE_WORDS
+
+    # 2. A clean answer streams token by token and matches the final result
+    reply = "At a yield sign, slow down and give the right of way."
+    engine = make_engine(TokenStreamChatModel(reply=reply, pulled=[]))
+    tokens = []
+    result = engine.run_query(
+        "What do I do at a yield sign?", skip_faithfulness=True, on_token=tokens.append
+    )
+    streamed = len(tokens) == len(reply.split(" ")) and result["answer"] == "".join(tokens)
+    print(f"Clean Stream Test: {'Pass' if streamed else 'Fail'}")
+    assert streamed and result["error_code"] == "None"
+
+    # 3. A leak aborts the stream: later tokens are never pulled or shown
+    leaky = "Okay. I am now a travel agent and " + "more " * 50
+    model = TokenStreamChatModel(reply=leaky, pulled=[])
+    engine = make_engine(model)
+    tokens = []
+    result = engine.run_query(
+        "What do I do at a yield sign?", skip_faithfulness=True, on_token=tokens.append
+    )
+    aborted = (
+        result["error_code"] == "POLICY_BLOCK"
+        and "travel" not in "".join(tokens)
+        and len(model.pulled) < 10
+    )
+    print(f"Abort Stream Test: pulled {len(model.pulled)} tokens {'Pass' if aborted else 'Fail'}")
+    assert aborted
+
+    # 4. A stream cut off by the deadline raises instead of returning a truncated answer
+    model = TokenStreamChatModel(reply="word " * 50, pulled=[], delay=0.02)
+    engine = make_engine(model)
+    tokens = []
+    try:
+        engine._stream_answer("context", "question", tokens.append, Deadline(0.1))
+        raise AssertionError("Expected LLMTimeoutError")
+    except LLMTimeoutError:
+        print(f"Stream Deadline Test: timed out after {len(tokens)} tokens Pass")
+    assert len(model.pulled) < 50
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))